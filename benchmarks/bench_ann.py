@@ -0,0 +1,72 @@
+"""Recall@k and QPS of the IVF index against exact VectorDB search.
+
+Usage::
+
+    python -m benchmarks.bench_ann --n 200000 --dim 128 --nlist 512 --nprobe 1 4 16 64
+
+Data is drawn from a Gaussian mixture so that, as with real embeddings, the
+vectors have cluster structure for the inverted file to exploit.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from src.core.knowledge_base.vector_db import VectorDB
+
+
+def make_data(n, dim, num_queries, clusters=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    labels = rng.integers(0, clusters, size=n + num_queries)
+    points = centers[labels] + rng.standard_normal((n + num_queries, dim), dtype=np.float32)
+    return points[:n], points[n:]
+
+
+def run(n, dim, num_queries, top_k, nlist, nprobes, metric):
+    data, queries = make_data(n, dim, num_queries)
+    db = VectorDB(metric=metric, index="ivf",
+                  index_params={"nlist": nlist, "background": False})
+    start = time.perf_counter()
+    db.add_batch(data, [str(i) for i in range(n)])
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exact = [db.search(q, top_k, exact=True) for q in queries]
+    exact_s = time.perf_counter() - start
+    results = {
+        "n": n, "dim": dim, "nlist": nlist, "metric": metric, "build_s": build_s,
+        "exact_qps": num_queries / exact_s, "ivf": [],
+    }
+    print(f"n={n:,} dim={dim} build={build_s:.2f}s exact={results['exact_qps']:.1f} qps")
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        approx = [db.search(q, top_k, nprobe=nprobe) for q in queries]
+        elapsed = time.perf_counter() - start
+        recall = np.mean([len(set(a) & set(e)) / len(e) for a, e in zip(approx, exact)])
+        row = {"nprobe": nprobe, "qps": num_queries / elapsed, f"recall@{top_k}": float(recall)}
+        results["ivf"].append(row)
+        print(f"  nprobe={nprobe:<4} qps={row['qps']:9.1f} recall@{top_k}={recall:.3f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=512)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--metric", choices=["cosine"], default="cosine", help="IVF supports cosine only")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+    results = run(args.n, args.dim, args.queries, args.top_k, args.nlist, args.nprobe, args.metric)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
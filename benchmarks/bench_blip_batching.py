@@ -0,0 +1,103 @@
+"""BLIP captioning throughput on CPU by batch size.
+
+Usage::
+
+    python -m benchmarks.bench_blip_batching --batch-sizes 1 2 4 8 16 --images 64 --threads 8
+
+Each batch size first captions ``--images`` synthetic images through
+``BlipCaptioner.caption_batch`` directly, which measures raw model throughput.
+Then ``--images`` concurrent single-image requests go through the dynamic
+batching queue with that ``max_batch_size``. The eager one-image-at-a-time path
+the agents used before is included as ``unbatched``. Requires torch,
+transformers and pillow.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.models.blip_captioner import BlipCaptioner
+
+
+def make_images(n, size=384, seed=0):
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    return [Image.fromarray(rng.integers(0, 256, (size, size, 3), dtype=np.uint8)) for _ in range(n)]
+
+
+def unbatched(captioner, images):
+    """The previous per-request path: no inference mode, one ``generate`` per image."""
+    start = time.perf_counter()
+    for image in images:
+        inputs = captioner.processor(image, return_tensors="pt")
+        out = captioner.model.generate(**inputs, max_new_tokens=captioner.max_new_tokens)
+        captioner.processor.decode(out[0], skip_special_tokens=True)
+    return len(images) / (time.perf_counter() - start)
+
+
+def direct(captioner, images, batch_size):
+    start = time.perf_counter()
+    for i in range(0, len(images), batch_size):
+        captioner.caption_batch(images[i:i + batch_size])
+    return len(images) / (time.perf_counter() - start)
+
+
+def queued(captioner, images, batch_size, max_wait_ms):
+    queue_captioner = BlipCaptioner(
+        captioner.model_name, max_batch_size=batch_size, max_wait_ms=max_wait_ms,
+        max_new_tokens=captioner.max_new_tokens,
+        processor=captioner.processor, model=captioner.model,
+    )
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(images)) as pool:
+        list(pool.map(queue_captioner.caption, images))
+    elapsed = time.perf_counter() - start
+    stats = queue_captioner.stats()
+    queue_captioner.close()
+    return len(images) / elapsed, stats["avg_batch_size"]
+
+
+def run(model_name, batch_sizes, n_images, threads, max_wait_ms, max_new_tokens):
+    captioner = BlipCaptioner(model_name, num_threads=threads, max_new_tokens=max_new_tokens)
+    images = make_images(n_images)
+    captioner.caption_batch(images[:1])  # Warm-up
+    results = {
+        "model": model_name, "images": n_images, "threads": captioner.torch.get_num_threads(),
+        "unbatched_images_per_s": unbatched(captioner, images[:min(n_images, 8)]),
+        "batched": [],
+    }
+    print(f"unbatched eager: {results['unbatched_images_per_s']:.2f} images/s")
+    for batch_size in batch_sizes:
+        direct_ips = direct(captioner, images, batch_size)
+        queued_ips, avg_batch = queued(captioner, images, batch_size, max_wait_ms)
+        row = {"batch_size": batch_size, "images_per_s": direct_ips,
+               "queued_images_per_s": queued_ips, "queued_avg_batch": avg_batch}
+        results["batched"].append(row)
+        print(f"  batch={batch_size:<3} direct={direct_ips:7.2f} images/s "
+              f"queued={queued_ips:7.2f} images/s (avg batch {avg_batch:.1f})")
+    captioner.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="Salesforce/blip-image-captioning-base")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--images", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0: default)")
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--max-new-tokens", type=int, default=30)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+    results = run(args.model, args.batch_sizes, args.images, args.threads,
+                  args.max_wait_ms, args.max_new_tokens)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Local model backends on CPU: latency, throughput, RAM and agreement with eager.
+
+Usage::
+
+    python -m benchmarks.bench_model_backends --task classification --backends eager int8 onnx onnx-int8
+    python -m benchmarks.bench_model_backends --task summarization --backends eager int8 --inputs 16
+
+Every backend is loaded in a fresh process through the same loader the
+``ModelManager`` uses, so ``load_s`` includes the one-off conversion when the
+backend cache is cold (run twice to see the warm load) and ``rss_mb`` is the
+resident memory of the process after loading and running. Single-input
+latency percentiles come from ``--inputs`` sequential calls; throughput from
+the same inputs passed as one batch of ``--batch-size``. Outputs are compared
+with the eager backend: top label and score difference for classification,
+exact match and token F1 for summaries and captions.
+"""
+import argparse
+import json
+import multiprocessing
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+LABELS = ["text", "image", "file", "link"]
+
+TEXTS = [
+    "Can you summarize the attached quarterly report for me?",
+    "What is in this picture of my living room?",
+    "Open https://example.com/pricing and tell me the plans.",
+    "Write a short poem about autumn leaves.",
+    "Here is a CSV of our sales, what are the totals per region?",
+    "Describe the photo I just uploaded.",
+    "Read this article link and list the key points.",
+    "Explain how a hash map works.",
+]
+
+ARTICLE = (
+    "The city council approved a new transit plan on Tuesday that will add three bus rapid "
+    "transit lines and extend the light rail to the airport by 2030. Officials said the plan "
+    "would cut average commute times by fifteen minutes and reduce traffic congestion downtown. "
+    "Funding will come from a combination of federal grants, a regional sales tax approved by "
+    "voters last year, and private partnerships. Critics argued that the timeline is ambitious "
+    "and that construction could disrupt businesses along the routes, while supporters pointed "
+    "to ridership growth of twelve percent over the past two years as evidence of demand."
+)
+
+
+def _rss_mb():
+    from src.models.model_loader import _rss_bytes
+
+    return _rss_bytes() / (1024 * 1024)
+
+
+def make_inputs(task, n):
+    if task == "classification":
+        return [TEXTS[i % len(TEXTS)] for i in range(n)]
+    if task == "summarization":
+        sentences = ARTICLE.split(". ")
+        return [". ".join(sentences[i % len(sentences):] + sentences[:i % len(sentences)]) for i in range(n)]
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    return [Image.fromarray(rng.integers(0, 256, (384, 384, 3), dtype=np.uint8)) for _ in range(n)]
+
+
+def _call(task, model, inputs):
+    if task == "classification":
+        results = model(inputs, candidate_labels=LABELS)
+        results = results if isinstance(results, list) else [results]
+        return [{"label": r["labels"][0], "scores": dict(zip(r["labels"], r["scores"]))} for r in results]
+    if task == "summarization":
+        return [r["summary_text"] for r in model(inputs, max_length=60, min_length=10, do_sample=False)]
+    return model.caption_batch(inputs)
+
+
+def run_backend(task, model_name, backend, n_inputs, batch_size, cache_dir):
+    """Runs in a child process so load time and RAM are measured from a clean start."""
+    from src.models.model_loader import DEFAULT_LOADERS
+
+    inputs = make_inputs(task, n_inputs)
+    rss_start = _rss_mb()
+    start = time.perf_counter()
+    model = DEFAULT_LOADERS[task](task, model_name, backend, cache_dir)
+    load_s = time.perf_counter() - start
+    _call(task, model, inputs[:1])  # Warm-up
+
+    latencies, outputs = [], []
+    for item in inputs:
+        start = time.perf_counter()
+        outputs.extend(_call(task, model, [item]))
+        latencies.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    for i in range(0, len(inputs), batch_size):
+        _call(task, model, inputs[i:i + batch_size])
+    throughput = len(inputs) / (time.perf_counter() - start)
+    rss = _rss_mb()
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "items_per_s": throughput,
+        "rss_mb": rss,
+        "rss_delta_mb": rss - rss_start,
+        "outputs": outputs,
+    }
+
+
+def token_f1(a, b):
+    ta, tb = Counter(a.lower().split()), Counter(b.lower().split())
+    common = sum((ta & tb).values())
+    if not common:
+        return 0.0
+    precision, recall = common / sum(ta.values()), common / sum(tb.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def agreement(task, baseline, outputs):
+    if task == "classification":
+        return {
+            "top_label_match": float(np.mean([a["label"] == b["label"] for a, b in zip(baseline, outputs)])),
+            "max_score_diff": float(max(
+                abs(a["scores"][label] - b["scores"][label])
+                for a, b in zip(baseline, outputs) for label in LABELS
+            )),
+        }
+    return {
+        "exact_match": float(np.mean([a == b for a, b in zip(baseline, outputs)])),
+        "token_f1": float(np.mean([token_f1(a, b) for a, b in zip(baseline, outputs)])),
+    }
+
+
+def run(task, model_name, backends, n_inputs, batch_size, cache_dir):
+    from src.models.backends import BACKENDS, validate_backends
+    from src.models.model_registry import get_model_info
+
+    backends = backends or list(BACKENDS[task])
+    for backend in backends:
+        validate_backends({task: backend})
+    model_name = model_name or get_model_info(task)
+    backends = ["eager"] + [b for b in backends if b != "eager"]  # The agreement baseline runs first
+    results = {"task": task, "model": model_name, "inputs": n_inputs, "batch_size": batch_size, "backends": []}
+    baseline = None
+    for backend in backends:
+        # A fresh process per backend: loaded weights do not count against the next one
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            row = pool.submit(run_backend, task, model_name, backend, n_inputs, batch_size, cache_dir).result()
+        outputs = row.pop("outputs")
+        if backend == "eager":
+            baseline = outputs
+        row["agreement"] = agreement(task, baseline, outputs)
+        results["backends"].append(row)
+        print(f"{backend:<10} load={row['load_s']:6.1f}s p50={row['p50_ms']:8.1f}ms "
+              f"p95={row['p95_ms']:8.1f}ms {row['items_per_s']:7.2f} items/s "
+              f"rss={row['rss_mb']:7.0f}MiB agreement={row['agreement']}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--task", choices=["classification", "summarization", "image_caption"],
+                        default="classification")
+    parser.add_argument("--model", help="Defaults to the MODEL_REGISTRY entry for the task")
+    parser.add_argument("--backends", nargs="+", help="Defaults to every backend supported for the task")
+    parser.add_argument("--inputs", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--cache-dir", help="Backend cache (default: MODEL_BACKEND_CACHE)")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+    results = run(args.task, args.model, args.backends, args.inputs, args.batch_size, args.cache_dir)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""Per-stage micro-benchmarks of the routing pipeline, compared with a stored baseline.
+
+Usage::
+
+    python -m benchmarks.bench_pipeline --json results.json
+    python -m benchmarks.bench_pipeline --baseline benchmarks/baselines/pipeline.json
+    python -m benchmarks.bench_pipeline --stages vector_search file_csv --save-baseline benchmarks/baselines/pipeline.json
+
+Runs offline: Azure settings are removed from the environment, the zero-shot
+classifier is a deterministic stand-in served through ``ModelManager`` and
+the expert agents are replaced by an echo agent, as in
+``tests/test_router_agent.py``. Each stage of ``RouterAgent.process_input``
+is timed on its own (classification tiers, agent dispatch, memory, vector
+search, PDF and CSV parsing on generated fixtures) along with the whole call.
+
+With ``--baseline`` every stage's median and fastest run are compared to the
+stored ones and the run exits with status 1 when any stage is more than
+``--tolerance`` slower on both (and by more than ``--min-delta-ms``): a
+stray slow run moves the median of a short stage but not its minimum.
+Baselines are only comparable on the same machine and Python version, which
+are recorded in ``meta`` and checked, and with full repeat counts:
+``--repeat-scale`` below 1 is for quick local runs.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+LABELS = ["text", "image", "file", "link"]
+# Fewest timed calls per stage, whatever ``--repeat-scale`` says
+MIN_REPEAT = 10
+
+
+class FakeClassifier:
+    """Zero-shot pipeline stand-in: fixed scores, same output shape."""
+
+    def __call__(self, texts, candidate_labels):
+        single = isinstance(texts, str)
+        results = [
+            {"sequence": t, "labels": list(candidate_labels), "scores": [0.7, 0.1, 0.1, 0.1]}
+            for t in ([texts] if single else texts)
+        ]
+        return results[0] if single else results
+
+
+class EchoAgent:
+    def process(self, text, *args, **kwargs):
+        return {"type": "text", "input": text, "output": str(text)}
+
+
+def write_pdf(path, n_pages, lines_per_page=40):
+    """Minimal multi-page text PDF."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for i in range(1, n_pages + 1):
+        text = " ".join(
+            f"BT /F1 10 Tf 20 {780 - 18 * j} Td (Page {i} line {j} of the generated benchmark fixture.) Tj ET"
+            for j in range(lines_per_page)
+        )
+        objects.append(f"<< /Length {len(text)} >>\nstream\n{text}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {n_pages} >>"
+    out, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+
+def write_csv(path, rows, seed=0):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({
+        "id": np.arange(rows),
+        "amount": rng.normal(100, 25, rows).round(2),
+        "quantity": rng.integers(1, 50, rows),
+        "region": rng.choice(["north", "south", "east", "west"], rows),
+        "product": rng.choice([f"sku-{i}" for i in range(200)], rows),
+    }).to_csv(path, index=False)
+    return path
+
+
+def build_router(workdir):
+    from src.agents.agent_registry import LazyAgentRegistry
+    from src.agents.router_agent import RouterAgent
+    from src.models.model_loader import ModelManager
+
+    router = RouterAgent(config={"memory": {"long_path": os.path.join(workdir, "long_term.db")}})
+    router.models = ModelManager(loaders={"classification": lambda *args: FakeClassifier()})
+    router.agents = LazyAgentRegistry({name: EchoAgent for name in LABELS})
+    return router
+
+
+def stages(workdir, scale):
+    """``{name: (fn, repeat)}``; ``fn`` is a function or coroutine function of no arguments."""
+    from src.agents.expert_agents.file_agent import FileAgent
+    from src.core.knowledge_base.vector_db import VectorDB
+    from src.core.memory.long_term import LongTermMemory
+    from src.core.memory.short_term import ShortTermMemory
+
+    router = build_router(workdir)
+    counter = itertools.count()
+
+    async def classify_fast_path():
+        await router._aclassify_input({"input": "https://example.com/article"})
+
+    async def classify_cached():
+        await router._aclassify_input({"input": "what is the capital of france"})
+
+    async def classify_model_x16():
+        # Unique inputs so neither the fast path nor the cache answers
+        n = next(counter)
+        await asyncio.gather(*(
+            router._aclassify_input({"input": f"describe request {n}-{i} in detail please"})
+            for i in range(16)
+        ))
+
+    async def dispatch():
+        await router._run_agent("text", {"input": "hello"})
+
+    async def process_input():
+        await router.process_input({"content": f"tell me something new {next(counter)}"})
+
+    short_term = ShortTermMemory(capacity=5, debounce=0)
+
+    async def short_term_add_and_summarize():
+        await short_term.add_and_summarize(f"user turn {next(counter)} with a little text")
+
+    long_term = LongTermMemory(storage_path=os.path.join(workdir, "bench_long_term.db"))
+
+    def long_term_commit_batch():
+        # ``add`` alone only appends to a buffer: time a full batch through its commit
+        for _ in range(long_term.commit_every):
+            long_term.add(f"summary {next(counter)} of a conversation", conversation_id="bench")
+        long_term.flush()
+
+    rng = np.random.default_rng(0)
+    db = VectorDB(metric="dot")
+    db.add_batch(rng.standard_normal((10_000 * scale, 384), dtype=np.float32),
+                 [str(i) for i in range(10_000 * scale)])
+    query = rng.standard_normal(384, dtype=np.float32)
+
+    def vector_search():
+        db.search(query, top_k=10)
+
+    file_agent = FileAgent()
+    pdf = write_pdf(os.path.join(workdir, "fixture.pdf"), 20 * scale)
+    csv = write_csv(os.path.join(workdir, "fixture.csv"), 50_000 * scale)
+
+    return {
+        "classify_fast_path": (classify_fast_path, 2000),
+        "classify_cached": (classify_cached, 2000),
+        "classify_model_x16": (classify_model_x16, 300),
+        "dispatch": (dispatch, 500),
+        "process_input": (process_input, 200),
+        "short_term_add_and_summarize": (short_term_add_and_summarize, 500),
+        "long_term_commit_batch": (long_term_commit_batch, 200),
+        "vector_search": (vector_search, 200),
+        # Disk and allocator noise is large next to these: too few runs flake the gate
+        "file_pdf": (lambda: file_agent.process(pdf, "pdf"), 50),
+        "file_csv": (lambda: file_agent.process(csv, "csv"), 50),
+    }, [router, long_term]
+
+
+async def measure(fn, repeat, warmup):
+    is_async = asyncio.iscoroutinefunction(fn)
+    for _ in range(warmup):
+        await fn() if is_async else fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if is_async:
+            await fn()
+        else:
+            fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples = np.asarray(samples)
+    return {
+        "repeat": repeat,
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "min_ms": float(samples.min()),
+        "ops_per_s": float(1000 / samples.mean()),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(selected=None, repeat_scale=1.0, scale=1):
+    for key in [k for k in os.environ if k.startswith("AZURE_")]:
+        del os.environ[key]  # Offline: every stage uses local code paths
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+            "commit": _git_commit(),
+            "scale": scale,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "stages": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        suite, closables = stages(workdir, scale)
+        try:
+            for name, (fn, repeat) in suite.items():
+                if selected and name not in selected:
+                    continue
+                repeat = max(MIN_REPEAT, int(repeat * repeat_scale))
+                row = await measure(fn, repeat, warmup=max(1, repeat // 10))
+                results["stages"][name] = row
+                print(f"{name:<30} p50={row['p50_ms']:9.3f}ms p95={row['p95_ms']:9.3f}ms "
+                      f"{row['ops_per_s']:10.1f} ops/s")
+        finally:
+            for closable in closables:
+                close = getattr(closable, "close", None)
+                if callable(close):
+                    close()
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Per-stage p50 and min change against ``baseline``; returns the regressed stage names."""
+    mismatched = [key for key in ("python", "processor", "cpus")
+                  if baseline.get("meta", {}).get(key) != results["meta"].get(key)]
+    if mismatched:
+        print(f"Warning: the baseline was recorded on another machine ({', '.join(mismatched)} differ); "
+              f"re-record it here with --save-baseline before trusting the comparison")
+    regressions = []
+    print(f"\n{'stage':<30} {'baseline':>10} {'current':>10} {'change':>8} {'min':>8}")
+    for name, row in results["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if base is None:
+            print(f"{name:<30} {'-':>10} {row['p50_ms']:9.3f}ms {'new':>8}")
+            continue
+        change = row["p50_ms"] / base["p50_ms"] - 1 if base["p50_ms"] else 0.0
+        min_change = row["min_ms"] / base["min_ms"] - 1 if base.get("min_ms") else change
+        regressed = (change > tolerance and min_change > tolerance
+                     and row["p50_ms"] - base["p50_ms"] > min_delta_ms)
+        row["baseline_p50_ms"] = base["p50_ms"]
+        row["change"] = change
+        row["min_change"] = min_change
+        row["regressed"] = regressed
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<30} {base['p50_ms']:9.3f}ms {row['p50_ms']:9.3f}ms {change:+7.1%} {min_change:+7.1%}"
+              + ("  REGRESSION" if regressed else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stages", nargs="+", help="Run only these stages")
+    parser.add_argument("--repeat-scale", type=float, default=1.0,
+                        help="Multiply every stage's repeat count (e.g. 0.1 for a quick run)")
+    parser.add_argument("--scale", type=int, default=1, help="Multiply fixture sizes")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Compare against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown of a stage's median and minimum as a fraction")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05,
+                        help="Ignore slowdowns smaller than this, whatever the fraction")
+    parser.add_argument("--save-baseline", help="Write these results as the new baseline")
+    args = parser.parse_args()
+    if args.repeat_scale < 1 and (args.baseline or args.save_baseline):
+        # Medians of a scaled-down run are too noisy to gate on or to gate others against
+        parser.error("--baseline and --save-baseline need the full repeat counts (--repeat-scale >= 1)")
+
+    results = asyncio.run(run(args.stages, args.repeat_scale, args.scale))
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        results["regressions"] = regressions
+    for path in (args.json, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Map-reduce summarization timings by document length.
+
+Usage::
+
+    python -m benchmarks.bench_summarization --words 1000 4000 16000 64000
+    python -m benchmarks.bench_summarization --words 16000 --chunk-tokens 512 --fan-in 4 --batch-size 16
+
+Summarizes synthetic documents of each length with ``TextProcessor`` and
+reports the number of chunks, reduce depth and the split, map and reduce
+times. Runs against Azure when ``AZURE_OPENAI_SUMMARIZE_ENDPOINT`` is set
+and the local summarization model otherwise (requires transformers).
+"""
+import argparse
+import json
+
+import numpy as np
+
+from src.services.file_processing.text_processor import TextProcessor
+
+WORDS = (
+    "the council transit plan budget rail bus airport riders commute funding grant tax voters "
+    "construction business route growth demand delay report growth schedule station city region"
+).split()
+
+
+def make_document(n_words, seed=0):
+    rng = np.random.default_rng(seed)
+    sentences = []
+    remaining = n_words
+    while remaining > 0:
+        length = int(min(remaining, rng.integers(8, 25)))
+        words = rng.choice(WORDS, size=length)
+        sentences.append(" ".join(words).capitalize() + ".")
+        remaining -= length
+    return " ".join(sentences)
+
+
+def run(word_counts, processor):
+    rows = []
+    for n_words in word_counts:
+        result = processor.summarize_long(make_document(n_words))
+        timings = result["timings_ms"]
+        row = {
+            "words": n_words, "chunks": result["chunks"], "depth": result["depth"],
+            "split_ms": timings["split"], "map_ms": timings["map"],
+            "reduce_ms": sum(timings["reduce"]), "total_ms": timings["total"],
+        }
+        rows.append(row)
+        print(f"words={n_words:<7} chunks={row['chunks']:<4} depth={row['depth']} "
+              f"split={row['split_ms']:8.1f}ms map={row['map_ms']:10.1f}ms "
+              f"reduce={row['reduce_ms']:10.1f}ms total={row['total_ms']:10.1f}ms")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[1000, 4000, 16000, 64000])
+    parser.add_argument("--chunk-tokens", type=int)
+    parser.add_argument("--overlap-tokens", type=int)
+    parser.add_argument("--fan-in", type=int)
+    parser.add_argument("--max-depth", type=int)
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+    options = {
+        name: value for name, value in vars(args).items()
+        if name not in ("words", "json") and value is not None
+    }
+    processor = TextProcessor(**options)
+    processor.summarize_long(make_document(200))  # Warm-up: loads the local model
+    results = {"options": options, "runs": run(args.words, processor)}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
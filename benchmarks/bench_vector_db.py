@@ -0,0 +1,126 @@
+"""Compare the NumPy VectorDB with the original pure-Python implementation.
+
+Usage::
+
+    python -m benchmarks.bench_vector_db --sizes 10000 100000 1000000 --dim 384
+
+The pure-Python baseline is O(N*D) per query in the interpreter, so it is only
+run up to ``--naive-limit`` vectors (100k by default). With ``--disk DIR`` the
+same vectors are also written to an on-disk index and the time to reopen it
+and answer a first query is reported.
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from src.core.knowledge_base.vector_db import VectorDB
+
+
+class NaiveVectorDB:
+    """The list-of-lists implementation VectorDB replaced, kept for comparison."""
+
+    def __init__(self):
+        self.vectors = []
+        self.texts = []
+
+    def add(self, embedding, text):
+        self.vectors.append(embedding)
+        self.texts.append(text)
+
+    def search(self, embedding, top_k=1):
+        scores = [sum(e * q for e, q in zip(vec, embedding)) for vec in self.vectors]
+        best_indices = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:top_k]
+        return [self.texts[i] for i in best_indices]
+
+
+def _time_per_query(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def _time_disk_open(directory, data, texts, query, top_k):
+    path = os.path.join(directory, f"index-{len(texts)}")
+    shutil.rmtree(path, ignore_errors=True)
+    VectorDB(path=path).add_batch(data, texts)
+    start = time.perf_counter()
+    db = VectorDB(path=path)
+    open_s = time.perf_counter() - start
+    db.search(query, top_k)
+    first_query_s = time.perf_counter() - start - open_s
+    shutil.rmtree(path, ignore_errors=True)
+    return open_s, first_query_s
+
+
+def run(sizes, dim, num_queries, top_k, naive_limit, disk_dir=None, seed=0):
+    rng = np.random.default_rng(seed)
+    results = []
+    for n in sizes:
+        data = rng.standard_normal((n, dim), dtype=np.float32)
+        queries = rng.standard_normal((num_queries, dim), dtype=np.float32)
+        texts = [str(i) for i in range(n)]
+
+        db = VectorDB(metric="dot")
+        start = time.perf_counter()
+        db.add_batch(data, texts)
+        build_s = time.perf_counter() - start
+        numpy_q = _time_per_query(lambda q: db.search(q, top_k), queries)
+        start = time.perf_counter()
+        db.search_batch(queries, top_k)
+        batch_q = (time.perf_counter() - start) / num_queries
+        row = {
+            "n": n,
+            "dim": dim,
+            "build_s": build_s,
+            "numpy_ms_per_query": numpy_q * 1000,
+            "numpy_batch_ms_per_query": batch_q * 1000,
+            "naive_ms_per_query": None,
+        }
+        if disk_dir:
+            open_s, first_s = _time_disk_open(disk_dir, data, texts, queries[0], top_k)
+            row["disk_open_ms"] = open_s * 1000
+            row["disk_first_query_ms"] = first_s * 1000
+
+        if n <= naive_limit:
+            naive = NaiveVectorDB()
+            for vec, text in zip(data.tolist(), texts):
+                naive.add(vec, text)
+            # A couple of queries is enough: the naive path is very slow
+            naive_queries = queries[: min(3, num_queries)].tolist()
+            row["naive_ms_per_query"] = _time_per_query(
+                lambda q: naive.search(q, top_k), naive_queries
+            ) * 1000
+        results.append(row)
+        naive_ms = row["naive_ms_per_query"]
+        print(
+            f"n={n:>9,} numpy={row['numpy_ms_per_query']:9.3f}ms "
+            f"batch={row['numpy_batch_ms_per_query']:9.3f}ms "
+            f"naive={'skipped' if naive_ms is None else f'{naive_ms:.1f}ms'}"
+            + (f" disk_open={row['disk_open_ms']:.3f}ms" if disk_dir else "")
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--naive-limit", type=int, default=100_000)
+    parser.add_argument("--disk", help="Directory for timing on-disk index open")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+    results = run(args.sizes, args.dim, args.queries, args.top_k, args.naive_limit, args.disk)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List
+
+
+class LazyAgentRegistry(Mapping):
+    """Mapping of agent name to instance that builds each agent on first use.
+
+    Expert agents load models and LLM clients in their constructors, so
+    deferring construction keeps process start-up cheap. Construction is
+    guarded per agent so concurrent first requests build a single instance.
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]]):
+        self._factories = dict(factories)
+        self._instances: Dict[str, Any] = {}
+        self._locks = {name: threading.Lock() for name in self._factories}
+
+    def __getitem__(self, name: str) -> Any:
+        agent = self._instances.get(name)
+        if agent is None:
+            with self._locks[name]:
+                agent = self._instances.get(name)
+                if agent is None:
+                    agent = self._factories[name]()
+                    self._instances[name] = agent
+        return agent
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def peek(self, name: str) -> Any:
+        """Return the agent if it has already been built, without building it."""
+        return self._instances.get(name)
+
+    def loaded(self) -> List[str]:
+        """Names of the agents that have been instantiated so far."""
+        return [name for name in self._factories if name in self._instances]
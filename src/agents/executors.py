@@ -0,0 +1,104 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Blocking work per agent: LLM and web calls are I/O bound, BLIP and PDF parsing are CPU bound
+DEFAULT_LIMITS = {
+    "text": {"max_workers": 8, "max_queue": 64},
+    "image": {"max_workers": 2, "max_queue": 16},
+    "file": {"max_workers": 2, "max_queue": 16},
+    "link": {"max_workers": 16, "max_queue": 64},
+}
+
+
+class AgentBusyError(RuntimeError):
+    """Raised when an agent's executor queue is full."""
+
+
+class AgentExecutor:
+    """Size-limited thread pool for one expert agent.
+
+    At most ``max_workers`` calls run at once and at most ``max_queue`` more
+    may wait; further submissions are rejected with ``AgentBusyError`` so a
+    slow agent type sheds load instead of piling up work.
+    """
+
+    def __init__(self, name: str, max_workers: int = 4, max_queue: int = 64):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"agent-{name}")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.peak_queued = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on this agent's pool and await the result."""
+        with self._lock:
+            if self.queued + self.running >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise AgentBusyError(f"{self.name} agent is at capacity")
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._call, fn, args)
+
+    def _call(self, fn: Callable[..., Any], args: tuple) -> Any:
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            result = fn(*args)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        else:
+            with self._lock:
+                self.completed += 1
+            return result
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+class AgentExecutorPool:
+    """One ``AgentExecutor`` per agent type, configured from the ``agent_executors`` section."""
+
+    def __init__(self, names, config: Optional[Dict[str, Dict[str, int]]] = None):
+        config = config or {}
+        self.executors: Dict[str, AgentExecutor] = {}
+        for name in names:
+            limits = {**DEFAULT_LIMITS.get(name, {}), **config.get(name, {})}
+            self.executors[name] = AgentExecutor(name, **limits)
+
+    async def run(self, name: str, fn: Callable[..., Any], *args: Any) -> Any:
+        return await self.executors[name].run(fn, *args)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: executor.stats() for name, executor in self.executors.items()}
+
+    def shutdown(self, wait: bool = False) -> None:
+        for executor in self.executors.values():
+            executor.shutdown(wait=wait)
@@ -1,55 +1,74 @@
-from typing import Dict, Any
-import PyPDF2
-import pandas as pd
-from io import StringIO
+from typing import Dict, Any, Optional, Sequence
 from datetime import datetime
 
+from src.services.file_processing.csv_processor import CSVProfiler
+from src.services.file_processing.pdf_processor import PDFProcessor
+from src.services.file_processing.text_processor import TextProcessor
+
 class FileAgent:
     def __init__(self):
-        pass
+        # The summarization model is only loaded on the first summarized PDF
+        self.text_processor = TextProcessor()
 
-    def process(self, file_path: str, file_type: str) -> Dict[str, Any]:
+    def process(self, file_path: str, file_type: str,
+                pages: Optional[Sequence[int]] = None, summarize: bool = False) -> Dict[str, Any]:
         """
         Process the file input based on its type.
+
+        ``pages`` limits PDF extraction to ``[first, last]`` (1-based, inclusive).
+        With ``summarize`` the extracted PDF text is also summarized, however
+        long, and the summary is added to the metadata.
         """
         if file_type == "pdf":
-            return self._process_pdf(file_path)
+            return self._process_pdf(file_path, pages, summarize)
         elif file_type == "csv":
             return self._process_csv(file_path)
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
 
-    def _process_pdf(self, file_path: str) -> Dict[str, Any]:
+    def _process_pdf(self, file_path: str, pages: Optional[Sequence[int]] = None,
+                     summarize: bool = False) -> Dict[str, Any]:
         """
         Extract text from a PDF file.
         """
-        with open(file_path, "rb") as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text()
+        first, last = (pages[0], pages[1]) if pages else (1, None)
+        numbers, texts = [], []
+        for number, page_text in PDFProcessor.iter_pages(file_path, first, last):
+            numbers.append(number)
+            texts.append(page_text)
+        text = "".join(texts)
 
+        metadata = {
+            "file_type": "pdf",
+            "pages": [numbers[0], numbers[-1]] if numbers else [],
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        if summarize and text.strip():
+            metadata["summary"] = self.text_processor.summarize_long(text)
         return {
             "type": "file",
             "input": file_path,
             "output": text,
-            "metadata": {
-                "file_type": "pdf",
-                "timestamp": datetime.utcnow().isoformat()
-            }
+            "metadata": metadata
         }
 
     def _process_csv(self, file_path: str) -> Dict[str, Any]:
         """
-        Extract data from a CSV file.
+        Profile a CSV file in chunks and return the profile with a bounded sample.
         """
-        df = pd.read_csv(file_path)
+        profile = CSVProfiler().profile(file_path)
         return {
             "type": "file",
             "input": file_path,
-            "output": df.to_dict(),
+            "output": {
+                "rows": profile["rows"],
+                "columns": profile["columns"],
+                "sample": profile["sample"],
+            },
             "metadata": {
                 "file_type": "csv",
+                "engine": profile["engine"],
+                "chunks": profile["chunks"],
                 "timestamp": datetime.utcnow().isoformat()
             }
         }
\ No newline at end of file
@@ -1,10 +1,10 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import asyncio
 import os
-from src.services.azure_client import caption_image
-from PIL import Image
-import requests
-from io import BytesIO
-from transformers import BlipProcessor, BlipForConditionalGeneration
+from src.services.azure_client import caption_image, acaption_image
+from src.services.file_processing.image_processor import load_image
+from src.models.model_loader import get_model_manager
+from src.agents.executors import AgentExecutor
 from datetime import datetime
 
 class ImageAgent:
@@ -12,8 +12,9 @@ class ImageAgent:
         self.model_name = model_name
         self.use_azure = bool(os.environ.get("AZURE_IMAGE_CAPTION_ENDPOINT"))
         if not self.use_azure:
-            self.processor = BlipProcessor.from_pretrained(model_name)
-            self.model = BlipForConditionalGeneration.from_pretrained(model_name)
+            # Concurrent requests are batched into one BLIP ``generate`` call on a
+            # captioner shared through the model manager
+            self.models = get_model_manager()
 
     def process(self, image_url: str) -> Dict[str, Any]:
         """
@@ -22,15 +23,31 @@ class ImageAgent:
         if self.use_azure:
             caption = caption_image(image_url)
         else:
-            # Load image from URL
-            response = requests.get(image_url)
-            image = Image.open(BytesIO(response.content)).convert("RGB")
+            image = load_image(image_url)
+            with self.models.use("image_caption", self.model_name) as captioner:
+                caption = captioner.caption(image)
 
-            # Generate caption locally
-            inputs = self.processor(image, return_tensors="pt")
-            out = self.model.generate(**inputs)
-            caption = self.processor.decode(out[0], skip_special_tokens=True)
+        return self._result(image_url, caption)
 
+    async def aprocess(self, image_url: str, executor: Optional[AgentExecutor] = None) -> Dict[str, Any]:
+        """
+        Async variant of ``process`` that holds no thread while waiting: the
+        Azure path uses the shared connection pool and the local path awaits
+        its slot in the BLIP batch queue. The image is downloaded on
+        ``executor``, the image agent's bounded pool, when one is given.
+        """
+        if self.use_azure:
+            caption = await acaption_image(image_url)
+        else:
+            if executor is not None:
+                image = await executor.run(load_image, image_url)
+            else:
+                image = await asyncio.to_thread(load_image, image_url)
+            async with self.models.ause("image_caption", self.model_name) as captioner:
+                caption = await captioner.acaption(image)
+        return self._result(image_url, caption)
+
+    def _result(self, image_url: str, caption: str) -> Dict[str, Any]:
         return {
             "type": "image",
             "input": image_url,
@@ -1,32 +1,63 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import os
+import time
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 
+from src.core.cache.http_cache import HTTPCache, get_http_cache
+from src.services.file_processing.html_processor import fetch_page_summary
+
+MAX_PAGE_BYTES = int(os.environ.get("LINK_MAX_PAGE_BYTES", str(2 * 1024 * 1024)))
+CONNECT_TIMEOUT = float(os.environ.get("LINK_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.environ.get("LINK_READ_TIMEOUT", "10"))
+
 class LinkAgent:
-    def __init__(self):
-        pass
+    def __init__(self, max_bytes: int = MAX_PAGE_BYTES,
+                 timeout: tuple = (CONNECT_TIMEOUT, READ_TIMEOUT),
+                 http_cache: Optional[HTTPCache] = None):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.http_cache = http_cache if http_cache is not None else get_http_cache()
+        self.session = requests.Session()  # Reuses connections across lookups
 
     def process(self, url: str) -> Dict[str, Any]:
         """
         Process the link and extract relevant information.
+
+        The page is streamed up to ``max_bytes`` and parsing stops once the
+        title and first meaningful paragraph have been read. Results are kept
+        in the shared HTTP cache and revalidated with conditional requests.
+        Cached results are flagged with ``cached``; ``timings`` always
+        describe this call, not the request that filled the cache.
         """
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        start = time.perf_counter()
+        request = {"fetch_ms": 0.0, "parse_ms": 0.0}  # Filled when a request is made
+
+        def fetch(request_headers):
+            page = fetch_page_summary(self.session, url, max_bytes=self.max_bytes,
+                                      timeout=self.timeout, headers=request_headers)
+            request.update(fetch_ms=page["fetch_ms"], parse_ms=page["parse_ms"])
+            return page["status_code"], page.pop("headers"), page
 
-        # Extract title and first paragraph
-        title = soup.title.string if soup.title else "No Title"
-        first_paragraph = soup.find("p").get_text() if soup.find("p") else "No Content"
+        page, cache_outcome = self.http_cache.get_or_fetch(url, "summary", fetch)
+        cached = cache_outcome in ("hit", "revalidated")
 
         return {
             "type": "link",
             "input": url,
             "output": {
-                "title": title,
-                "content": first_paragraph
+                "title": page["title"] or "No Title",
+                "content": page["content"] or "No Content"
             },
             "metadata": {
                 "source": url,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow().isoformat(),
+                "status_code": page["status_code"],
+                "bytes_read": page["bytes_read"],
+                "truncated": page["truncated"],
+                "stopped_early": page["stopped_early"],
+                "timings": {**request, "total_ms": round((time.perf_counter() - start) * 1000, 2)},
+                "cached": cached,
+                "cache": cache_outcome,
             }
-        }
\ No newline at end of file
+        }
@@ -1,19 +1,27 @@
-from typing import Dict, Any
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
+from typing import Dict, Any, Iterator, Optional
 import os
 from datetime import datetime
-from langchain.llms import OpenAI, AzureOpenAI
 
 try:  # Optional Gemini dependency
     import google.generativeai as genai
 except Exception:  # pragma: no cover - optional
     genai = None
 
+from src.core.cache.response_cache import ResponseCache
+
 class TextAgent:
-    def __init__(self, model_name: str = "gpt-3.5-turbo"):
+    def __init__(self, model_name: str = "gpt-3.5-turbo",
+                 response_cache: Optional[ResponseCache] = None):
+        # Deferred so importing this module does not pull in langchain
+        from langchain.chains import LLMChain
+        from langchain.prompts import PromptTemplate
+        from langchain.llms import OpenAI, AzureOpenAI
+
         self.model_name = model_name
         self.provider = "openai"
+        # Identifies the deployed model in response cache keys
+        self.cache_model = model_name
+        self.response_cache = response_cache if response_cache is not None else ResponseCache()
 
         gemini_key = os.environ.get("GEMINI_API_KEY")
         if gemini_key and genai is not None:
@@ -22,13 +30,15 @@ class TextAgent:
                 model_name = os.environ.get("GEMINI_MODEL_NAME", "gemini-pro")
                 self.gemini_model = genai.GenerativeModel(model_name)
                 self.provider = "gemini"
+                self.cache_model = model_name
             except Exception:  # pragma: no cover - missing dependency
                 self.gemini_model = None
 
         if self.provider != "gemini":
             if os.environ.get("AZURE_OPENAI_ENDPOINT"):
+                self.cache_model = os.environ.get("AZURE_OPENAI_DEPLOYMENT_NAME", model_name)
                 self.llm = AzureOpenAI(
-                    deployment_name=os.environ.get("AZURE_OPENAI_DEPLOYMENT_NAME", model_name),
+                    deployment_name=self.cache_model,
                     api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
                     azure_endpoint=os.environ.get("AZURE_OPENAI_ENDPOINT"),
                 )
@@ -47,22 +57,77 @@ class TextAgent:
         else:
             self.chain = None
 
-    def process(self, input_text: str) -> Dict[str, Any]:
+    def _generate(self, input_text: str, prompt: str) -> str:
+        if self.provider == "gemini" and self.gemini_model is not None:
+            result = self.gemini_model.generate_content(prompt)
+            return result.text if hasattr(result, "text") else str(result)
+        return self.chain.run(input_text=input_text)
+
+    def process(self, input_text: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Process the text input and generate a response.
+
+        Repeated prompts are answered from the response cache unless
+        ``use_cache`` is False.
         """
-        if self.provider == "gemini" and self.gemini_model is not None:
-            prompt = self.prompt_template.format(input_text=input_text)
-            result = self.gemini_model.generate_content(prompt)
-            response = result.text if hasattr(result, "text") else str(result)
+        prompt = self.prompt_template.format(input_text=input_text)
+        response, tier = self.response_cache.get_or_generate(
+            self.provider, self.cache_model, prompt,
+            lambda: self._generate(input_text, prompt), use_cache=use_cache,
+        )
+        return self.build_result(input_text, response, cache=tier)
+
+    def stream(self, input_text: str, use_cache: bool = True,
+               meta: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Yield the response in chunks as the provider generates it.
+
+        A cached response is yielded as a single chunk; a fully streamed
+        response is added to the cache. The cache tier that answered (or
+        ``None``) is stored in ``meta["cache"]`` when ``meta`` is given.
+        """
+        meta = {} if meta is None else meta
+        meta["cache"] = None
+        prompt = self.prompt_template.format(input_text=input_text)
+        cache = self.response_cache if use_cache and self.response_cache.enabled else None
+        if cache is None:
+            self.response_cache.record_bypass()
         else:
-            response = self.chain.run(input_text=input_text)
+            response, tier = cache.lookup(self.provider, self.cache_model, prompt)
+            if response is not None:
+                meta["cache"] = tier
+                yield response
+                return
+        chunks = []
+        for chunk in self._stream_provider(input_text, prompt):
+            chunks.append(chunk)
+            yield chunk
+        if cache is not None:
+            cache.store(self.provider, self.cache_model, prompt, "".join(chunks))
+
+    def _stream_provider(self, input_text: str, prompt: str) -> Iterator[str]:
+        if self.provider == "gemini" and self.gemini_model is not None:
+            for chunk in self.gemini_model.generate_content(prompt, stream=True):
+                text = getattr(chunk, "text", None)
+                if text:
+                    yield text
+        elif hasattr(self.llm, "stream"):
+            for chunk in self.llm.stream(prompt):
+                text = chunk if isinstance(chunk, str) else getattr(chunk, "content", str(chunk))
+                if text:
+                    yield text
+        else:  # Provider without streaming support: a single chunk
+            yield self.chain.run(input_text=input_text)
+
+    def build_result(self, input_text: str, response: str,
+                     cache: Optional[str] = None) -> Dict[str, Any]:
         return {
             "type": "text",
             "input": input_text,
             "output": response,
             "metadata": {
                 "model": self.model_name,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow().isoformat(),
+                "cache": cache,
             }
         }
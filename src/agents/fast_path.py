@@ -0,0 +1,93 @@
+import mimetypes
+import os
+from collections import Counter
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "bmp", "webp", "tiff", "tif", "svg"}
+FILE_EXTENSIONS = {"pdf", "csv"}
+URL_SCHEMES = {"http", "https"}
+
+
+class FastPathClassifier:
+    """Deterministic pre-classifier that settles obvious inputs without a model.
+
+    Tiers are tried in order: upload metadata, URL parsing and local file
+    extensions. Anything left over is reported as ``None`` so the caller can
+    fall back to zero-shot classification.
+    """
+
+    TIERS = ("metadata", "url", "extension", "fallthrough")
+
+    def __init__(self, image_extensions=None, file_extensions=None):
+        self.image_extensions = set(image_extensions or IMAGE_EXTENSIONS)
+        self.file_extensions = set(file_extensions or FILE_EXTENSIONS)
+        self.hits: Counter = Counter({tier: 0 for tier in self.TIERS})
+
+    def classify(self, state: Dict[str, Any]) -> Optional[str]:
+        """Return a label for ``state`` or ``None`` if the input is ambiguous."""
+        for tier, rule in (
+            ("metadata", self._from_metadata),
+            ("url", self._from_url),
+            ("extension", self._from_extension),
+        ):
+            label = rule(state)
+            if label is not None:
+                self.hits[tier] += 1
+                return label
+        self.hits["fallthrough"] += 1
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.hits)
+
+    def _label_for_extension(self, ext: str) -> Optional[str]:
+        ext = ext.lstrip(".").lower()
+        if ext in self.image_extensions:
+            return "image"
+        if ext in self.file_extensions:
+            return "file"
+        return None
+
+    def _label_for_mime(self, mime: str) -> Optional[str]:
+        mime = mime.split(";")[0].strip().lower()
+        if mime.startswith("image/"):
+            return "image"
+        ext = mimetypes.guess_extension(mime) or ""
+        if mime == "text/csv":
+            ext = ".csv"
+        return self._label_for_extension(ext)
+
+    def _from_metadata(self, state: Dict[str, Any]) -> Optional[str]:
+        # The /upload route attaches ``file_type``; callers may also send a MIME type.
+        file_type = state.get("file_type")
+        if file_type:
+            return self._label_for_extension(str(file_type)) or "file"
+        mime = state.get("mime_type") or state.get("content_type")
+        if mime:
+            return self._label_for_mime(str(mime))
+        return None
+
+    def _from_url(self, state: Dict[str, Any]) -> Optional[str]:
+        text = str(state.get("input", "")).strip()
+        if not text or any(c.isspace() for c in text):
+            return None
+        if text.startswith("data:"):
+            return self._label_for_mime(text[5:].split(",", 1)[0])
+        parsed = urlparse(text)
+        if parsed.scheme.lower() not in URL_SCHEMES or not parsed.netloc:
+            return None
+        ext = os.path.splitext(parsed.path)[1]
+        if self._label_for_extension(ext) == "image":
+            return "image"
+        return "link"
+
+    def _from_extension(self, state: Dict[str, Any]) -> Optional[str]:
+        text = str(state.get("input", "")).strip()
+        if not text or any(c.isspace() for c in text) or "://" in text:
+            return None
+        ext = os.path.splitext(text)[1]
+        label = self._label_for_extension(ext)
+        if label == "file":
+            state.setdefault("file_type", ext.lstrip(".").lower())
+        return label
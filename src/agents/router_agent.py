@@ -1,46 +1,68 @@
-from typing import Literal, Dict, Any
+from typing import Literal, Dict, Any, List, AsyncIterator, Iterator, Optional
+import asyncio
+import functools
+import threading
+from contextlib import ExitStack, contextmanager
 from langgraph.graph import MessageGraph
 from .expert_agents.text_agent import TextAgent
 from .expert_agents.image_agent import ImageAgent
 from .expert_agents.file_agent import FileAgent
 from .expert_agents.link_agent import LinkAgent
+from .agent_registry import LazyAgentRegistry
+from .executors import AgentExecutorPool
+from .fast_path import FastPathClassifier
 import os
-from src.services.azure_client import zero_shot_classify
+from src.services.azure_client import zero_shot_classify, azero_shot_classify
 from src.core.memory.short_term import ShortTermMemory
 from src.core.memory.long_term import LongTermMemory
 from src.services.cosmos_client import CosmosConversationLogger
+from src.core.cache.classification_cache import ClassificationCache
+from src.core.cache.response_cache import ResponseCache
+from src.services.batching import MicroBatcher
+from src.models.model_loader import ModelUnavailableError, get_model_manager
+
+# Longest wait for the next streamed chunk before a stalled provider is abandoned
+STREAM_IDLE_TIMEOUT = float(os.environ.get("STREAM_IDLE_TIMEOUT", "60"))
 
-try:
-    from transformers import pipeline  # Fallback when Azure is not configured
-except Exception:  # pragma: no cover - transformers may not be installed
-    pipeline = None
 
 class RouterAgent:
     def __init__(self, config: Dict[str, Any]):
-        self.agents = {
-            "text": TextAgent(),
-            "image": ImageAgent(),
-            "file": FileAgent(),
-            "link": LinkAgent()
-        }
-        
-        # Determine whether Azure endpoints are configured
+        # Repeated text prompts are answered without another LLM call
+        self.response_cache = ResponseCache.from_config(
+            config.get("response_cache") if config else None
+        )
+
+        # Expert agents (and their models/LLM clients) are built on first use
+        self.agents = LazyAgentRegistry({
+            "text": functools.partial(TextAgent, response_cache=self.response_cache),
+            "image": ImageAgent,
+            "file": FileAgent,
+            "link": LinkAgent,
+        })
+
+        # Blocking agent work runs on per-agent, size-limited thread pools
+        self.executors = AgentExecutorPool(
+            ["text", "image", "file", "link"],
+            config.get("agent_executors") if config else None,
+        )
+
+        # Determine whether Azure endpoints are configured; the local
+        # classifier is shared through the model manager and loaded on first use
         self.use_azure = bool(os.environ.get("AZURE_OPENAI_CLASSIFY_ENDPOINT"))
-        if not self.use_azure and pipeline is not None:
-            # Fallback to local transformers pipeline
-            self.classifier = pipeline(
-                "zero-shot-classification",
-                model="facebook/bart-large-mnli",
-            )
-        else:
-            self.classifier = None
-        
+        self.models = get_model_manager()
+        self._classifier_unavailable = False
+
         # Memory components
         mem_cfg = config.get("memory", {}) if config else {}
         capacity = mem_cfg.get("short_capacity", 5)
-        storage = mem_cfg.get("long_path", "long_term_memory.json")
-        self.short_term = ShortTermMemory(capacity=capacity)
+        storage = mem_cfg.get("long_path", "long_term_memory.db")
         self.long_term = LongTermMemory(storage_path=storage)
+        # Summaries are computed off the request path and persisted to long-term memory
+        self.short_term = ShortTermMemory(
+            capacity=capacity,
+            on_summary=self.long_term.aadd,
+            debounce=mem_cfg.get("summary_debounce", 0.5),
+        )
 
         # Optional Cosmos DB logging
         cosmos_cfg = config.get("cosmos", {}) if config else {}
@@ -49,56 +71,177 @@ class RouterAgent:
         container_name = cosmos_cfg.get("container", os.environ.get("AZURE_COSMOS_CONTAINER", "conversations"))
         if conn_str:
             try:
-                self.cosmos_logger = CosmosConversationLogger(conn_str, db_name, container_name)
+                # Writes are queued and batched off the request path; see ``close``
+                options = {
+                    key: cosmos_cfg[key]
+                    for key in ("batch_size", "flush_interval", "max_queue", "overflow", "spill_path",
+                                "block_timeout", "replay_max_backoff")
+                    if key in cosmos_cfg
+                }
+                self.cosmos_logger = CosmosConversationLogger.from_connection_string(
+                    conn_str, db_name, container_name, **options
+                )
             except Exception:  # pragma: no cover - optional dependency
                 self.cosmos_logger = None
         else:
             self.cosmos_logger = None
 
+        # Configure available labels for classification
+        self.labels = ["text", "image", "file", "link"]
+
         # Define the workflow graph
         self.workflow = MessageGraph()
         self._build_workflow()
 
-        # Configure available labels for classification
-        self.labels = ["text", "image", "file", "link"]
+        # Rule-based tier that settles URLs, uploads and file paths without a model
+        routing_cfg = config.get("routing", {}) if config else {}
+        self.fast_path = FastPathClassifier(
+            image_extensions=routing_cfg.get("image_extensions"),
+            file_extensions=routing_cfg.get("file_extensions"),
+        )
+        self.classification_cache = ClassificationCache.from_config(
+            config.get("classification_cache") if config else None
+        )
+
+        # Coalesce concurrent local classifications into batched pipeline calls
+        batch_cfg = config.get("classifier_batching", {}) if config else {}
+        if not self.use_azure and batch_cfg.get("enabled", True):
+            self.classifier_batcher = MicroBatcher(
+                self._classify_batch,
+                max_batch_size=batch_cfg.get("max_batch_size", 16),
+                max_wait_ms=batch_cfg.get("max_wait_ms", 5.0),
+                name="classifier-batch",
+            )
+        else:
+            self.classifier_batcher = None
+
+    @property
+    def classifier(self):
+        """Shared local zero-shot pipeline, loaded on first access (``None`` if unavailable)."""
+        if self.use_azure or self._classifier_unavailable:
+            return None
+        try:
+            return self.models.get("classification")
+        except ModelUnavailableError:  # transformers may not be installed
+            self._classifier_unavailable = True
+            return None
+
+    @contextmanager
+    def _pinned_classifier(self) -> Iterator[Any]:
+        """Yield the local classifier pinned against eviction for one call (``None`` if unavailable)."""
+        with ExitStack() as stack:
+            classifier = None
+            if not (self.use_azure or self._classifier_unavailable):
+                try:
+                    classifier = stack.enter_context(self.models.use("classification"))
+                except ModelUnavailableError:
+                    self._classifier_unavailable = True
+            yield classifier
+
+    def warm_up(self) -> None:
+        """Load the classifier, preloaded models and every expert agent ahead of the first request."""
+        _ = self.classifier
+        self.models.preload()
+        for name in self.agents:
+            _ = self.agents[name]
+
+    def close(self) -> None:
+        """Drain queued conversation logs and commit buffered long-term writes."""
+        if self.cosmos_logger:
+            self.cosmos_logger.close()
+        self.long_term.close()
+
+    async def aclose(self) -> None:
+        """Finish background summaries, then drain logs and memory; called on application shutdown."""
+        await self.short_term.aclose()
+        await asyncio.to_thread(self.close)
 
     def _classify_input(self, state: Dict[str, Any]) -> Literal["text", "image", "file", "link"]:
+        """Classify input with the fast path, then the cache, then Azure or a local model."""
+        label = self.fast_path.classify(state)
+        if label is not None:
+            return label
+        return self.classification_cache.get_or_classify(
+            str(state["input"]), self.labels, self._model_classify
+        )
+
+    def _model_classify(self, text: str, labels: List[str]) -> Literal["text", "image", "file", "link"]:
         """Classify input using Azure or local model."""
         if self.use_azure:
-            return zero_shot_classify(state["input"], self.labels)
-        elif self.classifier is not None:
-            result = self.classifier(
-                state["input"],
-                candidate_labels=self.labels,
-            )
-            return result["labels"][0]
-        else:
-            return "text"
+            return zero_shot_classify(text, labels)
+        with self._pinned_classifier() as classifier:
+            if classifier is not None:
+                result = classifier(
+                    text,
+                    candidate_labels=labels,
+                )
+                return result["labels"][0]
+            else:
+                return "text"
+
+    async def _aclassify_input(self, state: Dict[str, Any]) -> Literal["text", "image", "file", "link"]:
+        """Async counterpart of ``_classify_input`` that batches local model calls."""
+        label = self.fast_path.classify(state)
+        if label is not None:
+            return label
+        text = str(state["input"])
+        label = self.classification_cache.get(text, self.labels)
+        if label is None:
+            if self.use_azure:
+                label = await azero_shot_classify(text, self.labels)
+            elif self.classifier_batcher is not None:
+                label = await self.classifier_batcher.submit(text)
+            else:
+                label = await asyncio.to_thread(self._model_classify, text, self.labels)
+            self.classification_cache.set(text, self.labels, label)
+        return label
+
+    def _classify_batch(self, texts: List[str]) -> List[str]:
+        """Run the local zero-shot pipeline over a batch of inputs."""
+        with self._pinned_classifier() as classifier:
+            if classifier is None:
+                return ["text"] * len(texts)
+            results = classifier(texts, candidate_labels=self.labels)
+        if isinstance(results, dict):
+            results = [results]
+        return [r["labels"][0] for r in results]
+
+    def routing_stats(self) -> Dict[str, int]:
+        """Per-tier hit counters; ``fallthrough`` counts inputs sent to the model."""
+        return self.fast_path.stats()
 
     def _route_input(self, state: Dict[str, Any]) -> Literal["text", "image", "file", "link"]:
         """Routing decision logic"""
-        input_type = self._classify_input(state)
+        input_type = state.get("route") or self._classify_input(state)
         print(f"Routing to {input_type} agent")
         return input_type
 
+    def _invoke_agent(self, agent_type: str, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Run an expert agent synchronously; called on that agent's worker pool."""
+        agent = self.agents[agent_type]
+        if agent_type == "file":
+            # ``pages`` and ``summarize`` come from the request metadata
+            options = {name: state[name] for name in ("pages", "summarize") if state.get(name)}
+            return agent.process(state["input"], state.get("file_type", ""), **options)
+        if agent_type == "text":
+            return agent.process(state["input"], use_cache=state.get("use_cache", True))
+        return agent.process(state["input"])
+
+    async def _run_agent(self, agent_type: str, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch to an expert agent without blocking the event loop."""
+        agent = self.agents.peek(agent_type)
+        if agent is not None and hasattr(agent, "aprocess"):
+            # Non-blocking agents (pooled Azure client, batched local models) hold no thread
+            return await agent.aprocess(state["input"], executor=self.executors.executors[agent_type])
+        return await self.executors.run(agent_type, self._invoke_agent, agent_type, state)
+
     def _build_workflow(self):
         """Construct the LangGraph workflow"""
         # Add nodes for each agent
         self.workflow.add_node("router", self._route_input)
         
         for agent_type in self.labels:
-            if agent_type == "file":
-                self.workflow.add_node(
-                    agent_type,
-                    lambda state, agent_type=agent_type: self.agents[agent_type].process(
-                        state["input"], state.get("file_type", "")
-                    ),
-                )
-            else:
-                self.workflow.add_node(
-                    agent_type,
-                    lambda state, agent_type=agent_type: self.agents[agent_type].process(state["input"])
-                )
+            self.workflow.add_node(agent_type, functools.partial(self._run_agent, agent_type))
 
         # Define edges
         self.workflow.add_edge("router", "text")
@@ -109,49 +252,61 @@ class RouterAgent:
         # Set entry point
         self.workflow.set_entry_point("router")
 
+    async def _prepare_state(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Log the user turn and build the classified workflow state."""
+        # Add to workflow state
+        state = {"input": input_data["content"]}
+        # ``"cache": false`` in a request bypasses the response cache
+        state["use_cache"] = input_data.get("cache", True) is not False
+        conv_id = input_data.get("conversation_id", "default")
+        if self.cosmos_logger:
+            try:
+                await self.cosmos_logger.alog_message(conv_id, "user", input_data["content"])
+            except Exception:
+                pass
+
+        # Handle special cases for files/links
+        if "metadata" in input_data:
+            state.update(input_data["metadata"])
+
+        # Classify up front so concurrent requests can share a batched model call
+        state["route"] = await self._aclassify_input(state)
+        return state
+
+    async def _finish(self, input_data: Dict[str, Any], node_output: Any) -> Dict[str, Any]:
+        """Record the completed turn in memory and logs, and build the response."""
+        conv_id = input_data.get("conversation_id", "default")
+        text_in = str(input_data.get("content", ""))
+        text_out = (
+            node_output.get("output")
+            if isinstance(node_output, dict)
+            else str(node_output)
+        )
+        self.short_term.add(f"{text_in} {text_out}", conversation_id=conv_id)
+        if self.cosmos_logger:
+            try:
+                await self.cosmos_logger.alog_message(conv_id, "agent", text_out)
+            except Exception:
+                pass
+        return {
+            "status": "success",
+            "result": node_output,
+            "source": "agent"
+        }
+
     async def process_input(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Main entry point for processing requests"""
         try:
-            # Add to workflow state
-            state = {"input": input_data["content"]}
-            conv_id = input_data.get("conversation_id", "default")
-            if self.cosmos_logger:
-                try:
-                    self.cosmos_logger.log_message(conv_id, "user", input_data["content"])
-                except Exception:
-                    pass
-            
-            # Handle special cases for files/links
-            if "metadata" in input_data:
-                state.update(input_data["metadata"])
-            
+            state = await self._prepare_state(input_data)
+
             # Execute the workflow
             results = await self.workflow.astream(state)
-            
+
             # Collect and format results
             async for node_output in results:
                 if node_output is not None:
-                    text_in = str(input_data.get("content", ""))
-                    text_out = (
-                        node_output.get("output")
-                        if isinstance(node_output, dict)
-                        else str(node_output)
-                    )
-                    summary = await self.short_term.add_and_summarize(
-                        f"{text_in} {text_out}"
-                    )
-                    self.long_term.add(summary)
-                    if self.cosmos_logger:
-                        try:
-                            self.cosmos_logger.log_message(conv_id, "agent", text_out)
-                        except Exception:
-                            pass
-                    return {
-                        "status": "success",
-                        "result": node_output,
-                        "source": "agent"
-                    }
-                    
+                    return await self._finish(input_data, node_output)
+
         except Exception as e:
             return {
                 "status": "error",
@@ -163,10 +318,77 @@ class RouterAgent:
             "message": "No agent could process the input"
         }
 
+    async def _stream_text(self, text: str, use_cache: bool = True,
+                           meta: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Bridge ``TextAgent.stream`` from the text executor onto the event loop.
+
+        When the consumer goes away (client disconnect) or no chunk arrives
+        for ``STREAM_IDLE_TIMEOUT`` seconds, the provider stream is closed as
+        soon as its worker thread regains control.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def produce() -> None:
+            chunks = self.agents["text"].stream(text, use_cache=use_cache, meta=meta)
+            try:
+                for chunk in chunks:
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+            finally:
+                chunks.close()  # Releases the provider's HTTP stream
+
+        producer = asyncio.ensure_future(self.executors.run("text", produce))
+        # Runs after every chunk queued by ``produce``, or at once if the executor rejected it
+        producer.add_done_callback(lambda _: queue.put_nowait(done))
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(queue.get(), STREAM_IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"No output from the text provider for {STREAM_IDLE_TIMEOUT:.0f}s")
+                if chunk is done:
+                    break
+                yield chunk
+            await producer  # Re-raise any error from the provider
+        finally:
+            stop.set()
+
+    async def astream_input(self, input_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming entry point.
+
+        Text requests yield ``{"status": "streaming", "delta": ...}`` events as
+        tokens arrive; every request ends with the same response
+        ``process_input`` would return, after memory and logging have seen the
+        full output.
+        """
+        try:
+            state = await self._prepare_state(input_data)
+            route = self._route_input(state)
+            if route == "text":
+                chunks = []
+                meta: Dict[str, Any] = {}
+                async for chunk in self._stream_text(state["input"], state["use_cache"], meta):
+                    chunks.append(chunk)
+                    yield {"status": "streaming", "delta": chunk}
+                node_output = self.agents["text"].build_result(
+                    state["input"], "".join(chunks), cache=meta.get("cache")
+                )
+            else:
+                node_output = await self._run_agent(route, state)
+        except Exception as e:
+            yield {
+                "status": "error",
+                "message": str(e)
+            }
+            return
+        yield await self._finish(input_data, node_output)
+
 # Example usage
 if __name__ == "__main__":
-    import asyncio
-
     async def run_tests():
         router = RouterAgent(config={})
 
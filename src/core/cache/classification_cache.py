@@ -0,0 +1,50 @@
+import re
+from typing import Callable, Dict, Any, Optional, Sequence, Tuple
+
+from .ttl_cache import TTLCache
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCT = " \t\n.!?;,"
+
+
+def normalize_text(text: str) -> str:
+    """Fold case and whitespace so near-identical prompts share a cache entry."""
+    return _WHITESPACE.sub(" ", str(text)).strip(_TRAILING_PUNCT).casefold()
+
+
+class ClassificationCache:
+    """Cache of zero-shot routing decisions keyed by normalized input and label set."""
+
+    def __init__(self, max_size: int = 4096, ttl: Optional[float] = 3600.0):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    @classmethod
+    def from_config(cls, cfg: Optional[Dict[str, Any]]) -> "ClassificationCache":
+        cfg = cfg or {}
+        return cls(max_size=cfg.get("max_size", 4096), ttl=cfg.get("ttl", 3600.0))
+
+    @staticmethod
+    def _key(text: str, labels: Sequence[str]) -> Tuple[str, Tuple[str, ...]]:
+        return normalize_text(text), tuple(labels)
+
+    def get(self, text: str, labels: Sequence[str]) -> Optional[str]:
+        return self._cache.get(self._key(text, labels))
+
+    def set(self, text: str, labels: Sequence[str], label: str) -> None:
+        self._cache.set(self._key(text, labels), label)
+
+    def get_or_classify(self, text: str, labels: Sequence[str],
+                        classify: Callable[[str, Sequence[str]], str]) -> str:
+        """Return the cached label or run ``classify`` and remember its answer."""
+        key = self._key(text, labels)
+        label = self._cache.get(key)
+        if label is None:
+            label = classify(text, labels)
+            self._cache.set(key, label)
+        return label
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
@@ -0,0 +1,273 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .ttl_cache import TTLCache
+
+# ``fetch(request_headers)`` returns ``(status_code, response_headers, value)``;
+# ``value`` is ignored for a 304 response
+Fetcher = Callable[[Dict[str, str]], Tuple[int, Mapping[str, str], Any]]
+
+_TOUCH_INTERVAL = 60.0
+_DIRECTIVE = re.compile(r"([\w-]+)(?:=\"?([^\",]*)\"?)?")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    expires_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at);
+"""
+
+
+def _cache_control(headers: Mapping[str, str]) -> Dict[str, Optional[str]]:
+    value = headers.get("Cache-Control") or headers.get("cache-control") or ""
+    return {m.group(1).lower(): m.group(2) for m in _DIRECTIVE.finditer(value)}
+
+
+def _header(headers: Mapping[str, str], name: str) -> Optional[str]:
+    return headers.get(name) or headers.get(name.lower())
+
+
+class HTTPCache:
+    """Cache of values extracted from HTTP responses, keyed by URL.
+
+    Entries live in SQLite (``path``; ``None`` keeps everything in memory)
+    behind an in-memory LRU front. Freshness follows ``Cache-Control``
+    (``max-age``, ``no-cache``, ``no-store``) and ``Expires``, falling back to
+    ``default_ttl``; ``domain_ttls`` overrides the lifetime for a host and its
+    subdomains. Stale entries with an ``ETag`` or ``Last-Modified`` are
+    revalidated with a conditional GET, so an unchanged page costs a 304. The
+    store is bounded by ``max_entries`` and ``max_bytes``, least recently used
+    first.
+    """
+
+    def __init__(self, path: Optional[str] = "http_cache.db", max_entries: int = 2048,
+                 max_bytes: int = 64 * 1024 * 1024, memory_entries: int = 256,
+                 default_ttl: float = 300.0, domain_ttls: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.domain_ttls = {d.lower().lstrip("."): ttl for d, ttl in (domain_ttls or {}).items()}
+        self._clock = clock
+        self._front = TTLCache(max_size=memory_entries, ttl=None)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, cfg: Optional[Dict[str, Any]]) -> "HTTPCache":
+        cfg = cfg or {}
+        return cls(
+            path=cfg.get("path", os.environ.get("HTTP_CACHE_PATH", "http_cache.db")),
+            max_entries=cfg.get("max_entries", 2048),
+            max_bytes=cfg.get("max_bytes", 64 * 1024 * 1024),
+            memory_entries=cfg.get("memory_entries", 256),
+            default_ttl=cfg.get("default_ttl", 300.0),
+            domain_ttls=cfg.get("domain_ttls"),
+        )
+
+    @staticmethod
+    def _key(url: str, kind: str) -> str:
+        return f"{kind}:{url}"
+
+    def _domain_ttl(self, url: str) -> Optional[float]:
+        host = (urlsplit(url).hostname or "").lower()
+        while host:
+            if host in self.domain_ttls:
+                return self.domain_ttls[host]
+            host = host.partition(".")[2]
+        return None
+
+    def _lifetime(self, url: str, headers: Mapping[str, str]) -> Optional[float]:
+        """Seconds the response stays fresh, or ``None`` if it must not be stored."""
+        directives = _cache_control(headers)
+        if "no-store" in directives:
+            return None
+        override = self._domain_ttl(url)
+        if override is not None:
+            return override
+        if "no-cache" in directives:
+            return 0.0
+        for name in ("s-maxage", "max-age"):
+            if directives.get(name):
+                try:
+                    return max(0.0, float(directives[name]))
+                except ValueError:
+                    pass
+        expires = _header(headers, "Expires")
+        if expires:
+            try:
+                return max(0.0, parsedate_to_datetime(expires).timestamp() - self._clock())
+            except (TypeError, ValueError):
+                return 0.0
+        return self.default_ttl
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._front.get(key)
+        if entry is not None:
+            return entry
+        row = self._conn.execute(
+            "SELECT value, etag, last_modified, expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = {"value": json.loads(row[0]), "etag": row[1], "last_modified": row[2],
+                 "expires_at": row[3], "touched_at": 0.0}
+        self._front.set(key, entry)
+        return entry
+
+    def _save(self, key: str, entry: Dict[str, Any]) -> None:
+        payload = json.dumps(entry["value"])
+        now = self._clock()
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, etag, last_modified, expires_at, size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, payload, entry["etag"], entry["last_modified"], entry["expires_at"],
+                 len(payload), now),
+            )
+            self._evict()
+        entry["touched_at"] = now
+        self._front.set(key, entry)
+
+    def _evict(self) -> None:
+        count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        while count > self.max_entries or (size > self.max_bytes and count > 1):
+            key, entry_size = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._front.pop(key)
+            count, size = count - 1, size - entry_size
+            self.evictions += 1
+
+    def _touch(self, key: str, entry: Dict[str, Any]) -> None:
+        # Recency on disk only drives eviction, so write it at most once a minute per entry
+        now = self._clock()
+        if now - entry.get("touched_at", 0.0) >= _TOUCH_INTERVAL:
+            entry["touched_at"] = now
+            with self._conn:
+                self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+
+    def _begin(self, url: str, kind: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, str]]]:
+        """Return ``(key, entry, request_headers)``; headers are ``None`` on a fresh hit."""
+        key = self._key(url, kind)
+        with self._lock:
+            entry = self._load(key)
+            if entry is not None and entry["expires_at"] > self._clock():
+                self.hits += 1
+                self._touch(key, entry)
+                return key, entry, None
+        request_headers: Dict[str, str] = {}
+        if entry is not None:
+            if entry["etag"]:
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+        return key, entry, request_headers
+
+    def _finish(self, url: str, key: str, entry: Optional[Dict[str, Any]], status: int,
+                headers: Mapping[str, str], value: Any) -> Tuple[Any, str]:
+        with self._lock:
+            if status == 304 and entry is not None:
+                lifetime = self._lifetime(url, headers)
+                entry = {**entry, "expires_at": self._clock() + (lifetime or 0.0)}
+                entry["etag"] = _header(headers, "ETag") or entry["etag"]
+                self._save(key, entry)
+                self.revalidated += 1
+                return entry["value"], "revalidated"
+            self.misses += 1
+            lifetime = self._lifetime(url, headers) if status == 200 else None
+            if lifetime is None:
+                return value, "uncacheable"
+            self._save(key, {
+                "value": value,
+                "etag": _header(headers, "ETag"),
+                "last_modified": _header(headers, "Last-Modified"),
+                "expires_at": self._clock() + lifetime,
+            })
+            return value, "miss"
+
+    def get_or_fetch(self, url: str, kind: str, fetch: Fetcher) -> Tuple[Any, str]:
+        """Return ``(value, outcome)`` for ``url``.
+
+        ``outcome`` is ``"hit"`` (fresh, no request), ``"revalidated"`` (304),
+        ``"miss"`` (downloaded and stored) or ``"uncacheable"``.
+        """
+        key, entry, request_headers = self._begin(url, kind)
+        if request_headers is None:
+            return entry["value"], "hit"
+        return self._finish(url, key, entry, *fetch(request_headers))
+
+    async def aget_or_fetch(self, url: str, kind: str,
+                            fetch: Callable[[Dict[str, str]], Awaitable[tuple]]) -> Tuple[Any, str]:
+        """Async variant of ``get_or_fetch`` for an awaitable ``fetch``.
+
+        SQLite reads and writes run in a worker thread, off the event loop.
+        """
+        key, entry, request_headers = await asyncio.to_thread(self._begin, url, kind)
+        if request_headers is None:
+            return entry["value"], "hit"
+        response = await fetch(request_headers)
+        return await asyncio.to_thread(self._finish, url, key, entry, *response)
+
+    def invalidate(self, url: str, kind: str) -> None:
+        key = self._key(url, kind)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._front.pop(key)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            lookups = self.hits + self.revalidated + self.misses
+            return {
+                "entries": count,
+                "bytes": size,
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+_default_cache: Optional[HTTPCache] = None
+_default_lock = threading.Lock()
+
+
+def get_http_cache() -> HTTPCache:
+    """Process-wide cache shared by the link agent and the knowledge base."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = HTTPCache.from_config(None)
+    return _default_cache
@@ -0,0 +1,238 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .ttl_cache import TTLCache
+
+Embedder = Callable[[str], Sequence[float]]
+
+
+class SemanticIndex:
+    """Bounded set of prompt embeddings searched by cosine similarity.
+
+    Entries are scoped by namespace (provider and model) so answers are never
+    shared across models. The oldest entry is evicted first and entries expire
+    after ``ttl`` seconds.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        # key -> (namespace, unit vector, value, expires_at), oldest first
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # namespace -> {key: unit vector}, and the stacked matrix built from it
+        self._scopes: Dict[Hashable, "OrderedDict[Hashable, np.ndarray]"] = {}
+        self._matrices: Dict[Hashable, Tuple[list, np.ndarray]] = {}
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _unit(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _remove(self, key: Hashable) -> None:
+        namespace = self._entries.pop(key)[0]
+        scope = self._scopes[namespace]
+        del scope[key]
+        if not scope:
+            del self._scopes[namespace]
+        self._matrices.pop(namespace, None)
+
+    def add(self, key: Hashable, namespace: Hashable, embedding: Sequence[float], value: Any) -> None:
+        expires_at = self._clock() + self.ttl if self.ttl is not None else None
+        vector = self._unit(embedding)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (namespace, vector, value, expires_at)
+            self._scopes.setdefault(namespace, OrderedDict())[key] = vector
+            self._matrices.pop(namespace, None)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _purge_expired(self) -> None:
+        # Every entry has the same TTL, so they expire in insertion order
+        now = self._clock()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry[3] is None or entry[3] > now:
+                break
+            self._remove(key)
+            self.expirations += 1
+
+    def search(self, namespace: Hashable, embedding: Sequence[float],
+               threshold: float) -> Optional[Tuple[Any, float]]:
+        """Return ``(value, similarity)`` of the closest entry at or above ``threshold``."""
+        query = self._unit(embedding)
+        with self._lock:
+            self._purge_expired()
+            scope = self._scopes.get(namespace)
+            if not scope:
+                return None
+            cached = self._matrices.get(namespace)
+            if cached is None:
+                cached = self._matrices[namespace] = (list(scope), np.stack(list(scope.values())))
+            keys, matrix = cached
+            if matrix.shape[1] != query.shape[0]:
+                return None
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            if scores[best] < threshold:
+                return None
+            return self._entries[keys[best]][2], float(scores[best])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+            self._matrices.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache:
+    """Two-tier cache of LLM responses.
+
+    The exact tier is keyed by provider, model and the rendered prompt. The
+    optional semantic tier embeds the prompt and returns a cached answer whose
+    prompt embedding has cosine similarity of at least ``similarity_threshold``.
+    Both tiers are bounded by ``max_size`` and expire entries after ``ttl``.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = 3600.0,
+                 embedder: Optional[Embedder] = None, similarity_threshold: float = 0.95,
+                 enabled: bool = True):
+        self.enabled = enabled
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self._exact = TTLCache(max_size=max_size, ttl=ttl)
+        self._semantic = SemanticIndex(max_size=max_size, ttl=ttl) if embedder else None
+        # A miss embeds the prompt for the lookup and again for the store; reuse it
+        self._recent_embeddings = TTLCache(max_size=256, ttl=60.0)
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.embed_errors = 0
+
+    @classmethod
+    def from_config(cls, cfg: Optional[Dict[str, Any]]) -> "ResponseCache":
+        """Build from the ``response_cache`` settings section.
+
+        The semantic tier is used when ``semantic.enabled`` is set and an
+        embedding endpoint is available.
+        """
+        cfg = cfg or {}
+        semantic_cfg = cfg.get("semantic", {})
+        embedder = None
+        if semantic_cfg.get("enabled", False):
+            from src.services.azure_client import embed_text, embedding_configured
+
+            if embedding_configured():
+                embedder = embed_text
+        return cls(
+            max_size=cfg.get("max_size", 1024),
+            ttl=cfg.get("ttl", 3600.0),
+            embedder=embedder,
+            similarity_threshold=semantic_cfg.get("threshold", 0.95),
+            enabled=cfg.get("enabled", True),
+        )
+
+    @staticmethod
+    def _key(provider: str, model: str, prompt: str) -> Tuple[str, str, str]:
+        return provider, model, hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def _embed(self, prompt: str) -> Optional[Sequence[float]]:
+        key = hashlib.sha256(prompt.encode("utf-8")).digest()
+        embedding = self._recent_embeddings.get(key)
+        if embedding is not None:
+            return embedding
+        try:
+            embedding = self.embedder(prompt)
+        except Exception as e:
+            with self._lock:
+                self.embed_errors += 1
+            print(f"Response cache embedding failed: {e}")
+            return None
+        self._recent_embeddings.set(key, embedding)
+        return embedding
+
+    def lookup(self, provider: str, model: str, prompt: str) -> Tuple[Optional[str], Optional[str]]:
+        """Return ``(response, tier)`` where tier is ``"exact"``, ``"semantic"`` or ``None``."""
+        response = self._exact.get(self._key(provider, model, prompt))
+        if response is not None:
+            with self._lock:
+                self.exact_hits += 1
+            return response, "exact"
+        if self._semantic is not None:
+            embedding = self._embed(prompt)
+            if embedding is not None:
+                match = self._semantic.search((provider, model), embedding, self.similarity_threshold)
+                if match is not None:
+                    with self._lock:
+                        self.semantic_hits += 1
+                    return match[0], "semantic"
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    def store(self, provider: str, model: str, prompt: str, response: str) -> None:
+        key = self._key(provider, model, prompt)
+        self._exact.set(key, response)
+        if self._semantic is not None:
+            embedding = self._embed(prompt)
+            if embedding is not None:
+                self._semantic.add(key, (provider, model), embedding, response)
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.bypassed += 1
+
+    def get_or_generate(self, provider: str, model: str, prompt: str,
+                        generate: Callable[[], str], use_cache: bool = True) -> Tuple[str, Optional[str]]:
+        """Return ``(response, tier)``, calling ``generate`` on a miss or when bypassed."""
+        if not (self.enabled and use_cache):
+            self.record_bypass()
+            return generate(), None
+        response, tier = self.lookup(provider, model, prompt)
+        if response is None:
+            response = generate()
+            self.store(provider, model, prompt, response)
+        return response, tier
+
+    def clear(self) -> None:
+        self._exact.clear()
+        if self._semantic is not None:
+            self._semantic.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        exact = self._exact.stats()
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "semantic": self._semantic is not None,
+                "size": exact["size"],
+                "max_size": exact["max_size"],
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "evictions": exact["evictions"],
+                "expirations": exact["expirations"],
+                "embed_errors": self.embed_errors,
+            }
@@ -1,10 +1,163 @@
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
 import requests
 from bs4 import BeautifulSoup
 
+try:  # Optional async HTTP dependency
+    import httpx
+except Exception:  # pragma: no cover - optional
+    httpx = None
+
+from src.core.cache.http_cache import HTTPCache, get_http_cache
+from src.services.azure_client import close_stale_client
+
+FETCH_TIMEOUT = float(os.environ.get("KB_FETCH_TIMEOUT", "10"))
+FETCH_MAX_CONCURRENCY = int(os.environ.get("KB_FETCH_MAX_CONCURRENCY", "32"))
+FETCH_PER_HOST_LIMIT = int(os.environ.get("KB_FETCH_PER_HOST_LIMIT", "4"))
+
 
-def fetch_url_text(url: str) -> str:
-    """Retrieve the visible text from a web page."""
-    resp = requests.get(url, timeout=10)
-    resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
+def _visible_text(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
     return " ".join(soup.stripped_strings)
+
+
+def fetch_url_text(url: str, cache: Optional[HTTPCache] = None) -> str:
+    """Retrieve the visible text from a web page.
+
+    Extracted text is cached per URL and revalidated with conditional GETs.
+    """
+    cache = cache if cache is not None else get_http_cache()
+
+    def fetch(request_headers):
+        resp = requests.get(url, timeout=FETCH_TIMEOUT, headers=request_headers)
+        if resp.status_code == 304:
+            return 304, resp.headers, None
+        resp.raise_for_status()
+        return resp.status_code, resp.headers, _visible_text(resp.text)
+
+    return cache.get_or_fetch(url, "text", fetch)[0]
+
+
+class AsyncURLFetcher:
+    """Fetch many pages concurrently over one pooled async client.
+
+    At most ``max_concurrency`` requests run at once and at most
+    ``per_host_limit`` against any single host. Each request gets its own
+    ``timeout`` deadline, counted from when it is sent rather than while it
+    waits for a slot, and a failing URL yields an error result instead of
+    failing the batch. Extracted text goes through the shared HTTP cache, like
+    ``fetch_url_text``.
+    """
+
+    def __init__(self, max_concurrency: int = FETCH_MAX_CONCURRENCY,
+                 per_host_limit: int = FETCH_PER_HOST_LIMIT, timeout: float = FETCH_TIMEOUT,
+                 cache: Optional[HTTPCache] = None):
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.cache = cache
+        self._client = None
+        self._loop = None
+        self._global: Optional[asyncio.Semaphore] = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self.completed = 0
+        self.failed = 0
+
+    def _bind_loop(self) -> None:
+        # Pools and semaphores belong to one event loop; rebuild them if it changes
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            if self._client is not None:
+                close_stale_client(self._client, self._loop, loop)
+            self._loop = loop
+            self._client = None
+            self._global = asyncio.Semaphore(self.max_concurrency)
+            self._hosts = {}
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                timeout=httpx.Timeout(self.timeout),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def _get(self, url: str, request_headers: Dict[str, str], timeout: float) -> tuple:
+        host = urlsplit(url).netloc
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = self._hosts[host] = asyncio.Semaphore(self.per_host_limit)
+        async with self._global, semaphore:
+            # The deadline starts once a slot is free, so queued URLs are not timed out unsent
+            if httpx is None:
+                request = asyncio.to_thread(requests.get, url, timeout=timeout, headers=request_headers)
+            else:
+                request = self._get_client().get(url, headers=request_headers)
+            resp = await asyncio.wait_for(request, timeout)
+        if resp.status_code == 304:
+            return 304, resp.headers, None
+        resp.raise_for_status()
+        # Parsing is CPU bound; keep it off the event loop
+        return resp.status_code, resp.headers, await asyncio.to_thread(_visible_text, resp.text)
+
+    async def fetch(self, url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Fetch one URL; never raises, errors are reported in the result."""
+        self._bind_loop()
+        cache = self.cache if self.cache is not None else get_http_cache()
+        start = time.perf_counter()
+        try:
+            text, outcome = await cache.aget_or_fetch(
+                url, "text", lambda headers: self._get(url, headers, timeout or self.timeout)
+            )
+            result = {"url": url, "ok": True, "text": text, "error": None, "cache": outcome}
+            self.completed += 1
+        except Exception as e:
+            error = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e) or type(e).__name__
+            result = {"url": url, "ok": False, "text": None, "error": error, "cache": None}
+            self.failed += 1
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    async def fetch_many(self, urls: Iterable[str],
+                         timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one result per URL in completion order."""
+        self._bind_loop()
+        tasks = [asyncio.ensure_future(self.fetch(url, timeout)) for url in dict.fromkeys(urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        return {"completed": self.completed, "failed": self.failed}
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_fetcher: Optional[AsyncURLFetcher] = None
+
+
+def get_url_fetcher() -> AsyncURLFetcher:
+    """Return the process-wide fetcher."""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = AsyncURLFetcher()
+    return _fetcher
+
+
+def fetch_many(urls: Iterable[str], timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Fetch the visible text of many URLs concurrently, yielding results as they complete."""
+    return get_url_fetcher().fetch_many(urls, timeout)
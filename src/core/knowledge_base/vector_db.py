@@ -1,35 +1,521 @@
 from __future__ import annotations
+import json
 import os
-from typing import List
+import threading
+from collections.abc import Sequence as SequenceABC
+from typing import List, Optional, Sequence, Tuple, Union
 
-from src.services.azure_client import call_azure
+import numpy as np
 
+try:  # POSIX only; serializes appends from several worker processes
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
-class VectorDB:
-    """Very small in-memory vector store with optional Azure search."""
+from src.services.azure_client import call_azure, acall_azure
+
+METRICS = ("dot", "cosine")
+INDEX_TYPES = ("exact", "ivf")
+
+# Upper bound on the (queries x vectors) score block materialized at once
+_SCORE_BLOCK_BYTES = 64 * 1024 * 1024
+
+SearchResult = Union[List[str], List[Tuple[str, float]]]
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first, using partial selection."""
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(n)
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+def _as_matrix(embeddings, dim: Optional[int] = None) -> np.ndarray:
+    rows = np.asarray(embeddings, dtype=np.float32)
+    if rows.ndim == 1:
+        rows = rows.reshape(1, -1)
+    if rows.ndim != 2:
+        raise ValueError("embeddings must be a vector or a 2-D array")
+    if dim is not None and rows.shape[1] != dim:
+        raise ValueError(f"expected embeddings of dimension {dim}, got {rows.shape[1]}")
+    return rows
 
-    def __init__(self):
-        self.vectors: List[List[float]] = []
+
+def _normalize(rows: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return rows / norms
+
+
+class InMemoryVectorStore:
+    """Contiguous float32 matrix of vectors that grows by amortized doubling."""
+
+    def __init__(self, dim: Optional[int] = None, initial_capacity: int = 1024):
+        self.dim = dim
+        self.initial_capacity = initial_capacity
+        self._matrix: Optional[np.ndarray] = None
+        self._size = 0
         self.texts: List[str] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, rows: np.ndarray, texts: Sequence[str]) -> None:
+        if self.dim is None:
+            self.dim = rows.shape[1]
+        needed = self._size + rows.shape[0]
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        if needed > capacity:
+            capacity = max(capacity, self.initial_capacity)
+            while capacity < needed:
+                capacity *= 2
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            if self._matrix is not None:
+                grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._matrix[self._size:needed] = rows
+        self._size = needed
+        self.texts.extend(texts)
+
+    def matrix(self) -> np.ndarray:
+        """View of the stored rows (no copy)."""
+        if self._matrix is None:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return self._matrix[:self._size]
+
+
+class _MappedTexts(SequenceABC):
+    """Read-only view of the text sidecar: UTF-8 blob plus uint64 end offsets."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, size: int):
+        self._blob = blob
+        self._offsets = offsets
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._size))]
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError(i)
+        start = int(self._offsets[i - 1]) if i else 0
+        return self._blob[start:int(self._offsets[i])].tobytes().decode("utf-8")
+
+
+class MemmapVectorStore:
+    """On-disk vector store that is memory-mapped read-only for search.
+
+    The directory holds ``meta.json`` (dimension and metric), ``vectors.f32``
+    (raw float32 rows), ``texts.bin`` (concatenated UTF-8 texts) and
+    ``texts.idx`` (uint64 end offset per row; the row ID is its position).
+    All data files are append-only, so several worker processes can map the
+    same files and share pages through the OS page cache. Opening an index
+    only maps the files, regardless of how many vectors it holds, and
+    appends made by other processes become visible on the next access.
+    """
+
+    def __init__(self, path: str, dim: Optional[int] = None, metric: str = "dot"):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._meta_path = os.path.join(path, "meta.json")
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._blob_path = os.path.join(path, "texts.bin")
+        self._index_path = os.path.join(path, "texts.idx")
+        self._lock_path = os.path.join(path, ".lock")
+        self._lock = threading.Lock()
+        self.metric = metric
+        self.dim = dim
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r") as f:
+                meta = json.load(f)
+            if dim is not None and dim != meta["dim"]:
+                raise ValueError(f"index at {path} has dimension {meta['dim']}, not {dim}")
+            if meta.get("metric", metric) != metric:
+                raise ValueError(f"index at {path} uses the {meta['metric']} metric, not {metric}")
+            self.dim = meta["dim"]
+        elif dim is not None:
+            self._write_meta()
+        self._mapped_rows = -1
+        self._matrix = np.empty((0, self.dim or 0), dtype=np.float32)
+        self._texts = _MappedTexts(np.empty(0, dtype=np.uint8), np.empty(0, dtype=np.uint64), 0)
+
+    def _write_meta(self) -> None:
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"dim": self.dim, "metric": self.metric, "dtype": "float32", "version": 1}, f)
+        os.replace(tmp, self._meta_path)
+
+    def _rows_on_disk(self) -> int:
+        if self.dim is None:
+            return 0
+        try:
+            vec_rows = os.path.getsize(self._vectors_path) // (4 * self.dim)
+            idx_rows = os.path.getsize(self._index_path) // 8
+        except OSError:
+            return 0
+        # The offset index is written last, so it bounds the fully written rows
+        return min(vec_rows, idx_rows)
+
+    def _refresh(self) -> None:
+        rows = self._rows_on_disk()
+        if rows == self._mapped_rows:
+            return
+        with self._lock:
+            if rows == 0:
+                self._matrix = np.empty((0, self.dim or 0), dtype=np.float32)
+                self._texts = _MappedTexts(np.empty(0, dtype=np.uint8), np.empty(0, dtype=np.uint64), 0)
+            else:
+                self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r",
+                                         shape=(rows, self.dim))
+                offsets = np.memmap(self._index_path, dtype=np.uint64, mode="r", shape=(rows,))
+                blob_len = int(offsets[-1])
+                blob = (np.memmap(self._blob_path, dtype=np.uint8, mode="r", shape=(blob_len,))
+                        if blob_len else np.empty(0, dtype=np.uint8))
+                self._texts = _MappedTexts(blob, offsets, rows)
+            self._mapped_rows = rows
+
+    def __len__(self) -> int:
+        return self._rows_on_disk()
+
+    @property
+    def texts(self) -> Sequence[str]:
+        self._refresh()
+        return self._texts
+
+    def matrix(self) -> np.ndarray:
+        self._refresh()
+        return self._matrix
+
+    def append(self, rows: np.ndarray, texts: Sequence[str]) -> None:
+        """Append rows and their texts; safe across threads and processes."""
+        encoded = [t.encode("utf-8") for t in texts]
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if self.dim is None:
+                    self.dim = rows.shape[1]
+                    self._write_meta()
+                committed = self._rows_on_disk()
+                base = 0
+                if committed:
+                    with open(self._index_path, "rb") as idx:
+                        idx.seek((committed - 1) * 8)
+                        base = int(np.frombuffer(idx.read(8), dtype=np.uint64)[0])
+                with open(self._blob_path, "r+b" if os.path.exists(self._blob_path) else "wb") as blob:
+                    # Text bytes past the last committed row are from a torn write
+                    blob.truncate(base)
+                    blob.seek(base)
+                    blob.write(b"".join(encoded))
+                ends = base + np.cumsum([len(e) for e in encoded], dtype=np.uint64)
+                with open(self._vectors_path, "r+b" if os.path.exists(self._vectors_path) else "wb") as vec:
+                    # Drop any torn row left by a crashed writer before appending
+                    vec.truncate(committed * 4 * self.dim)
+                    vec.seek(0, os.SEEK_END)
+                    vec.write(np.ascontiguousarray(rows, dtype=np.float32).tobytes())
+                with open(self._index_path, "r+b" if os.path.exists(self._index_path) else "wb") as idx:
+                    idx.truncate(committed * 8)
+                    idx.seek(0, os.SEEK_END)
+                    idx.write(ends.astype(np.uint64).tobytes())
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class IVFIndex:
+    """Inverted-file approximate index over the rows of a vector store.
+
+    Rows are clustered into ``nlist`` k-means cells; a query scores only the
+    rows of its ``nprobe`` nearest cells. Raising ``nprobe`` trades speed for
+    recall (``nprobe == nlist`` is exact). New rows are assigned to their
+    nearest existing centroid on insert, and once the store has grown by
+    ``rebuild_factor`` since the last training the centroids are retrained,
+    in a background thread when ``background`` is true, while searches keep
+    using the previous cells. Until the first training completes the caller
+    should fall back to exact search.
+    """
+
+    def __init__(self, nlist: int = 256, nprobe: int = 8, kmeans_iters: int = 10,
+                 train_sample: int = 65536, min_points_per_list: int = 8,
+                 rebuild_factor: float = 2.0, background: bool = True, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.kmeans_iters = kmeans_iters
+        self.train_sample = train_sample
+        self.min_points_per_list = min_points_per_list
+        self.rebuild_factor = rebuild_factor
+        self.background = background
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._centroids: Optional[np.ndarray] = None
+        self._centroid_norms: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._arrays: List[Optional[np.ndarray]] = []
+        self._indexed = 0
+        self._trained_on = 0
+        self._rebuild_thread: Optional[threading.Thread] = None
+        self.rebuilds = 0
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def _nearest_cells(self, rows: np.ndarray, centroids: np.ndarray, norms: np.ndarray,
+                       count: int = 1) -> np.ndarray:
+        # argmin ||x - c||^2 == argmin (||c||^2 - 2 x.c)
+        dists = norms[None, :] - 2.0 * (rows @ centroids.T)
+        if count == 1:
+            return np.argmin(dists, axis=1)[:, None]
+        count = min(count, centroids.shape[0])
+        return np.argpartition(dists, count - 1, axis=1)[:, :count]
+
+    def _train(self, matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        n = matrix.shape[0]
+        nlist = min(self.nlist, n)
+        sample_ids = self._rng.choice(n, size=min(n, self.train_sample), replace=False)
+        sample = np.asarray(matrix[np.sort(sample_ids)], dtype=np.float32)
+        centroids = sample[self._rng.choice(sample.shape[0], size=nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iters):
+            norms = np.einsum("ij,ij->i", centroids, centroids)
+            assign = self._nearest_cells(sample, centroids, norms)[:, 0]
+            counts = np.bincount(assign, minlength=nlist)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = counts == 0
+            centroids[~empty] = sums[~empty] / counts[~empty, None]
+            if empty.any():  # re-seed empty cells with random sample points
+                centroids[empty] = sample[self._rng.choice(sample.shape[0], size=int(empty.sum()))]
+        return centroids, np.einsum("ij,ij->i", centroids, centroids)
+
+    def _assign(self, matrix: np.ndarray, start: int, stop: int, centroids: np.ndarray,
+                norms: np.ndarray, lists: List[List[int]], block: int = 65536) -> None:
+        for lo in range(start, stop, block):
+            hi = min(stop, lo + block)
+            cells = self._nearest_cells(np.asarray(matrix[lo:hi]), centroids, norms)[:, 0]
+            order = np.argsort(cells, kind="stable")
+            bounds = np.flatnonzero(np.diff(cells[order])) + 1
+            for group in np.split(order, bounds):
+                lists[int(cells[group[0]])].extend((group + lo).tolist())
+
+    def _rebuild(self, matrix: np.ndarray) -> None:
+        n = matrix.shape[0]
+        centroids, norms = self._train(matrix)
+        lists: List[List[int]] = [[] for _ in range(centroids.shape[0])]
+        self._assign(matrix, 0, n, centroids, norms, lists)
+        with self._lock:
+            # Rows added while training are re-assigned by the next ``sync``
+            self._centroids, self._centroid_norms = centroids, norms
+            self._lists = lists
+            self._arrays = [None] * len(lists)
+            self._indexed = n
+            self._trained_on = n
+            self.rebuilds += 1
+
+    def rebuild(self, matrix: np.ndarray, wait: bool = False) -> None:
+        """Retrain centroids on the current rows, in the background unless ``wait``."""
+        if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+            if wait:
+                self._rebuild_thread.join()
+            return
+        if not self.background or wait:
+            self._rebuild(matrix)
+            return
+        self._rebuild_thread = threading.Thread(target=self._rebuild, args=(matrix,), daemon=True)
+        self._rebuild_thread.start()
+
+    def sync(self, matrix: np.ndarray) -> None:
+        """Index rows added since the last call and trigger (re)training when due."""
+        n = matrix.shape[0]
+        if not self.trained:
+            if n >= self.nlist * self.min_points_per_list:
+                self.rebuild(matrix)
+            return
+        with self._lock:
+            if n > self._indexed:
+                before = [len(cell) for cell in self._lists]
+                self._assign(matrix, self._indexed, n, self._centroids, self._centroid_norms, self._lists)
+                for cell, size in enumerate(before):
+                    if len(self._lists[cell]) != size:
+                        self._arrays[cell] = None
+                self._indexed = n
+        if n >= self._trained_on * self.rebuild_factor:
+            self.rebuild(matrix)
+
+    def search(self, matrix: np.ndarray, queries: np.ndarray, top_k: int,
+               nprobe: Optional[int] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Return ``(row_ids, scores)`` per query, best first."""
+        with self._lock:
+            centroids, norms = self._centroids, self._centroid_norms
+            cells = self._nearest_cells(queries, centroids, norms, nprobe or self.nprobe)
+            arrays = {}
+            for cell in np.unique(cells).tolist():
+                if self._arrays[cell] is None:
+                    self._arrays[cell] = np.asarray(self._lists[cell], dtype=np.int64)
+                arrays[cell] = self._arrays[cell]
+        results = []
+        for query, probe in zip(queries, cells):
+            ids = np.concatenate([arrays[cell] for cell in probe.tolist()])
+            if ids.size == 0:
+                results.append((ids, np.empty(0, dtype=np.float32)))
+                continue
+            scores = np.asarray(matrix[ids]) @ query
+            best = _top_k(scores, top_k)
+            results.append((ids[best], scores[best]))
+        return results
+
+    def stats(self) -> dict:
+        sizes = [len(cell) for cell in self._lists]
+        return {
+            "trained": self.trained,
+            "nlist": len(sizes),
+            "nprobe": self.nprobe,
+            "indexed": self._indexed,
+            "trained_on": self._trained_on,
+            "rebuilds": self.rebuilds,
+            "largest_list": max(sizes) if sizes else 0,
+        }
+
+
+class VectorDB:
+    """Small vector store backed by a NumPy matrix, with optional Azure search.
+
+    ``metric`` is ``"dot"`` (raw inner product) or ``"cosine"``; for cosine the
+    stored rows are normalized on insert so a search is a single matrix product.
+    Pass ``path`` to keep the index on disk in a ``MemmapVectorStore``. With
+    ``index="ivf"`` (cosine only) searches go through an ``IVFIndex``
+    (configured by ``index_params``) once it has been trained, and are exact
+    before that.
+    """
+
+    def __init__(self, metric: str = "dot", dim: Optional[int] = None, path: Optional[str] = None,
+                 index: str = "exact", index_params: Optional[dict] = None):
+        if metric not in METRICS:
+            raise ValueError(f"Unsupported metric: {metric}")
+        if index not in INDEX_TYPES:
+            raise ValueError(f"Unsupported index type: {index}")
+        if index == "ivf" and metric != "cosine":
+            # Cells are L2 k-means clusters, which only match inner-product ranking on unit vectors
+            raise ValueError("index='ivf' requires metric='cosine'")
+        self.metric = metric
+        if path:
+            self.store = MemmapVectorStore(path, dim=dim, metric=metric)
+        else:
+            self.store = InMemoryVectorStore(dim=dim)
+        self.index = IVFIndex(**(index_params or {})) if index == "ivf" else None
         self.azure_endpoint = os.environ.get("AZURE_VECTOR_ENDPOINT")
         self.azure_key = os.environ.get("AZURE_COGNITIVE_KEY")
 
+    @property
+    def vectors(self) -> np.ndarray:
+        return self.store.matrix()
+
+    @property
+    def texts(self) -> Sequence[str]:
+        return self.store.texts
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def _use_azure(self) -> bool:
+        return bool(self.azure_endpoint and self.azure_key)
+
+    def _prepare(self, embeddings) -> np.ndarray:
+        rows = _as_matrix(embeddings, self.store.dim)
+        return _normalize(rows) if self.metric == "cosine" else rows
+
     def add(self, embedding: List[float], text: str) -> None:
-        if self.azure_endpoint and self.azure_key:
+        if self._use_azure():
             call_azure(self.azure_endpoint + "/add", self.azure_key, {"vec": embedding, "text": text})
         else:
-            self.vectors.append(embedding)
-            self.texts.append(text)
+            self.add_batch([embedding], [text])
+
+    def add_batch(self, embeddings, texts: Sequence[str]) -> None:
+        """Add many vectors at once; ``embeddings`` may be a list of lists or an array."""
+        if len(embeddings) != len(texts):
+            raise ValueError("embeddings and texts must have the same length")
+        if self._use_azure():
+            for embedding, text in zip(embeddings, texts):
+                self.add(list(map(float, embedding)), text)
+            return
+        if len(texts):
+            self.store.append(self._prepare(embeddings), texts)
+            if self.index is not None:
+                self.index.sync(self.store.matrix())
 
-    def search(self, embedding: List[float], top_k: int = 1) -> List[str]:
-        if self.azure_endpoint and self.azure_key:
+    def search(self, embedding: List[float], top_k: int = 1, return_scores: bool = False,
+               exact: bool = False, nprobe: Optional[int] = None) -> SearchResult:
+        """Return the ``top_k`` closest texts, or ``(text, score)`` pairs with ``return_scores``."""
+        if self._use_azure():
             result = call_azure(self.azure_endpoint + "/search", self.azure_key, {"vec": embedding, "k": top_k})
-            return result.get("texts", [])
+            return self._azure_results(result, return_scores)
+        return self.search_batch([embedding], top_k, return_scores, exact, nprobe)[0]
 
-        if not self.vectors:
-            return []
+    def search_batch(self, embeddings, top_k: int = 1, return_scores: bool = False,
+                     exact: bool = False, nprobe: Optional[int] = None) -> List[SearchResult]:
+        """Search several queries at once.
+
+        Uses the ANN index when one is configured and trained, unless ``exact``
+        is set; otherwise scores one matrix product per block of queries.
+        """
+        if self._use_azure():
+            return [self.search(list(map(float, e)), top_k, return_scores) for e in embeddings]
+        if len(self.store) == 0:
+            return [[] for _ in range(len(embeddings))]
+
+        queries = self._prepare(embeddings)
+        matrix = self.store.matrix()
+        texts = self.store.texts
+        if self.index is not None and not exact:
+            self.index.sync(matrix)
+            if self.index.trained:
+                hits = self.index.search(matrix, queries, top_k, nprobe=nprobe)
+                return [self._format(texts, ids, scores, return_scores) for ids, scores in hits]
+
+        block = max(1, _SCORE_BLOCK_BYTES // (4 * matrix.shape[0]))
+        results: List[SearchResult] = []
+        for start in range(0, queries.shape[0], block):
+            scores = queries[start:start + block] @ matrix.T
+            for row in scores:
+                idx = _top_k(row, top_k)
+                results.append(self._format(texts, idx, row[idx], return_scores))
+        return results
+
+    @staticmethod
+    def _format(texts: Sequence[str], ids: np.ndarray, scores: np.ndarray,
+                return_scores: bool) -> SearchResult:
+        if return_scores:
+            return [(texts[i], float(score)) for i, score in zip(ids.tolist(), scores.tolist())]
+        return [texts[i] for i in ids.tolist()]
+
+    @staticmethod
+    def _azure_results(result: dict, return_scores: bool) -> SearchResult:
+        texts = result.get("texts", [])
+        if not return_scores:
+            return texts
+        scores = result.get("scores") or [None] * len(texts)
+        return list(zip(texts, scores))
+
+    async def aadd(self, embedding: List[float], text: str) -> None:
+        """Async variant of ``add`` that does not block on the Azure round-trip."""
+        if self._use_azure():
+            await acall_azure(self.azure_endpoint + "/add", self.azure_key, {"vec": embedding, "text": text})
+        else:
+            self.add(embedding, text)
 
-        # naive dot-product search
-        scores = [sum(e * q for e, q in zip(vec, embedding)) for vec in self.vectors]
-        best_indices = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:top_k]
-        return [self.texts[i] for i in best_indices]
+    async def asearch(self, embedding: List[float], top_k: int = 1,
+                      return_scores: bool = False) -> SearchResult:
+        """Async variant of ``search`` that does not block on the Azure round-trip."""
+        if self._use_azure():
+            result = await acall_azure(self.azure_endpoint + "/search", self.azure_key, {"vec": embedding, "k": top_k})
+            return self._azure_results(result, return_scores)
+        return self.search(embedding, top_k, return_scores)
@@ -1,31 +1,204 @@
+import asyncio
 import os
 import json
-from typing import List, Dict
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
 
-from src.services.azure_client import call_azure
+from src.services.azure_client import call_azure, acall_azure
+
+LEGACY_SUFFIXES = (".json", ".jsonl")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT NOT NULL DEFAULT 'default',
+    created_at REAL NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_memories_conversation ON memories (conversation_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_memories_created ON memories (created_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
 
 
 class LongTermMemory:
-    """Persist messages locally or via Azure."""
+    """Persist messages in a local SQLite database or via Azure.
+
+    Writes are grouped: records are buffered in memory and written in one
+    transaction every ``commit_every`` adds or ``commit_interval`` seconds,
+    whichever comes first, so a crash can lose at most that window and no
+    write lock is held between flushes. Reads flush the buffer first and are
+    paged or streamed, never loading the whole history. A ``.json`` or
+    ``.jsonl`` ``storage_path`` (the previous format) is imported once into a
+    ``.db`` file next to it.
+    """
 
-    def __init__(self, storage_path: str = "long_term_memory.json"):
-        self.storage_path = storage_path
+    def __init__(self, storage_path: str = "long_term_memory.db", commit_every: int = 32,
+                 commit_interval: float = 1.0):
         self.azure_endpoint = os.environ.get("AZURE_LONGTERM_ENDPOINT")
         self.azure_key = os.environ.get("AZURE_COGNITIVE_KEY")
-        self.records: List[Dict[str, str]] = []
-        if os.path.exists(storage_path):
-            with open(storage_path, "r") as f:
-                for line in f:
-                    self.records.append(json.loads(line))
-
-    def add(self, message: str) -> None:
-        record = {"message": message}
+        stem, ext = os.path.splitext(storage_path)
+        if ext.lower() in LEGACY_SUFFIXES:
+            self.storage_path, legacy_path = stem + ".db", storage_path
+        else:
+            self.storage_path, legacy_path = storage_path, stem + ".json"
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._lock = threading.RLock()
+        self._buffer: List[tuple] = []
+        self._timer: Optional[threading.Timer] = None
+        self._conn = sqlite3.connect(self.storage_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate_jsonl(legacy_path)
+
+    def _migrate_jsonl(self, legacy_path: str) -> None:
+        """Import a legacy JSONL memory file once, streaming it line by line."""
+        if not os.path.exists(legacy_path):
+            return
+        key = f"migrated:{os.path.abspath(legacy_path)}"
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+                return
+            mtime = os.path.getmtime(legacy_path)
+
+            def rows():
+                with open(legacy_path, "r") as f:
+                    for line in f:
+                        if line.strip():
+                            record = json.loads(line)
+                            yield (record.get("conversation_id", "default"),
+                                   record.get("created_at", mtime), record["message"])
+
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO memories (conversation_id, created_at, message) VALUES (?, ?, ?)",
+                    rows(),
+                )
+                self._conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (key, str(time.time())))
+
+    def add(self, message: str, conversation_id: str = "default") -> None:
         if self.azure_endpoint and self.azure_key:
+            record = {"message": message, "conversation_id": conversation_id}
             call_azure(self.azure_endpoint, self.azure_key, record)
+            return
+        with self._lock:
+            self._buffer.append((conversation_id, time.time(), message))
+            if len(self._buffer) >= self.commit_every:
+                self._commit()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.commit_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    async def aadd(self, message: str, conversation_id: str = "default") -> None:
+        """Async variant of ``add`` that does not block the event loop.
+
+        The local path runs in a worker thread: it may wait for the lock held
+        by a timer commit, or run a full batch's commit itself.
+        """
+        if self.azure_endpoint and self.azure_key:
+            record = {"message": message, "conversation_id": conversation_id}
+            await acall_azure(self.azure_endpoint, self.azure_key, record)
         else:
-            self.records.append(record)
-            with open(self.storage_path, "a") as f:
-                f.write(json.dumps(record) + "\n")
+            await asyncio.to_thread(self.add, message, conversation_id)
+
+    def _commit(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._buffer:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO memories (conversation_id, created_at, message) VALUES (?, ?, ?)",
+                    self._buffer,
+                )
+            self._buffer = []
+
+    def flush(self) -> None:
+        """Commit any grouped writes now."""
+        with self._lock:
+            self._commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._commit()
+            self._conn.close()
+
+    @staticmethod
+    def _where(conversation_id: Optional[str], since: Optional[float],
+               until: Optional[float]) -> tuple:
+        clauses, params = [], []
+        if conversation_id is not None:
+            clauses.append("conversation_id = ?")
+            params.append(conversation_id)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        return clauses, params
+
+    @staticmethod
+    def _record(row: tuple) -> Dict[str, Any]:
+        return {"id": row[0], "conversation_id": row[1], "created_at": row[2], "message": row[3]}
+
+    def get_page(self, conversation_id: Optional[str] = None, limit: int = 50,
+                 before_id: Optional[int] = None, since: Optional[float] = None,
+                 until: Optional[float] = None) -> Dict[str, Any]:
+        """Return up to ``limit`` records, newest first.
+
+        Pass the returned ``next_before_id`` as ``before_id`` to fetch the next
+        (older) page; it is ``None`` when there are no more records.
+        """
+        clauses, params = self._where(conversation_id, since, until)
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            self._commit()
+            rows = self._conn.execute(
+                f"SELECT id, conversation_id, created_at, message FROM memories {where} "
+                "ORDER BY id DESC LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+        items = [self._record(r) for r in rows[:limit]]
+        next_before = items[-1]["id"] if len(rows) > limit else None
+        return {"items": items, "next_before_id": next_before}
+
+    def iter_records(self, conversation_id: Optional[str] = None, since: Optional[float] = None,
+                     until: Optional[float] = None, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Stream matching records oldest first, ``batch_size`` rows per query."""
+        last_id = 0
+        while True:
+            clauses, params = self._where(conversation_id, since, until)
+            clauses.append("id > ?")
+            params.append(last_id)
+            with self._lock:
+                self._commit()
+                rows = self._conn.execute(
+                    f"SELECT id, conversation_id, created_at, message FROM memories "
+                    f"WHERE {' AND '.join(clauses)} ORDER BY id LIMIT ?",
+                    (*params, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._record(row)
+            last_id = rows[-1][0]
+
+    def count(self, conversation_id: Optional[str] = None) -> int:
+        clauses, params = self._where(conversation_id, None, None)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            self._commit()
+            return self._conn.execute(f"SELECT COUNT(*) FROM memories {where}", params).fetchone()[0]
 
     def get_all(self) -> List[str]:
-        return [r["message"] for r in self.records]
+        """All stored messages, oldest first. Prefer ``iter_records`` for large histories."""
+        return [r["message"] for r in self.iter_records()]
@@ -1,35 +1,171 @@
-from collections import deque
-from typing import Deque, List
+import asyncio
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, List, Optional
 
 from langgraph.graph import MessageGraph
-from src.services.azure_client import summarize
+from src.services.azure_client import summarize, asummarize
 
 
-class ShortTermMemory:
-    """Conversation buffer with optional summarization."""
+class _Conversation:
+    """Buffer, rolling summary and pending summary work of one conversation."""
 
-    def __init__(self, capacity: int = 5):
+    def __init__(self, capacity: int):
         self.buffer: Deque[str] = deque(maxlen=capacity)
+        self.summary = ""
+        self.unsummarized: List[str] = []
+        self.task: Optional[asyncio.Task] = None
+        self.wake: Optional[asyncio.Event] = None
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.unsummarized) or (self.task is not None and not self.task.done())
+
+
+class ShortTermMemory:
+    """Per-conversation buffers with rolling summaries maintained in the background.
+
+    ``add`` only appends to the conversation's buffer. Summarization runs as
+    a background task per conversation: turns that arrive within ``debounce``
+    seconds of each other are coalesced into one model call, and each call
+    folds the new turns into that conversation's previous summary instead of
+    re-summarizing the whole buffer. Every new summary is handed to
+    ``on_summary(summary, conversation_id)``. At most ``max_conversations``
+    idle conversations are kept, least recently used first out.
+    """
+
+    def __init__(self, capacity: int = 5,
+                 on_summary: Optional[Callable[[str, str], Awaitable[None]]] = None,
+                 debounce: float = 0.5, max_conversations: int = 1024):
+        self.capacity = capacity
+        self.on_summary = on_summary
+        self.debounce = debounce
+        self.max_conversations = max_conversations
+        self._conversations: "OrderedDict[str, _Conversation]" = OrderedDict()
+        self.summaries = 0
+        self.coalesced = 0
         self.graph = MessageGraph()
         self.graph.add_node("add", self._add)
         self.graph.add_node("summarize", self._summarize)
         self.graph.add_edge("add", "summarize")
         self.graph.set_entry_point("add")
 
-    def _add(self, message: str) -> str:
-        self.buffer.append(message)
+    def _conversation(self, conversation_id: str) -> _Conversation:
+        state = self._conversations.get(conversation_id)
+        if state is None:
+            state = self._conversations[conversation_id] = _Conversation(self.capacity)
+            if len(self._conversations) > self.max_conversations:
+                for key in [k for k, c in self._conversations.items() if not c.busy and k != conversation_id]:
+                    if len(self._conversations) <= self.max_conversations:
+                        break
+                    del self._conversations[key]
+        self._conversations.move_to_end(conversation_id)
+        return state
+
+    @property
+    def buffer(self) -> Deque[str]:
+        """Buffer of the default conversation."""
+        return self._conversation("default").buffer
+
+    @property
+    def summary(self) -> str:
+        """Rolling summary of the default conversation."""
+        return self.get_summary()
+
+    def _add(self, message: str, conversation_id: str = "default") -> str:
+        self._conversation(conversation_id).buffer.append(message)
         return message
 
-    def _summarize(self, _message: str) -> str:
-        text = " ".join(self.buffer)
+    def _summarize(self, _message: str, conversation_id: str = "default") -> str:
+        text = " ".join(self._conversation(conversation_id).buffer)
         try:
             return summarize(text)
         except Exception:
             return text
 
-    async def add_and_summarize(self, message: str) -> str:
-        self._add(message)
-        return self._summarize(message)
+    def add(self, message: str, conversation_id: str = "default") -> None:
+        """Append a turn and schedule a background summary update for its conversation."""
+        state = self._conversation(conversation_id)
+        state.buffer.append(message)
+        state.unsummarized.append(message)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No event loop: the turn is folded in by the next ``flush``
+        if state.task is None or state.task.done():
+            state.wake = asyncio.Event()
+            state.task = loop.create_task(self._run(conversation_id, state))
+        else:
+            self.coalesced += 1
+
+    async def _run(self, conversation_id: str, state: _Conversation) -> None:
+        while state.unsummarized:
+            if self.debounce > 0 and not state.wake.is_set():
+                try:
+                    await asyncio.wait_for(state.wake.wait(), self.debounce)
+                except asyncio.TimeoutError:
+                    pass
+            # A ``flush`` wake-up covers the turns taken now; later turns debounce again
+            state.wake.clear()
+            turns, state.unsummarized = state.unsummarized, []
+            state.summary = await self._fold(state, turns)
+            self.summaries += 1
+            if self.on_summary is not None:
+                try:
+                    await self.on_summary(state.summary, conversation_id)
+                except Exception as e:
+                    print(f"Failed to persist conversation summary: {e}")
+
+    async def _fold(self, state: _Conversation, turns: List[str]) -> str:
+        """Fold new turns into the running summary with one summarizer call."""
+        text = " ".join([state.summary, *turns]) if state.summary else " ".join(turns)
+        try:
+            return await asummarize(text)
+        except Exception:
+            # No summarizer available: keep a concatenation of the recent buffer
+            return " ".join(state.buffer)
+
+    async def _flush_one(self, conversation_id: str, state: _Conversation) -> None:
+        if state.task is not None and not state.task.done():
+            state.wake.set()
+            await asyncio.shield(state.task)
+        elif state.unsummarized:
+            state.wake = asyncio.Event()
+            state.wake.set()
+            await self._run(conversation_id, state)
+
+    async def flush(self, conversation_id: Optional[str] = None) -> str:
+        """Summarize pending turns now and return the conversation's summary.
+
+        Without ``conversation_id`` every conversation is flushed and the
+        default conversation's summary is returned.
+        """
+        if conversation_id is None:
+            await asyncio.gather(*(
+                self._flush_one(cid, state) for cid, state in list(self._conversations.items())
+            ))
+            return self.get_summary()
+        await self._flush_one(conversation_id, self._conversation(conversation_id))
+        return self.get_summary(conversation_id)
+
+    async def aclose(self, timeout: float = 5.0) -> None:
+        """Finish pending summaries on shutdown, cancelling any still running after ``timeout``."""
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            print("Short-term memory summaries did not finish before shutdown")
+        tasks = [s.task for s in self._conversations.values() if s.task is not None and not s.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def add_and_summarize(self, message: str, conversation_id: str = "default") -> str:
+        self.add(message, conversation_id)
+        return await self.flush(conversation_id)
+
+    def get_summary(self, conversation_id: str = "default") -> str:
+        state = self._conversations.get(conversation_id)
+        return state.summary if state else ""
 
-    def get_context(self) -> List[str]:
-        return list(self.buffer)
+    def get_context(self, conversation_id: str = "default") -> List[str]:
+        state = self._conversations.get(conversation_id)
+        return list(state.buffer) if state else []
@@ -1,20 +1,22 @@
-from typing import List
+from typing import List, Optional
 
 from langgraph.graph import MessageGraph
 from src.services.azure_client import zero_shot_classify
+from src.core.cache.classification_cache import ClassificationCache
 
 
 class TaskDecomposer:
     """Break a high level goal into coarse tasks."""
 
-    def __init__(self):
+    def __init__(self, cache: Optional[ClassificationCache] = None):
+        self.cache = cache if cache is not None else ClassificationCache()
         self.graph = MessageGraph()
         self.graph.add_node("plan", self._plan)
         self.graph.set_entry_point("plan")
         self.labels = ["search_web", "analyze_file", "respond"]
 
     def _plan(self, goal: str) -> List[str]:
-        label = zero_shot_classify(goal, self.labels)
+        label = self.cache.get_or_classify(goal, self.labels, zero_shot_classify)
         return [label]
 
     async def decompose(self, goal: str) -> List[str]:
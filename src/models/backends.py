@@ -0,0 +1,153 @@
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+BACKEND_CACHE_DIR = os.environ.get(
+    "MODEL_BACKEND_CACHE", str(Path.home() / ".cache" / "superagent" / "models")
+)
+
+# Backends available for each registry task. ``eager`` is the plain FP32
+# PyTorch model; ``int8`` applies torch dynamic quantization to its Linear
+# layers; ``onnx`` runs an exported graph on ONNX Runtime and ``onnx-int8``
+# additionally quantizes that graph's weights. Optimum has no ONNX export for
+# BLIP, so captioning is limited to the torch backends.
+BACKENDS = {
+    "classification": ("eager", "int8", "onnx", "onnx-int8"),
+    "summarization": ("eager", "int8", "onnx", "onnx-int8"),
+    "image_caption": ("eager", "int8"),
+}
+
+
+def validate_backends(backends: Dict[str, str]) -> Dict[str, str]:
+    """Check a ``{task: backend}`` mapping from ``config/models.yaml``."""
+    for task, backend in backends.items():
+        supported = BACKENDS.get(task)
+        if supported is None:
+            raise ValueError(f"No local model for task: {task}")
+        if backend not in supported:
+            raise ValueError(f"Backend {backend!r} is not supported for {task}; use one of {supported}")
+    return dict(backends)
+
+
+def artifact_dir(model_name: str, backend: str, cache_dir: str = BACKEND_CACHE_DIR) -> Path:
+    """Directory holding the converted ``backend`` artifacts of ``model_name``.
+
+    torch-pickled artifacts are tied to the installed torch and transformers
+    versions, so those are part of the path.
+    """
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "--", model_name)
+    if backend == "int8":
+        import torch
+        import transformers
+
+        backend = f"int8-torch{torch.__version__}-transformers{transformers.__version__}"
+    return Path(cache_dir) / safe_name / backend
+
+
+def cached_artifact(path: Path, build: Callable[[Path], None]) -> Path:
+    """Return ``path``, first running ``build(tmp_dir)`` if it does not exist yet.
+
+    The conversion writes into a temporary sibling directory that is renamed
+    into place when complete, so concurrent processes never load a partial
+    artifact.
+    """
+    if path.is_dir():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.parent / f".{path.name}.{uuid.uuid4().hex}.tmp"
+    tmp.mkdir()
+    try:
+        print(f"Converting {path.parent.name} to {path.name} (first use)")
+        build(tmp)
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            if not path.is_dir():
+                raise
+            shutil.rmtree(tmp, ignore_errors=True)  # Another process finished first
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return path
+
+
+def load_torch_int8(model_name: str, model_cls: Any, cache_dir: str = BACKEND_CACHE_DIR) -> Any:
+    """``model_cls`` weights with Linear layers dynamically quantized to int8.
+
+    The quantized module is saved once; later loads skip the FP32 weights
+    entirely, which also lowers peak RAM while loading.
+    """
+    import torch
+
+    def build(tmp: Path) -> None:
+        model = model_cls.from_pretrained(model_name).eval()
+        quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        torch.save(quantized, tmp / "model.pt")
+
+    path = cached_artifact(artifact_dir(model_name, "int8", cache_dir), build)
+    # Written by ``build`` above, not downloaded: full unpickling is required for a module
+    return torch.load(path / "model.pt", weights_only=False).eval()
+
+
+def _ort_class(task: str) -> Any:
+    from optimum import onnxruntime as ort
+
+    return {
+        "classification": ort.ORTModelForSequenceClassification,
+        "summarization": ort.ORTModelForSeq2SeqLM,
+    }[task]
+
+
+def load_onnx(task: str, model_name: str, quantize: bool = False,
+              cache_dir: str = BACKEND_CACHE_DIR) -> Any:
+    """ONNX Runtime model for ``task``, exported (and quantized) on first use."""
+    from transformers import AutoTokenizer
+
+    ort_cls = _ort_class(task)
+
+    def export(tmp: Path) -> None:
+        ort_cls.from_pretrained(model_name, export=True).save_pretrained(tmp)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(tmp)
+
+    exported = cached_artifact(artifact_dir(model_name, "onnx", cache_dir), export)
+    if not quantize:
+        return ort_cls.from_pretrained(exported)
+
+    def quantize_graphs(tmp: Path) -> None:
+        from optimum.onnxruntime import ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+        config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        for graph in sorted(exported.glob("*.onnx")):
+            # Writes ``<name>_quantized.onnx`` alongside copies of the configs
+            ORTQuantizer.from_pretrained(exported, file_name=graph.name).quantize(
+                save_dir=tmp, quantization_config=config
+            )
+        AutoTokenizer.from_pretrained(exported).save_pretrained(tmp)
+
+    quantized = cached_artifact(artifact_dir(model_name, "onnx-int8", cache_dir), quantize_graphs)
+    if task == "summarization":
+        return ort_cls.from_pretrained(
+            quantized,
+            encoder_file_name="encoder_model_quantized.onnx",
+            decoder_file_name="decoder_model_quantized.onnx",
+            decoder_with_past_file_name="decoder_with_past_model_quantized.onnx",
+        )
+    return ort_cls.from_pretrained(quantized, file_name="model_quantized.onnx")
+
+
+def load_backend_model(task: str, model_name: str, backend: str,
+                       cache_dir: Optional[str] = None) -> Any:
+    """The transformers/ONNX Runtime model for a pipeline task on ``backend``."""
+    cache_dir = cache_dir or BACKEND_CACHE_DIR
+    if backend in ("onnx", "onnx-int8"):
+        return load_onnx(task, model_name, quantize=backend == "onnx-int8", cache_dir=cache_dir)
+    from transformers import AutoModelForSeq2SeqLM, AutoModelForSequenceClassification
+
+    model_cls = AutoModelForSeq2SeqLM if task == "summarization" else AutoModelForSequenceClassification
+    if backend == "int8":
+        return load_torch_int8(model_name, model_cls, cache_dir)
+    return model_cls.from_pretrained(model_name)
@@ -0,0 +1,72 @@
+import os
+from typing import Any, Dict, List
+
+from src.services.batching import ThreadedMicroBatcher
+
+MAX_BATCH_SIZE = int(os.environ.get("BLIP_MAX_BATCH_SIZE", "8"))
+MAX_WAIT_MS = float(os.environ.get("BLIP_MAX_WAIT_MS", "10"))
+# torch intra-op threads; 0 leaves torch's default
+NUM_THREADS = int(os.environ.get("BLIP_NUM_THREADS", "0"))
+MAX_NEW_TOKENS = int(os.environ.get("BLIP_MAX_NEW_TOKENS", "30"))
+
+
+class BlipCaptioner:
+    """Local BLIP captioning with dynamic batching.
+
+    Concurrent ``caption`` calls are collected by a ``ThreadedMicroBatcher``
+    into one padded ``generate`` call of up to ``max_batch_size`` images,
+    waiting at most ``max_wait_ms`` for a batch to fill. Inference runs under
+    ``torch.inference_mode`` with the model in eval mode.
+    """
+
+    def __init__(self, model_name: str = "Salesforce/blip-image-captioning-base",
+                 max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS,
+                 num_threads: int = NUM_THREADS, max_new_tokens: int = MAX_NEW_TOKENS,
+                 processor: Any = None, model: Any = None):
+        import torch  # Deferred: only needed for local captioning
+
+        self.torch = torch
+        self.model_name = model_name
+        self.max_new_tokens = max_new_tokens
+        if num_threads > 0:
+            torch.set_num_threads(num_threads)  # Process-wide torch setting
+        if processor is None or model is None:
+            from transformers import BlipProcessor, BlipForConditionalGeneration
+
+            processor = BlipProcessor.from_pretrained(model_name)
+            model = BlipForConditionalGeneration.from_pretrained(model_name)
+        self.processor = processor
+        self.model = model.eval()
+        self.batcher = ThreadedMicroBatcher(
+            self.caption_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+            name="blip-batch",
+        )
+
+    def caption_batch(self, images: List[Any]) -> List[str]:
+        """Caption a list of RGB PIL images in one forward pass."""
+        with self.torch.inference_mode():
+            inputs = self.processor(images=images, return_tensors="pt")
+            out = self.model.generate(**inputs, max_new_tokens=self.max_new_tokens)
+        return self.processor.batch_decode(out, skip_special_tokens=True)
+
+    def caption(self, image: Any) -> str:
+        """Caption one image, batched with any concurrent callers."""
+        return self.batcher.submit(image)
+
+    async def acaption(self, image: Any) -> str:
+        return await self.batcher.asubmit(image)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.batcher.stats()
+
+    def close(self) -> None:
+        self.batcher.close()
+
+
+def loaded_captioners() -> Dict[str, BlipCaptioner]:
+    from .model_loader import get_model_manager
+
+    return {
+        name: model for (task, name), model in get_model_manager().loaded().items()
+        if task == "image_caption"
+    }
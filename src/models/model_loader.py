@@ -1,21 +1,354 @@
+import asyncio
+import gc
 import os
-from typing import Callable
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 
+from .backends import BACKEND_CACHE_DIR, load_backend_model, load_torch_int8, validate_backends
 from .model_registry import get_model_info
 
-try:
-    from transformers import pipeline
-except Exception:  # pragma: no cover - optional dependency
-    pipeline = None
-
 from src.services.azure_client import call_azure
 
+MODELS_CONFIG_PATH = os.environ.get(
+    "SUPERAGENT_MODELS_CONFIG",
+    str(Path(__file__).resolve().parents[2] / "config" / "models.yaml"),
+)
+
+# transformers pipeline task for each registry task served by a plain pipeline
+PIPELINE_TASKS = {
+    "classification": "zero-shot-classification",
+    "summarization": "summarization",
+}
+
+
+class ModelUnavailableError(RuntimeError):
+    """Raised when a local model cannot be loaded because its libraries are missing."""
+
+
+def _load_pipeline(task: str, model_name: str, backend: str = "eager",
+                   cache_dir: Optional[str] = None) -> Any:
+    try:
+        from transformers import pipeline
+    except Exception as e:  # pragma: no cover - optional dependency
+        raise ModelUnavailableError("transformers is required for local model loading") from e
+    if backend == "eager":
+        return pipeline(PIPELINE_TASKS.get(task, task), model=model_name)
+    try:
+        model = load_backend_model(task, model_name, backend, cache_dir)
+    except ImportError as e:  # pragma: no cover - optional dependency
+        raise ModelUnavailableError(f"The {backend} backend needs torch or optimum[onnxruntime]") from e
+    return pipeline(PIPELINE_TASKS.get(task, task), model=model, tokenizer=model_name)
+
+
+def _load_captioner(task: str, model_name: str, backend: str = "eager",
+                    cache_dir: Optional[str] = None) -> Any:
+    from .blip_captioner import BlipCaptioner
+
+    try:
+        if backend == "int8":
+            from transformers import BlipForConditionalGeneration, BlipProcessor
+
+            return BlipCaptioner(
+                model_name, processor=BlipProcessor.from_pretrained(model_name),
+                model=load_torch_int8(model_name, BlipForConditionalGeneration, cache_dir or BACKEND_CACHE_DIR),
+            )
+        return BlipCaptioner(model_name)
+    except ImportError as e:  # pragma: no cover - optional dependency
+        raise ModelUnavailableError("torch and transformers are required for local captioning") from e
+
+
+DEFAULT_LOADERS: Dict[str, Callable[..., Any]] = {
+    "classification": _load_pipeline,
+    "summarization": _load_pipeline,
+    "image_caption": _load_captioner,
+}
+
+
+def load_models_config(path: str = MODELS_CONFIG_PATH) -> Dict[str, Any]:
+    """Load ``config/models.yaml``; missing file, empty file or no PyYAML give ``{}``."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        import yaml
+    except Exception:  # pragma: no cover - optional dependency
+        return {}
+    with open(path, "r") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):  # pragma: no cover - non-Linux
+        return 0
+
+
+def _model_bytes(model: Any) -> Optional[int]:
+    """Weight bytes of the torch module behind ``model``, if any.
+
+    ``state_dict`` is preferred: it also holds the packed weights of
+    dynamically quantized layers, which ``parameters()`` does not list.
+    """
+    module = getattr(model, "model", model)
+    if hasattr(module, "state_dict"):
+        tensors = []
+        for value in module.state_dict().values():
+            tensors.extend(value if isinstance(value, (tuple, list)) else (value,))
+    elif hasattr(module, "parameters"):
+        tensors = [*module.parameters(), *(module.buffers() if hasattr(module, "buffers") else ())]
+    else:
+        return None
+    return sum(t.numel() * t.element_size() for t in tensors if hasattr(t, "numel"))
+
+
+class _Resident:
+    def __init__(self, model: Any, size_bytes: int, backend: str = "eager"):
+        self.model = model
+        self.size_bytes = size_bytes
+        self.backend = backend
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.uses = 0
+        self.pins = 0
+
+
+class ModelManager:
+    """Process-wide cache of local models keyed by ``MODEL_REGISTRY`` task.
+
+    Every caller asking for the same task and model shares one instance.
+    Loading is serialized per model so concurrent first requests load it once.
+    When ``ram_budget_mb`` is set and the resident models exceed it, the least
+    recently used models that are not pinned by ``use`` are unloaded. Sizes
+    come from the torch weights, or from the growth in resident memory while
+    loading for models without any.
+
+    ``backends`` selects an optimized CPU backend per task (see
+    ``src.models.backends``); tasks not listed run eager FP32 PyTorch.
+    Converted models are cached under ``backend_cache_dir``.
+    """
+
+    def __init__(self, ram_budget_mb: float = 0.0,
+                 loaders: Optional[Dict[str, Callable[..., Any]]] = None,
+                 preload: Optional[List[str]] = None,
+                 backends: Optional[Dict[str, str]] = None,
+                 backend_cache_dir: Optional[str] = None):
+        self.ram_budget_bytes = int(ram_budget_mb * 1024 * 1024)
+        self.loaders = {**DEFAULT_LOADERS, **(loaders or {})}
+        self.preload_tasks = list(preload or [])
+        self.backends = validate_backends(backends or {})
+        self.backend_cache_dir = backend_cache_dir or BACKEND_CACHE_DIR
+        self._resident: "OrderedDict[Tuple[str, str], _Resident]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, cfg: Optional[Dict[str, Any]]) -> "ModelManager":
+        cfg = cfg or {}
+        # The environment overrides the file, so one image can run under different budgets
+        env_budget = os.environ.get("MODEL_RAM_BUDGET_MB")
+        budget = float(env_budget) if env_budget else cfg.get("ram_budget_mb")
+        return cls(
+            ram_budget_mb=budget or 0.0,
+            preload=cfg.get("preload"),
+            backends=cfg.get("backends"),
+            backend_cache_dir=cfg.get("backend_cache_dir"),
+        )
+
+    @staticmethod
+    def _key(task: str, model_name: Optional[str]) -> Tuple[str, str]:
+        return task, model_name or get_model_info(task)
+
+    def _load(self, key: Tuple[str, str]) -> _Resident:
+        task, model_name = key
+        loader = self.loaders.get(task)
+        if loader is None:
+            raise ValueError(f"No local loader for task: {task}")
+        backend = self.backends.get(task, "eager")
+        before = _rss_bytes()
+        start = time.perf_counter()
+        model = loader(task, model_name, backend, self.backend_cache_dir)
+        size = _model_bytes(model)
+        if not size:
+            # ONNX Runtime holds no torch tensors: measure the process growth once
+            # the intermediates of a first conversion have been collected
+            gc.collect()
+            size = max(0, _rss_bytes() - before)
+        print(f"Loaded {model_name} ({backend}) for {task} in {time.perf_counter() - start:.1f}s "
+              f"({size / (1024 * 1024):.0f} MiB)")
+        return _Resident(model, size, backend)
+
+    def _acquire(self, task: str, model_name: Optional[str], pin: bool) -> Tuple[Tuple[str, str], Any]:
+        key = self._key(task, model_name)
+        while True:
+            with self._lock:
+                entry = self._resident.get(key)
+                if entry is not None:
+                    # Looked up and pinned in one critical section, so no eviction in between
+                    evicted = self._use_entry(key, entry, pin)
+                    model = entry.model
+                    break
+                load_lock = self._load_locks.setdefault(key, threading.Lock())
+            with load_lock:
+                with self._lock:
+                    loaded = key in self._resident
+                if loaded:
+                    continue  # Loaded by another thread meanwhile; pin it above
+                entry = self._load(key)
+                with self._lock:
+                    self._resident[key] = entry
+                    self.loads += 1
+                    evicted = self._use_entry(key, entry, pin)
+                    model = entry.model
+                break
+        self._dispose(evicted)
+        return key, model
+
+    def _use_entry(self, key: Tuple[str, str], entry: _Resident,
+                   pin: bool) -> List[Tuple[Tuple[str, str], _Resident]]:
+        # Caller holds ``self._lock``
+        entry.uses += 1
+        entry.last_used = time.time()
+        if pin:
+            entry.pins += 1
+        self._resident.move_to_end(key)
+        return self._enforce_budget(keep=key)
+
+    def get(self, task: str, model_name: Optional[str] = None) -> Any:
+        """Return the shared model for ``task``, loading it if needed.
+
+        The model may be unloaded by a later budget eviction; use ``use`` to
+        keep it resident for the duration of a call.
+        """
+        return self._acquire(task, model_name, pin=False)[1]
+
+    @contextmanager
+    def use(self, task: str, model_name: Optional[str] = None) -> Iterator[Any]:
+        """Context manager yielding the shared model, pinned against eviction."""
+        key, model = self._acquire(task, model_name, pin=True)
+        try:
+            yield model
+        finally:
+            self._release(key)
+
+    @asynccontextmanager
+    async def ause(self, task: str, model_name: Optional[str] = None) -> AsyncIterator[Any]:
+        """Async ``use``: loading, lock waits and evictions run in a worker thread."""
+        key, model = await asyncio.to_thread(self._acquire, task, model_name, True)
+        try:
+            yield model
+        finally:
+            await asyncio.to_thread(self._release, key)
+
+    def _release(self, key: Tuple[str, str]) -> None:
+        with self._lock:
+            entry = self._resident.get(key)
+            if entry is not None:
+                entry.pins -= 1
+            evicted = self._enforce_budget()
+        self._dispose(evicted)
+
+    def _enforce_budget(self, keep: Optional[Tuple[str, str]] = None
+                        ) -> List[Tuple[Tuple[str, str], _Resident]]:
+        """Remove models over the budget; returns them for ``_dispose`` once the lock is released."""
+        # Caller holds ``self._lock``
+        evicted: List[Tuple[Tuple[str, str], _Resident]] = []
+        if not self.ram_budget_bytes:
+            return evicted
+        total = sum(e.size_bytes for e in self._resident.values())
+        for key in list(self._resident):
+            if total <= self.ram_budget_bytes:
+                break
+            entry = self._resident[key]
+            if key == keep or entry.pins:
+                continue
+            total -= entry.size_bytes
+            evicted.append((key, self._resident.pop(key)))
+            self.evictions += 1
+        return evicted
+
+    @staticmethod
+    def _dispose(evicted: List[Tuple[Tuple[str, str], _Resident]]) -> None:
+        """Close removed models outside ``_lock``, so other lookups are not stalled."""
+        if not evicted:
+            return
+        for key, entry in evicted:
+            close = getattr(entry.model, "close", None)
+            if callable(close):
+                close()
+            entry.model = None
+            print(f"Unloaded {key[1]} for {key[0]}")
+        gc.collect()
+
+    def unload(self, task: str, model_name: Optional[str] = None) -> bool:
+        key = self._key(task, model_name)
+        with self._lock:
+            entry = self._resident.get(key)
+            if entry is None or entry.pins:
+                return False
+            self._resident.pop(key)
+        self._dispose([(key, entry)])
+        return True
+
+    def preload(self, tasks: Optional[List[str]] = None) -> None:
+        """Load ``tasks`` (default: the configured ``preload`` list) ahead of first use."""
+        for task in self.preload_tasks if tasks is None else tasks:
+            try:
+                self.get(task)
+            except ModelUnavailableError as e:
+                print(f"Skipping preload of {task}: {e}")
+
+    def loaded(self) -> Dict[Tuple[str, str], Any]:
+        with self._lock:
+            return {key: entry.model for key, entry in self._resident.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {
+                f"{task}:{name}": {
+                    "backend": e.backend,
+                    "size_mb": round(e.size_bytes / (1024 * 1024), 1),
+                    "uses": e.uses,
+                    "pins": e.pins,
+                    "idle_s": round(time.time() - e.last_used, 1),
+                }
+                for (task, name), e in self._resident.items()
+            }
+            return {
+                "ram_budget_mb": self.ram_budget_bytes / (1024 * 1024) or None,
+                "resident_mb": round(sum(e.size_bytes for e in self._resident.values()) / (1024 * 1024), 1),
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "models": models,
+            }
+
+
+_manager: Optional[ModelManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_model_manager() -> ModelManager:
+    """Return the process-wide model manager, configured from ``config/models.yaml``."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ModelManager.from_config(load_models_config())
+    return _manager
+
 
 def load_model(task: str) -> Callable:
     """Return a callable for the given task.
 
     If an Azure endpoint is configured for this model, return a wrapper that
-    calls the endpoint. Otherwise fall back to a local transformers pipeline.
+    calls the endpoint. Otherwise return the shared local model from the
+    model manager.
     """
     model_info = get_model_info(task)
 
@@ -28,7 +361,4 @@ def load_model(task: str) -> Callable:
 
         return call
 
-    if pipeline is None:
-        raise RuntimeError("transformers is required for local model loading")
-
-    return pipeline(task, model=model_info)
+    return get_model_manager().get(task)
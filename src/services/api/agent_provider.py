@@ -0,0 +1,128 @@
+import asyncio
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# Recorded when the API package is first imported so start-up time covers app import
+PROCESS_IMPORTED_AT = time.perf_counter()
+
+SETTINGS_PATH = os.environ.get(
+    "SUPERAGENT_SETTINGS",
+    str(Path(__file__).resolve().parents[3] / "config" / "settings.yaml"),
+)
+
+
+def load_settings(path: str = SETTINGS_PATH) -> Dict[str, Any]:
+    """Load ``config/settings.yaml``; missing file, empty file or no PyYAML give ``{}``."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        import yaml
+    except Exception:  # pragma: no cover - optional dependency
+        return {}
+    with open(path, "r") as f:
+        return yaml.safe_load(f) or {}
+
+
+def resident_memory_mb() -> float:
+    """Current resident set size of this process in MiB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):  # pragma: no cover - non-Linux
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _default_factory():
+    from src.agents.router_agent import RouterAgent
+
+    return RouterAgent(config=load_settings())
+
+
+class AgentProvider:
+    """Owns the single, lazily-built RouterAgent shared by HTTP and WebSocket handlers."""
+
+    def __init__(self, factory: Optional[Callable[[], Any]] = None):
+        self._factory = factory or _default_factory
+        self._agent = None
+        self._lock = threading.Lock()
+        self._warmup_task: Optional[asyncio.Task] = None
+        self.started_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.warmup_error: Optional[str] = None
+        self.ready = False
+
+    def get(self) -> Any:
+        """Return the shared RouterAgent, constructing it on first call."""
+        if self._agent is None:
+            with self._lock:
+                if self._agent is None:
+                    self._agent = self._factory()
+        return self._agent
+
+    def peek(self) -> Any:
+        """Return the RouterAgent if it has been built, without building it."""
+        return self._agent
+
+    def mark_started(self) -> None:
+        """Record how long it took from import until the app could accept connections."""
+        self.started_seconds = time.perf_counter() - PROCESS_IMPORTED_AT
+        print(f"SuperAgent started in {self.started_seconds:.3f}s, rss={resident_memory_mb():.1f}MiB")
+
+    def _warm_up(self) -> None:
+        start = time.perf_counter()
+        try:
+            agent = self.get()
+            if hasattr(agent, "warm_up"):
+                agent.warm_up()
+            self.ready = True
+        except Exception as e:
+            self.warmup_error = str(e)
+        finally:
+            self.warmup_seconds = time.perf_counter() - start
+            print(f"SuperAgent warm-up finished in {self.warmup_seconds:.3f}s, ready={self.ready}")
+
+    def start_warm_up(self) -> asyncio.Task:
+        """Load models in a worker thread; repeated calls share the same task."""
+        if self._warmup_task is None or (self._warmup_task.done() and not self.ready):
+            self.warmup_error = None
+            self._warmup_task = asyncio.get_running_loop().create_task(
+                asyncio.to_thread(self._warm_up)
+            )
+        return self._warmup_task
+
+    async def shutdown(self) -> None:
+        """Let the agent flush background work (e.g. conversation logs) before exit."""
+        if self._warmup_task is not None and not self._warmup_task.done():
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+        agent = self._agent
+        if agent is not None and hasattr(agent, "aclose"):
+            await agent.aclose()
+        elif agent is not None and hasattr(agent, "close"):
+            await asyncio.to_thread(agent.close)
+
+    def status(self) -> Dict[str, Any]:
+        if self.ready:
+            state = "ready"
+        elif self.warmup_error:
+            state = "failed"
+        elif self._warmup_task is not None:
+            state = "warming"
+        else:
+            state = "cold"
+        return {
+            "status": state,
+            "startup_seconds": self.started_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.warmup_error,
+            "rss_mb": round(resident_memory_mb(), 1),
+        }
+
+
+provider = AgentProvider()
+get_router_agent = provider.get
@@ -1,8 +1,25 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, WebSocket
 from .routes import router
+from ..agent_provider import provider
+from src.services.azure_client import get_async_client
 from ..websocket_handler import handle_websocket
 
-app = FastAPI(title="SuperAgent API")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    provider.mark_started()
+    # Models load in the background so the worker accepts connections immediately
+    if os.environ.get("SUPERAGENT_WARMUP_ON_STARTUP", "1") != "0":
+        provider.start_warm_up()
+    yield
+    await provider.shutdown()
+    await get_async_client().aclose()
+
+
+app = FastAPI(title="SuperAgent API", lifespan=lifespan)
 
 # Include standard HTTP routes
 app.include_router(router)
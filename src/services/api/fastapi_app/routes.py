@@ -1,36 +1,95 @@
 from fastapi import APIRouter, UploadFile, File
-from typing import Dict, Any
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Dict, Any, AsyncIterator
+import json
 import os
-import shutil
 
-from src.agents.router_agent import RouterAgent
+from ..agent_provider import get_router_agent, provider
+from src.services.azure_client import get_async_client
+from src.core.cache.http_cache import get_http_cache
+from src.services.upload_store import UploadStore
+from src.models.blip_captioner import loaded_captioners
+from src.models.model_loader import get_model_manager
 
 router = APIRouter()
-router_agent = RouterAgent(config={})
 
 UPLOAD_DIR = os.path.join(os.path.dirname(__file__), "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+upload_store = UploadStore(UPLOAD_DIR)
 
 @router.get("/health")
 async def health() -> Dict[str, str]:
     """Simple health check."""
     return {"status": "ok"}
 
+@router.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness check: 200 once models are warm, 503 while still loading."""
+    status = provider.status()
+    return JSONResponse(status, status_code=200 if provider.ready else 503)
+
+@router.post("/warmup")
+async def warmup() -> Dict[str, Any]:
+    """Start loading the classifier and expert agents in the background."""
+    provider.start_warm_up()
+    return provider.status()
+
+@router.get("/metrics")
+async def metrics() -> Any:
+    """Routing counters showing how much traffic skips the classifier model."""
+    router_agent = provider.peek()
+    if router_agent is None:
+        # Building the agent here would load it on the event loop; warm-up does that
+        return JSONResponse({**provider.status(), "status": "not ready"}, status_code=503)
+    batcher = router_agent.classifier_batcher
+    return {
+        "routing": router_agent.routing_stats(),
+        "classification_cache": router_agent.classification_cache.stats(),
+        "response_cache": router_agent.response_cache.stats(),
+        "http_cache": get_http_cache().stats(),
+        "uploads": upload_store.stats(),
+        "image_batching": {name: c.stats() for name, c in loaded_captioners().items()},
+        "models": get_model_manager().stats(),
+        "classifier_batching": batcher.stats() if batcher else None,
+        "azure_in_flight": get_async_client().stats(),
+        "agent_executors": router_agent.executors.stats(),
+        "conversation_log": router_agent.cosmos_logger.stats() if router_agent.cosmos_logger else None,
+    }
+
 @router.post("/process")
 async def process_input(data: Dict[str, Any]) -> Dict[str, Any]:
     """Process arbitrary JSON input through the RouterAgent."""
-    return await router_agent.process_input(data)
+    return await get_router_agent().process_input(data)
+
+@router.post("/process/stream")
+async def process_stream(data: Dict[str, Any]) -> StreamingResponse:
+    """Process input and stream partial output as server-sent events."""
+    async def events() -> AsyncIterator[str]:
+        async for event in get_router_agent().astream_input(data):
+            yield f"data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
 
 @router.post("/upload")
 async def upload_file(file: UploadFile = File(...)) -> Dict[str, Any]:
-    """Upload a file and process it based on its type."""
-    file_ext = os.path.splitext(file.filename)[1].lstrip(".").lower()
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    """Upload a file and process it based on its type.
+
+    Files are stored by content digest; re-uploading identical content
+    returns the cached result without processing it again.
+    """
+    file_ext = os.path.splitext(file.filename or "")[1].lstrip(".").lower()
+    saved = await upload_store.save(file, file_ext)
+    upload_info = {"filename": file.filename, "digest": saved["digest"], "size": saved["size"]}
+
+    cached = await upload_store.aget_result(saved["digest"], file_ext)
+    if cached is not None:
+        return {"status": "success", "result": cached, "source": "upload_cache", "upload": upload_info}
 
     input_data = {
-        "content": file_path,
+        "content": saved["path"],
         "metadata": {"file_type": file_ext},
     }
-    return await router_agent.process_input(input_data)
+    response = await get_router_agent().process_input(input_data)
+    if response.get("status") == "success":
+        await upload_store.aset_result(saved["digest"], file_ext, response["result"])
+    return {**response, "upload": upload_info}
@@ -1,15 +1,21 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from src.agents.router_agent import RouterAgent
-
-router_agent = RouterAgent(config={})
+from .agent_provider import get_router_agent
 
 async def handle_websocket(websocket: WebSocket) -> None:
-    """Receive messages over a WebSocket and respond via the RouterAgent."""
+    """Receive messages over a WebSocket and respond via the RouterAgent.
+
+    Messages with ``"stream": true`` receive partial ``{"status": "streaming"}``
+    events followed by the final result.
+    """
     await websocket.accept()
     try:
         while True:
             data = await websocket.receive_json()
-            result = await router_agent.process_input(data)
-            await websocket.send_json(result)
+            if data.get("stream"):
+                async for event in get_router_agent().astream_input(data):
+                    await websocket.send_json(event)
+            else:
+                result = await get_router_agent().process_input(data)
+                await websocket.send_json(result)
     except WebSocketDisconnect:
         pass
@@ -1,31 +1,198 @@
+import asyncio
 import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
 import requests
 
+try:  # Optional async HTTP dependency
+    import httpx
+except Exception:  # pragma: no cover - optional
+    httpx = None
 
-def call_azure(endpoint: str, api_key: str, payload: dict) -> dict:
-    """Generic helper to POST JSON payloads to an Azure endpoint."""
-    headers = {
+# Connection pool and timeout settings shared by the sync and async clients
+HTTP_TIMEOUT = float(os.environ.get("AZURE_HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("AZURE_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("AZURE_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("AZURE_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_PER_ENDPOINT_LIMIT = int(os.environ.get("AZURE_HTTP_PER_ENDPOINT_LIMIT", "16"))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _headers(api_key: str) -> Dict[str, str]:
+    return {
         "api-key": api_key,
         "Content-Type": "application/json",
     }
-    response = requests.post(endpoint, json=payload, headers=headers, timeout=30)
+
+
+def _get_session() -> "requests.Session":
+    """Return a process-wide keep-alive session for the sync helpers."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=HTTP_MAX_KEEPALIVE,
+                    pool_maxsize=HTTP_MAX_CONNECTIONS,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def call_azure(endpoint: str, api_key: str, payload: dict, timeout: Optional[float] = None) -> dict:
+    """Generic helper to POST JSON payloads to an Azure endpoint."""
+    response = _get_session().post(
+        endpoint,
+        json=payload,
+        headers=_headers(api_key),
+        timeout=(HTTP_CONNECT_TIMEOUT, timeout or HTTP_TIMEOUT),
+    )
     response.raise_for_status()
     return response.json()
 
 
-def zero_shot_classify(text: str, labels: list[str]) -> str:
-    """Classify text using an Azure OpenAI custom endpoint."""
+def close_stale_client(client, old_loop, loop) -> None:
+    """Close a pooled client left behind by an event loop that is no longer ours."""
+    if old_loop is not None and old_loop.is_running() and not old_loop.is_closed():
+        asyncio.run_coroutine_threadsafe(client.aclose(), old_loop)
+        return
+
+    async def close() -> None:
+        try:
+            await client.aclose()
+        except Exception:
+            pass  # Its loop is gone; the sockets are released with the client
+
+    loop.create_task(close())
+
+
+class AsyncAzureClient:
+    """Pooled keep-alive async client with a concurrency cap per endpoint.
+
+    The underlying ``httpx.AsyncClient`` is created on first use inside the
+    running event loop. Without httpx installed, calls fall back to the sync
+    helper on a worker thread so the event loop is still never blocked.
+    """
+
+    def __init__(self, max_connections: int = HTTP_MAX_CONNECTIONS,
+                 max_keepalive: int = HTTP_MAX_KEEPALIVE,
+                 per_endpoint_limit: int = HTTP_PER_ENDPOINT_LIMIT,
+                 timeout: float = HTTP_TIMEOUT, connect_timeout: float = HTTP_CONNECT_TIMEOUT):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.per_endpoint_limit = per_endpoint_limit
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._client = None
+        self._loop = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+
+    def _bind_loop(self) -> None:
+        # Pools and semaphores belong to one event loop; rebuild them if it changes
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            if self._client is not None:
+                close_stale_client(self._client, self._loop, loop)
+            self._loop = loop
+            self._client = None
+            self._semaphores = {}
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            )
+        return self._client
+
+    @staticmethod
+    def _endpoint_key(endpoint: str) -> str:
+        parts = urlsplit(endpoint)
+        return f"{parts.netloc}{parts.path}"
+
+    async def post(self, endpoint: str, api_key: str, payload: dict,
+                   timeout: Optional[float] = None) -> dict:
+        self._bind_loop()
+        key = self._endpoint_key(endpoint)
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = self._semaphores[key] = asyncio.Semaphore(self.per_endpoint_limit)
+        async with semaphore:
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+            try:
+                if httpx is None:
+                    return await asyncio.to_thread(call_azure, endpoint, api_key, payload, timeout)
+                kwargs = {}
+                if timeout is not None:
+                    kwargs["timeout"] = httpx.Timeout(timeout, connect=self.connect_timeout)
+                response = await self._get_client().post(
+                    endpoint, json=payload, headers=_headers(api_key), **kwargs
+                )
+                response.raise_for_status()
+                return response.json()
+            finally:
+                self._in_flight[key] -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Requests currently in flight per endpoint."""
+        return dict(self._in_flight)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+        self._loop = None
+        self._semaphores = {}
+
+
+_async_client: Optional[AsyncAzureClient] = None
+
+
+def get_async_client() -> AsyncAzureClient:
+    """Return the process-wide async client."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncAzureClient()
+    return _async_client
+
+
+async def acall_azure(endpoint: str, api_key: str, payload: dict, timeout: Optional[float] = None) -> dict:
+    """Async counterpart of ``call_azure`` using the shared connection pool."""
+    return await get_async_client().post(endpoint, api_key, payload, timeout=timeout)
+
+
+def _classify_request(text: str, labels: list[str]) -> Tuple[str, str, dict]:
     endpoint = os.environ.get("AZURE_OPENAI_CLASSIFY_ENDPOINT")
     api_key = os.environ.get("AZURE_OPENAI_API_KEY")
     if not endpoint or not api_key:
         raise RuntimeError("Azure OpenAI classification endpoint not configured")
-    payload = {"text": text, "labels": labels}
-    result = call_azure(endpoint, api_key, payload)
+    return endpoint, api_key, {"text": text, "labels": labels}
+
+
+def zero_shot_classify(text: str, labels: list[str]) -> str:
+    """Classify text using an Azure OpenAI custom endpoint."""
+    result = call_azure(*_classify_request(text, labels))
     return result.get("label", labels[0])
 
 
-def summarize(text: str, max_length: int = 130, min_length: int = 30) -> str:
-    """Summarize text via an Azure OpenAI endpoint."""
+async def azero_shot_classify(text: str, labels: list[str]) -> str:
+    """Async variant of ``zero_shot_classify``."""
+    result = await acall_azure(*_classify_request(text, labels))
+    return result.get("label", labels[0])
+
+
+def _summarize_request(text: str, max_length: int, min_length: int) -> Tuple[str, str, dict]:
     endpoint = os.environ.get("AZURE_OPENAI_SUMMARIZE_ENDPOINT")
     api_key = os.environ.get("AZURE_OPENAI_API_KEY")
     if not endpoint or not api_key:
@@ -35,16 +202,64 @@ def summarize(text: str, max_length: int = 130, min_length: int = 30) -> str:
         "max_length": max_length,
         "min_length": min_length,
     }
-    result = call_azure(endpoint, api_key, payload)
+    return endpoint, api_key, payload
+
+
+def summarize(text: str, max_length: int = 130, min_length: int = 30) -> str:
+    """Summarize text via an Azure OpenAI endpoint."""
+    result = call_azure(*_summarize_request(text, max_length, min_length))
     return result.get("summary", "")
 
 
-def caption_image(image_url: str) -> str:
-    """Generate an image caption using Azure Cognitive Services."""
+async def asummarize(text: str, max_length: int = 130, min_length: int = 30) -> str:
+    """Async variant of ``summarize``."""
+    result = await acall_azure(*_summarize_request(text, max_length, min_length))
+    return result.get("summary", "")
+
+
+def _caption_request(image_url: str) -> Tuple[str, str, dict]:
     endpoint = os.environ.get("AZURE_IMAGE_CAPTION_ENDPOINT")
     api_key = os.environ.get("AZURE_COGNITIVE_KEY")
     if not endpoint or not api_key:
         raise RuntimeError("Azure image caption endpoint not configured")
-    payload = {"image_url": image_url}
-    result = call_azure(endpoint, api_key, payload)
+    return endpoint, api_key, {"image_url": image_url}
+
+
+def caption_image(image_url: str) -> str:
+    """Generate an image caption using Azure Cognitive Services."""
+    result = call_azure(*_caption_request(image_url))
+    return result.get("caption", "")
+
+
+async def acaption_image(image_url: str) -> str:
+    """Async variant of ``caption_image``."""
+    result = await acall_azure(*_caption_request(image_url))
     return result.get("caption", "")
+
+
+def embedding_configured() -> bool:
+    return bool(os.environ.get("AZURE_OPENAI_EMBEDDING_ENDPOINT") and os.environ.get("AZURE_OPENAI_API_KEY"))
+
+
+def _embed_request(text: str) -> Tuple[str, str, dict]:
+    endpoint = os.environ.get("AZURE_OPENAI_EMBEDDING_ENDPOINT")
+    api_key = os.environ.get("AZURE_OPENAI_API_KEY")
+    if not endpoint or not api_key:
+        raise RuntimeError("Azure OpenAI embedding endpoint not configured")
+    return endpoint, api_key, {"input": text}
+
+
+def _embedding(result: dict) -> List[float]:
+    if "data" in result:  # OpenAI embeddings response shape
+        return result["data"][0]["embedding"]
+    return result.get("embedding", [])
+
+
+def embed_text(text: str) -> List[float]:
+    """Embed text via an Azure OpenAI embeddings deployment."""
+    return _embedding(call_azure(*_embed_request(text)))
+
+
+async def aembed_text(text: str) -> List[float]:
+    """Async variant of ``embed_text``."""
+    return _embedding(await acall_azure(*_embed_request(text)))
@@ -0,0 +1,202 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class MicroBatcher:
+    """Coalesce concurrent async calls into batched invocations of ``batch_fn``.
+
+    Items submitted within ``max_wait_ms`` of each other (or until
+    ``max_batch_size`` items are waiting) are passed to ``batch_fn`` as one
+    list. ``batch_fn`` runs on a single worker thread so the event loop stays
+    responsive; while a batch is running new submissions keep accumulating and
+    are flushed as soon as the worker is free.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 8,
+                 max_wait_ms: float = 5.0, name: str = "batcher"):
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running = False
+        self._tasks: set = set()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue ``item`` and wait for its entry in the batched result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if not self._running:
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._running or not self._pending:
+            return
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        self._running = True
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in batch]
+        try:
+            results = await loop.run_in_executor(self._executor, self.batch_fn, items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"batch_fn returned {len(results)} results for {len(items)} items"
+                )
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.batches += 1
+            self.items += len(items)
+            self.largest_batch = max(self.largest_batch, len(items))
+            self._running = False
+            if self._pending:
+                self._flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "pending": len(self._pending),
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+class ThreadedMicroBatcher:
+    """Coalesce calls from many threads (or coroutines) into batched ``batch_fn`` calls.
+
+    A dedicated worker thread takes the first waiting item, then keeps
+    collecting for up to ``max_wait_ms`` or until ``max_batch_size`` items are
+    in hand, and runs ``batch_fn`` on the batch. ``submit`` blocks the calling
+    thread until its result is ready; ``asubmit`` awaits it without holding a
+    thread.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 8,
+                 max_wait_ms: float = 10.0, name: str = "batcher"):
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[Any, Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.busy_s = 0.0
+        self._worker = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._worker.start()
+
+    def _enqueue(self, item: Any) -> Future:
+        if self._closed:
+            raise RuntimeError("batcher is closed")
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Queue ``item`` and block until its entry in the batched result is ready."""
+        return self._enqueue(item).result(timeout)
+
+    async def asubmit(self, item: Any) -> Any:
+        return await asyncio.wrap_future(self._enqueue(item))
+
+    def _collect(self, first: Tuple[Any, Future]) -> Tuple[List[Tuple[Any, Future]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stop = self._collect(first)
+            self._run(batch)
+            if stop:
+                return
+
+    def _run(self, batch: List[Tuple[Any, Future]]) -> None:
+        items = [item for item, _ in batch]
+        start = time.perf_counter()
+        error: Optional[Exception] = None
+        try:
+            results = self.batch_fn(items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"batch_fn returned {len(results)} results for {len(items)} items"
+                )
+        except Exception as exc:
+            error = exc
+        # Counters are updated before callers are released so they see their own batch
+        with self._lock:
+            self.batches += 1
+            self.items += len(items)
+            self.largest_batch = max(self.largest_batch, len(items))
+            self.busy_s += time.perf_counter() - start
+        for i, (_, future) in enumerate(batch):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "items_per_s": self.items / self.busy_s if self.busy_s else 0.0,
+                "pending": self._queue.qsize(),
+            }
+
+    def close(self) -> None:
+        """Finish queued work and stop the worker thread."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime
-from typing import Any
+from typing import Any, Dict, List, Optional
 import uuid
 
 try:
@@ -10,26 +17,329 @@ except Exception:  # pragma: no cover - cosmos optional
     CosmosClient = None
     PartitionKey = None
 
+COSMOS_BATCH_SIZE = int(os.environ.get("COSMOS_LOG_BATCH_SIZE", "100"))
+COSMOS_FLUSH_INTERVAL = float(os.environ.get("COSMOS_LOG_FLUSH_INTERVAL", "0.5"))
+COSMOS_MAX_QUEUE = int(os.environ.get("COSMOS_LOG_MAX_QUEUE", "10000"))
+# What ``log_message`` does when the queue is full: block, drop or spill
+COSMOS_OVERFLOW = os.environ.get("COSMOS_LOG_OVERFLOW", "block")
+COSMOS_SPILL_PATH = os.environ.get("COSMOS_LOG_SPILL_PATH", "cosmos_spill.jsonl")
+# Longest wait for room under ``block`` before the item is spilled (or dropped)
+COSMOS_BLOCK_TIMEOUT = float(os.environ.get("COSMOS_LOG_BLOCK_TIMEOUT", "1.0"))
+# Longest pause between spill replays while Cosmos keeps failing
+COSMOS_REPLAY_MAX_BACKOFF = float(os.environ.get("COSMOS_LOG_REPLAY_MAX_BACKOFF", "60"))
+
+# Cosmos transactional batches hold at most 100 operations on one partition key
+MAX_TRANSACTIONAL_BATCH = 100
+OVERFLOW_POLICIES = ("block", "drop", "spill")
+
+_STOP = object()
+# Seconds between repeated warnings of the same kind
+_WARNING_INTERVAL = 10.0
+
 
 class CosmosConversationLogger:
-    """Store conversation messages in Azure Cosmos DB."""
+    """Store conversation messages in Azure Cosmos DB without blocking callers.
 
-    def __init__(self, connection_str: str, database: str, container: str) -> None:
+    ``log_message`` only enqueues the item on a bounded in-memory queue. A
+    flusher thread writes the queue every ``flush_interval`` seconds, or as
+    soon as ``batch_size`` items are waiting, grouping items by conversation
+    (the partition key) into transactional batches. When the queue is full
+    ``overflow`` decides: ``block`` waits up to ``block_timeout`` seconds for
+    room, ``drop`` discards the item, and ``spill`` appends it to
+    ``spill_path``, which is replayed once the queue is idle. Under
+    ``block``, items still without room after the timeout are spilled too
+    when a ``spill_path`` is set, and dropped with a warning otherwise.
+    Event-loop callers use ``alog_message``, which never waits on the loop.
+    After a failed write the spill replay backs off exponentially, up to
+    ``replay_max_backoff`` seconds, until a write succeeds again; failures are
+    logged once per batch and at most every few seconds.
+    ``close`` drains everything still queued.
+    """
+
+    def __init__(self, container: Any, batch_size: int = COSMOS_BATCH_SIZE,
+                 flush_interval: float = COSMOS_FLUSH_INTERVAL, max_queue: int = COSMOS_MAX_QUEUE,
+                 overflow: str = COSMOS_OVERFLOW, spill_path: Optional[str] = COSMOS_SPILL_PATH,
+                 block_timeout: float = COSMOS_BLOCK_TIMEOUT,
+                 replay_max_backoff: float = COSMOS_REPLAY_MAX_BACKOFF) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        if overflow == "spill" and not spill_path:
+            raise ValueError("overflow='spill' requires a spill_path")
+        self.container = container
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self.block_timeout = block_timeout
+        self.replay_max_backoff = replay_max_backoff
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._spill_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._stop = threading.Event()
+        self._last_warning: Dict[str, float] = {}
+        # Only touched by the flusher thread
+        self._replay_backoff = 0.0
+        self._next_replay = 0.0
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.failed = 0
+        self.last_flush_ms = 0.0
+        # Claimed now, so only items spilled by a previous process are replayed at start
+        self._startup_replay = self._claim_spill()
+        # Items accepted or replayed and not yet written or failed (plus one until the
+        # startup replay has been read)
+        self._pending = 1 if self._startup_replay else 0
+        self._thread = threading.Thread(target=self._run, name="cosmos-log-flusher", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_connection_string(cls, connection_str: str, database: str, container: str,
+                               **options: Any) -> "CosmosConversationLogger":
         if CosmosClient is None:
             raise ImportError("azure-cosmos is required for CosmosConversationLogger")
-        self.client = CosmosClient.from_connection_string(connection_str)
-        self.database = self.client.create_database_if_not_exists(database)
-        self.container = self.database.create_container_if_not_exists(
+        client = CosmosClient.from_connection_string(connection_str)
+        db = client.create_database_if_not_exists(database)
+        container_client = db.create_container_if_not_exists(
             id=container,
             partition_key=PartitionKey(path="/conversation_id"),
         )
+        return cls(container_client, **options)
 
-    def log_message(self, conversation_id: str, role: str, content: Any) -> None:
-        item = {
+    @staticmethod
+    def _item(conversation_id: str, role: str, content: Any) -> Dict[str, Any]:
+        return {
             "id": str(uuid.uuid4()),
             "conversation_id": conversation_id,
             "role": role,
             "content": content,
             "timestamp": datetime.utcnow().isoformat(),
         }
-        self.container.upsert_item(item)
+
+    def log_message(self, conversation_id: str, role: str, content: Any) -> None:
+        self._enqueue(self._item(conversation_id, role, content))
+
+    async def alog_message(self, conversation_id: str, role: str, content: Any) -> None:
+        """``log_message`` for event-loop callers: a full queue is handled in a worker thread."""
+        item = self._item(conversation_id, role, content)
+        if not self._put(item, block=False):
+            await asyncio.to_thread(self._enqueue, item)
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def _put(self, item: Dict[str, Any], block: bool) -> bool:
+        if self._closed:
+            return False
+        self._count("_pending")
+        try:
+            if block:
+                self._queue.put(item, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            self._count("_pending", -1)
+            return False
+        self._count("enqueued")
+        return True
+
+    def _enqueue(self, item: Dict[str, Any]) -> None:
+        if not self._put(item, block=self.overflow == "block"):
+            self._overflow([item])
+
+    def _overflow(self, items: List[Dict[str, Any]]) -> None:
+        """Spill ``items`` to disk when possible, otherwise count them as dropped."""
+        if self.overflow != "drop" and self.spill_path:
+            try:
+                with self._spill_lock, open(self.spill_path, "a") as f:
+                    for item in items:
+                        f.write(json.dumps(item, default=str) + "\n")
+                self._count("spilled", len(items))
+                return
+            except OSError as e:
+                print(f"Failed to spill conversation log items: {e}")
+        self._count("dropped", len(items))
+        if self.overflow != "drop":
+            self._warn("drop", f"Conversation log queue full: dropped {self.dropped} item(s) so far")
+
+    def _warn(self, kind: str, message: str) -> None:
+        """Print ``message`` unless a ``kind`` warning was printed in the last ``_WARNING_INTERVAL`` seconds."""
+        now = time.monotonic()
+        last = self._last_warning.get(kind)
+        if last is None or now - last >= _WARNING_INTERVAL:
+            self._last_warning[kind] = now
+            print(message)
+
+    def _collect(self) -> tuple:
+        """Wait for the first item, then gather until ``batch_size`` or ``flush_interval``."""
+        try:
+            first = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return [], self._stop.is_set()
+        if first is _STOP:
+            return [], True
+        items = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(items) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def _run(self) -> None:
+        if self._startup_replay:
+            self._replay(self._startup_replay)
+            self._count("_pending", -1)
+        stopping = False
+        while not stopping:
+            items, stopping = self._collect()
+            if items:
+                self._write(items)
+            elif not stopping:
+                self._replay_spill()
+        # Drain whatever arrived before ``close``
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                items.append(item)
+        if items:
+            self._write(items)
+
+    def _write(self, items: List[Dict[str, Any]]) -> int:
+        """Write ``items`` and return how many failed; failures push back the next spill replay."""
+        start = time.perf_counter()
+        by_partition: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for item in items:
+            by_partition[item["conversation_id"]].append(item)
+        failed: List[Dict[str, Any]] = []
+        for partition_key, group in by_partition.items():
+            for i in range(0, len(group), MAX_TRANSACTIONAL_BATCH):
+                failed.extend(self._write_batch(partition_key, group[i:i + MAX_TRANSACTIONAL_BATCH]))
+        with self._stats_lock:
+            self.written += len(items) - len(failed)
+            self._pending -= len(items)
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+        if not failed:
+            self._replay_backoff = 0.0
+            self._next_replay = 0.0
+            return 0
+        self._count("failed", len(failed))
+        if self.overflow != "drop" and self.spill_path:
+            self._overflow(failed)  # Retried on the next replay
+        self._replay_backoff = min(max(self._replay_backoff * 2, self.flush_interval),
+                                   self.replay_max_backoff)
+        self._next_replay = time.monotonic() + self._replay_backoff
+        return len(failed)
+
+    def _write_batch(self, partition_key: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write one partition's items; returns the ones that could not be written."""
+        execute_batch = getattr(self.container, "execute_item_batch", None)
+        if execute_batch is not None and len(items) > 1:
+            try:
+                execute_batch([("upsert", (item,)) for item in items], partition_key=partition_key)
+                self._count("batches")
+                return []
+            except Exception as e:
+                self._warn("batch", f"Cosmos batch write failed for {partition_key}, retrying per item: {e}")
+        failed = []
+        error: Optional[Exception] = None
+        for item in items:
+            try:
+                self.container.upsert_item(item)
+            except Exception as e:
+                error = e
+                failed.append(item)
+        self._count("batches")
+        if failed:
+            self._warn("write", f"Cosmos write failed for {len(failed)} of {len(items)} "
+                                f"item(s) in {partition_key}: {error}")
+        return failed
+
+    def _claim_spill(self) -> Optional[str]:
+        """Move the spill file aside for replay; returns its new path."""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return None
+        replay_path = f"{self.spill_path}.{uuid.uuid4().hex}.replay"
+        with self._spill_lock:
+            try:
+                os.replace(self.spill_path, replay_path)
+            except OSError:
+                return None
+        return replay_path
+
+    def _replay_spill(self) -> None:
+        if time.monotonic() < self._next_replay:
+            return  # Still backing off after a failed write
+        replay_path = self._claim_spill()
+        if replay_path:
+            self._replay(replay_path)
+
+    def _replay(self, replay_path: str) -> None:
+        try:
+            with open(replay_path, "r") as f:
+                items = [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            print(f"Failed to read spilled conversation log items: {e}")
+            return
+        self._count("_pending", len(items))
+        for i in range(0, len(items), self.batch_size):
+            if self._write(items[i:i + self.batch_size]) and self.overflow != "drop":
+                # Cosmos is failing: put the rest back untried for the next replay
+                rest = items[i + self.batch_size:]
+                if rest:
+                    self._overflow(rest)
+                    self._count("_pending", -len(rest))
+                break
+        os.remove(replay_path)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued or replaying item has been written; ``False`` on timeout."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._stats_lock:
+                done = self._pending <= 0
+            if done and self._queue.empty():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop accepting items and write everything still queued, for at most ``timeout`` seconds."""
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        try:
+            self._queue.put_nowait(_STOP)  # Wakes an idle flusher at once
+        except queue.Full:
+            pass  # A busy flusher sees ``_stop`` once the queue has been emptied
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print("Cosmos conversation logger did not drain before the shutdown timeout")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "queued": self._queue.qsize(),
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "batches": self.batches,
+                "dropped": self.dropped,
+                "spilled": self.spilled,
+                "failed": self.failed,
+                "last_flush_ms": round(self.last_flush_ms, 2),
+                "overflow": self.overflow,
+            }
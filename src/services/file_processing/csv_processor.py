@@ -0,0 +1,184 @@
+import os
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+try:  # Optional faster streaming CSV reader
+    import pyarrow
+    from pyarrow import csv as pa_csv
+except Exception:  # pragma: no cover - optional
+    pyarrow = None
+    pa_csv = None
+
+CHUNK_ROWS = int(os.environ.get("CSV_CHUNK_ROWS", "100000"))
+
+
+def _json_value(value: Any) -> Any:
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if hasattr(value, "item"):  # NumPy scalar
+        return value.item()
+    return str(value)
+
+
+class _ColumnProfile:
+    """Running statistics for one column, updated one chunk at a time.
+
+    Chunks are typed independently, so the column's kind (numeric or
+    categorical) is fixed by the first chunk holding any value and later
+    chunks are coerced to it: text in a numeric column is counted as
+    ``invalid``, numbers in a categorical column become categories.
+    """
+
+    def __init__(self, max_categories: int):
+        self.max_categories = max_categories
+        self.kind: Optional[str] = None
+        self.count = 0
+        self.nulls = 0
+        self.invalid = 0
+        self.numeric_dtypes: List[np.dtype] = []
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+        self.total = 0.0
+        self.categories: Counter = Counter()
+        self.categories_truncated = False
+
+    def update(self, series) -> None:
+        import pandas as pd
+
+        self.nulls += int(series.isna().sum())
+        values = series.dropna()
+        if not len(values):
+            return  # An all-null chunk says nothing about the column's type
+        numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        if self.kind is None:
+            self.kind = "numeric" if numeric else "categorical"
+        if self.kind == "numeric":
+            if not numeric:
+                parsed = pd.to_numeric(values, errors="coerce").notna()
+                self.invalid += int((~parsed).sum())
+                values = pd.to_numeric(values[parsed])  # Re-parsed so integers stay integers
+                if not len(values):
+                    return
+            self.numeric_dtypes.append(values.dtype)
+            self.count += len(values)
+            lo, hi = values.min(), values.max()
+            self.minimum = lo if self.minimum is None else min(self.minimum, lo)
+            self.maximum = hi if self.maximum is None else max(self.maximum, hi)
+            self.total += float(values.to_numpy(dtype="float64").sum())
+            return
+        self.count += len(values)
+        self.categories.update(values.astype(str).value_counts().to_dict())
+        if len(self.categories) > self.max_categories:
+            # Keep memory bounded on high-cardinality columns; counts become approximate
+            self.categories = Counter(dict(self.categories.most_common(self.max_categories // 2)))
+            self.categories_truncated = True
+
+    def summary(self, top_k: int) -> Dict[str, Any]:
+        if self.kind == "numeric" and self.numeric_dtypes:
+            dtype = str(np.result_type(*self.numeric_dtypes))
+        else:
+            dtype = "object"
+        result: Dict[str, Any] = {"dtype": dtype, "count": self.count, "nulls": self.nulls}
+        if self.kind == "categorical":
+            result["top_categories"] = [
+                {"value": value, "count": count} for value, count in self.categories.most_common(top_k)
+            ]
+            result["distinct"] = len(self.categories)
+            result["approximate"] = self.categories_truncated
+        elif self.count:
+            result["min"] = self.minimum.item() if hasattr(self.minimum, "item") else self.minimum
+            result["max"] = self.maximum.item() if hasattr(self.maximum, "item") else self.maximum
+            result["mean"] = self.total / self.count
+        if self.invalid:
+            result["invalid"] = self.invalid
+        return result
+
+
+class CSVProfiler:
+    """Profile a CSV in fixed-size chunks with memory independent of file size.
+
+    Produces the row count, per-column dtype, null count, min/max/mean for
+    numeric columns and top categories for the rest, plus a uniform sample of
+    at most ``sample_rows`` rows. Uses pyarrow's streaming reader when it is
+    installed and pandas' chunked reader otherwise.
+    """
+
+    def __init__(self, chunk_rows: int = CHUNK_ROWS, sample_rows: int = 20, top_k: int = 5,
+                 max_categories: int = 10000, seed: int = 0):
+        self.chunk_rows = chunk_rows
+        self.sample_rows = sample_rows
+        self.top_k = top_k
+        self.max_categories = max_categories
+        self.seed = seed
+
+    def _chunks_pyarrow(self, file_path: str) -> Iterator[Any]:
+        # Streaming blocks of roughly ``chunk_rows`` rows, assuming ~128 bytes per row
+        options = pa_csv.ReadOptions(block_size=max(1 << 20, self.chunk_rows * 128))
+        reader = pa_csv.open_csv(file_path, read_options=options)
+        for batch in reader:
+            yield batch.to_pandas()
+
+    def _chunks_pandas(self, file_path: str) -> Iterator[Any]:
+        import pandas as pd  # Deferred: heavy import only needed for CSVs
+
+        yield from pd.read_csv(file_path, chunksize=self.chunk_rows)
+
+    def profile(self, file_path: str) -> Dict[str, Any]:
+        if pa_csv is not None:
+            try:
+                return self._profile(self._chunks_pyarrow(file_path), engine="pyarrow")
+            except pyarrow.ArrowInvalid:
+                pass  # Types inferred from the first block did not fit a later one
+        return self._profile(self._chunks_pandas(file_path), engine="pandas")
+
+    def _profile(self, chunks: Iterator[Any], engine: str) -> Dict[str, Any]:
+        rng = np.random.default_rng(self.seed)
+        columns: Dict[str, _ColumnProfile] = {}
+        sample: List[Dict[str, Any]] = []
+        rows = 0
+        n_chunks = 0
+        for chunk in chunks:
+            n_chunks += 1
+            for name in chunk.columns:
+                if name not in columns:
+                    columns[name] = _ColumnProfile(self.max_categories)
+                columns[name].update(chunk[name])
+            sample = self._update_sample(sample, chunk, rows, rng)
+            rows += len(chunk)
+        return {
+            "rows": rows,
+            "columns": {name: col.summary(self.top_k) for name, col in columns.items()},
+            "sample": sample,
+            "chunks": n_chunks,
+            "engine": engine,
+        }
+
+    def _update_sample(self, sample: List[Dict[str, Any]], chunk, seen: int,
+                       rng: np.random.Generator) -> List[Dict[str, Any]]:
+        """Reservoir sampling over chunks: every row is kept with equal probability."""
+        k = self.sample_rows
+        if k <= 0 or not len(chunk):
+            return sample
+        positions = np.arange(len(chunk))
+        slots = np.empty(len(chunk), dtype=np.int64)
+        fill = max(0, min(k - seen, len(chunk)))
+        slots[:fill] = seen + positions[:fill]
+        if fill < len(chunk):
+            global_index = seen + positions[fill:]
+            slots[fill:] = rng.integers(0, global_index + 1)
+        chosen = np.nonzero(slots < k)[0]
+        if not len(chosen):
+            return sample
+        rows = chunk.iloc[chosen]
+        records = [
+            {name: _json_value(value) for name, value in record.items()}
+            for record in rows.astype(object).where(rows.notna(), None).to_dict("records")
+        ]
+        for slot, record in zip(slots[chosen], records):
+            if slot < len(sample):
+                sample[slot] = record
+            else:
+                sample.append(record)
+        return sample
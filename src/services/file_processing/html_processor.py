@@ -0,0 +1,154 @@
+import codecs
+import re
+import time
+from html.parser import HTMLParser
+from typing import Any, Dict, Optional, Tuple, Union
+
+_CHARSET = re.compile(r"charset=([\w-]+)", re.I)
+
+# Tags whose text is never shown to readers
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg"}
+# Block tags that implicitly close an open <p>
+_BLOCK_TAGS = {
+    "p", "div", "section", "article", "aside", "header", "footer", "nav", "ul", "ol",
+    "table", "form", "pre", "blockquote", "h1", "h2", "h3", "h4", "h5", "h6",
+}
+
+
+class PageSummaryParser(HTMLParser):
+    """Incremental parser that keeps only the page title and first paragraph.
+
+    Feed it chunks as they arrive and stop once ``done`` is set: the title
+    lives in ``<head>``, so by the time a meaningful paragraph (at least
+    ``min_paragraph_chars`` characters) has been read there is nothing left to
+    collect. Shorter paragraphs are kept as a fallback.
+    """
+
+    def __init__(self, min_paragraph_chars: int = 40):
+        super().__init__(convert_charrefs=True)
+        self.min_paragraph_chars = min_paragraph_chars
+        self.title: Optional[str] = None
+        self.paragraph: Optional[str] = None
+        self._fallback: Optional[str] = None
+        self._skip = 0
+        self._in_title = False
+        self._in_p = False
+        self._parts: list = []
+
+    @property
+    def done(self) -> bool:
+        return self.paragraph is not None
+
+    @property
+    def content(self) -> Optional[str]:
+        return self.paragraph or self._fallback
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag == "title" and self.title is None:
+            self._in_title = True
+            self._parts = []
+        elif tag in _BLOCK_TAGS:
+            if self._in_p:
+                self._finish_paragraph()
+            if tag == "p":
+                self._in_p = True
+                self._parts = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "title" and self._in_title:
+            self._in_title = False
+            self.title = " ".join("".join(self._parts).split())
+        elif tag == "p" and self._in_p:
+            self._finish_paragraph()
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip and (self._in_title or self._in_p):
+            self._parts.append(data)
+
+    def _finish_paragraph(self) -> None:
+        self._in_p = False
+        text = " ".join("".join(self._parts).split())
+        if not text:
+            return
+        if self._fallback is None:
+            self._fallback = text
+        if len(text) >= self.min_paragraph_chars and self.paragraph is None:
+            self.paragraph = text
+
+    def close(self) -> None:
+        super().close()
+        if self._in_p:
+            self._finish_paragraph()
+
+
+def _encoding(content_type: str) -> str:
+    match = _CHARSET.search(content_type or "")
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def fetch_page_summary(session, url: str, max_bytes: int = 2 * 1024 * 1024,
+                       timeout: Union[float, Tuple[float, float]] = (5.0, 10.0),
+                       chunk_size: int = 16 * 1024,
+                       min_paragraph_chars: int = 40,
+                       headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Stream ``url`` and return its title and first meaningful paragraph.
+
+    At most ``max_bytes`` are read and the download stops as soon as the
+    parser has what it needs. The result includes the bytes read, whether the
+    byte cap was hit or parsing finished early, and the time spent waiting on
+    the network versus parsing.
+    """
+    parser = PageSummaryParser(min_paragraph_chars=min_paragraph_chars)
+    fetch_s = parse_s = 0.0
+    received = 0
+    truncated = stopped_early = False
+    start = time.perf_counter()
+    response = session.get(url, stream=True, timeout=timeout, headers=headers)
+    try:
+        decoder = codecs.getincrementaldecoder(_encoding(response.headers.get("Content-Type", "")))(
+            errors="replace"
+        )
+        chunks = response.iter_content(chunk_size=chunk_size)
+        mark = time.perf_counter()
+        fetch_s += mark - start
+        for chunk in chunks:
+            fetched = time.perf_counter()
+            fetch_s += fetched - mark
+            if received + len(chunk) > max_bytes:
+                chunk = chunk[:max_bytes - received]
+                truncated = True
+            received += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            mark = time.perf_counter()
+            parse_s += mark - fetched
+            if parser.done:
+                stopped_early = True
+                break
+            if truncated:
+                break
+        parsed = time.perf_counter()
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+        parse_s += time.perf_counter() - parsed
+    finally:
+        response.close()
+    return {
+        "status_code": response.status_code,
+        "headers": dict(response.headers),
+        "title": parser.title,
+        "content": parser.content,
+        "bytes_read": received,
+        "truncated": truncated,
+        "stopped_early": stopped_early,
+        "fetch_ms": round(fetch_s * 1000, 2),
+        "parse_ms": round(parse_s * 1000, 2),
+    }
@@ -1,25 +1,40 @@
 from typing import Optional
+import asyncio
 import os
-from PIL import Image
 import requests
 from io import BytesIO
-from transformers import BlipProcessor, BlipForConditionalGeneration
-from src.services.azure_client import caption_image
+from src.services.azure_client import caption_image, acaption_image
+from src.models.model_loader import get_model_manager
+
+
+def load_image(image_url: str):
+    """Download an image and return it as an RGB PIL image."""
+    from PIL import Image
+
+    response = requests.get(image_url)
+    return Image.open(BytesIO(response.content)).convert("RGB")
+
 
 class ImageProcessor:
     """Perform basic image processing like caption generation."""
 
     def __init__(self, model_name: str = "Salesforce/blip-image-captioning-base"):
+        self.model_name = model_name
         self.use_azure = bool(os.environ.get("AZURE_IMAGE_CAPTION_ENDPOINT"))
-        if not self.use_azure:
-            self.processor = BlipProcessor.from_pretrained(model_name)
-            self.model = BlipForConditionalGeneration.from_pretrained(model_name)
+        # Shared with ImageAgent so concurrent captions are batched together
+        self.models = get_model_manager()
 
     def caption(self, image_url: str) -> str:
         if self.use_azure:
             return caption_image(image_url)
-        response = requests.get(image_url)
-        image = Image.open(BytesIO(response.content)).convert("RGB")
-        inputs = self.processor(image, return_tensors="pt")
-        out = self.model.generate(**inputs)
-        return self.processor.decode(out[0], skip_special_tokens=True)
+        image = load_image(image_url)
+        with self.models.use("image_caption", self.model_name) as captioner:
+            return captioner.caption(image)
+
+    async def acaption(self, image_url: str) -> str:
+        """Async variant of ``caption``; local images join the shared BLIP batch queue."""
+        if self.use_azure:
+            return await acaption_image(image_url)
+        image = await asyncio.to_thread(load_image, image_url)
+        async with self.models.ause("image_caption", self.model_name) as captioner:
+            return await captioner.acaption(image)
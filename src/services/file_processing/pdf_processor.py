@@ -1,15 +1,94 @@
-import PyPDF2
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+# Documents with at least this many requested pages are split across processes
+PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", "64"))
+PAGES_PER_TASK = int(os.environ.get("PDF_PAGES_PER_TASK", "16"))
+MAX_WORKERS = int(os.environ.get("PDF_WORKERS", str(os.cpu_count() or 1)))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _pdf_module():
+    # Deferred: heavy import only needed when extracting
+    try:
+        import pypdf
+        return pypdf
+    except ImportError:  # pragma: no cover - older installs
+        import PyPDF2
+        return PyPDF2
+
+
+def _extract_range(file_path: str, first: int, last: int) -> List[str]:
+    """Text of pages ``first``..``last`` (1-based, inclusive); runs in a worker process."""
+    reader = _pdf_module().PdfReader(file_path)
+    return [reader.pages[i].extract_text() or "" for i in range(first - 1, last)]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Spawned, not forked: the server process holds threads, event loops and models
+                _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
 
 class PDFProcessor:
-    """Utility class to extract text from PDF documents."""
-
-    @staticmethod
-    def extract_text(file_path: str) -> str:
-        text = ""
-        with open(file_path, "rb") as file:
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text
-        return text
+    """Utility class to extract text from PDF documents.
+
+    Pages are numbered from 1 and page ranges are inclusive. Large ranges are
+    extracted in parallel on a shared process pool, with results yielded in
+    page order as soon as each block of pages is ready.
+    """
+
+    @staticmethod
+    def page_count(file_path: str) -> int:
+        return len(_pdf_module().PdfReader(file_path).pages)
+
+    @staticmethod
+    def _resolve_range(count: int, first_page: int, last_page: Optional[int]) -> Tuple[int, int]:
+        last = count if last_page is None else min(last_page, count)
+        if first_page < 1 or last < first_page - 1:
+            raise ValueError(f"invalid page range {first_page}-{last_page} for {count} pages")
+        return first_page, last
+
+    @staticmethod
+    def iter_pages(file_path: str, first_page: int = 1, last_page: Optional[int] = None,
+                   parallel: Optional[bool] = None) -> Iterator[Tuple[int, str]]:
+        """Yield ``(page_number, text)`` for the requested pages, in order.
+
+        ``parallel`` forces or disables the process pool; by default it is used
+        for ranges of at least ``PARALLEL_MIN_PAGES`` pages.
+        """
+        reader = _pdf_module().PdfReader(file_path)
+        first, last = PDFProcessor._resolve_range(len(reader.pages), first_page, last_page)
+        n_pages = last - first + 1
+        if parallel is None:
+            parallel = MAX_WORKERS > 1 and n_pages >= PARALLEL_MIN_PAGES
+        if not parallel:
+            for number in range(first, last + 1):
+                yield number, reader.pages[number - 1].extract_text() or ""
+            return
+
+        del reader  # Each worker opens its own reader
+        starts = list(range(first, last + 1, PAGES_PER_TASK))
+        ends = [min(start + PAGES_PER_TASK - 1, last) for start in starts]
+        # ``map`` returns blocks in submission order, so page order is preserved
+        blocks = _get_pool().map(_extract_range, [file_path] * len(starts), starts, ends)
+        for start, texts in zip(starts, blocks):
+            for offset, text in enumerate(texts):
+                yield start + offset, text
+
+    @staticmethod
+    def extract_text(file_path: str, first_page: int = 1, last_page: Optional[int] = None,
+                     parallel: Optional[bool] = None) -> str:
+        return "".join(
+            text for _, text in PDFProcessor.iter_pages(file_path, first_page, last_page, parallel)
+        )
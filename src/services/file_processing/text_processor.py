@@ -1,26 +1,195 @@
+import math
 import os
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
 from src.services.azure_client import summarize
-try:
-    from transformers import pipeline
-except Exception:  # pragma: no cover - transformers optional
-    pipeline = None
+from src.models.model_loader import ModelUnavailableError, get_model_manager
+
+# distilbart-cnn reads at most 1024 tokens; leave room for special tokens
+CHUNK_TOKENS = int(os.environ.get("SUMMARY_CHUNK_TOKENS", "900"))
+CHUNK_OVERLAP = int(os.environ.get("SUMMARY_CHUNK_OVERLAP", "64"))
+# Partial summaries combined by each reduce call, and the most reduce levels
+FAN_IN = int(os.environ.get("SUMMARY_FAN_IN", "8"))
+MAX_DEPTH = int(os.environ.get("SUMMARY_MAX_DEPTH", "3"))
+# Chunks per local batch, and concurrent requests to Azure
+BATCH_SIZE = int(os.environ.get("SUMMARY_BATCH_SIZE", "8"))
+CONCURRENCY = int(os.environ.get("SUMMARY_CONCURRENCY", "8"))
+# Shortest ``max_length`` given to the model, however short the input
+MIN_SUMMARY_TOKENS = 16
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
 
 class TextProcessor:
-    """Utility class for text-based processing tasks."""
+    """Utility class for text-based processing tasks.
+
+    Texts longer than ``chunk_tokens`` are summarized map-reduce style: split
+    into overlapping chunks of whole sentences, summarized concurrently
+    (batched through the local pipeline or ``concurrency`` parallel Azure
+    requests), and the partial summaries reduced ``fan_in`` at a time until
+    one remains or ``max_depth`` levels have run.
+    """
 
-    def __init__(self, model_name: str = "sshleifer/distilbart-cnn-12-6"):
+    def __init__(self, model_name: str = "sshleifer/distilbart-cnn-12-6",
+                 chunk_tokens: int = CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP,
+                 fan_in: int = FAN_IN, max_depth: int = MAX_DEPTH,
+                 batch_size: int = BATCH_SIZE, concurrency: int = CONCURRENCY):
+        self.model_name = model_name
         self.use_azure = bool(os.environ.get("AZURE_OPENAI_SUMMARIZE_ENDPOINT"))
-        if not self.use_azure and pipeline is not None:
-            self.summarizer = pipeline("summarization", model=model_name)
-        else:
-            self.summarizer = None
+        self._unavailable = False
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = min(overlap_tokens, chunk_tokens // 2)
+        self.fan_in = max(2, fan_in)
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+    @property
+    def summarizer(self):
+        """Shared local summarization pipeline (``None`` when Azure is used or transformers is missing)."""
+        if self.use_azure or self._unavailable:
+            return None
+        try:
+            return get_model_manager().get("summarization", self.model_name)
+        except ModelUnavailableError:
+            self._unavailable = True
+            return None
 
     def summarize(self, text: str, max_length: int = 130, min_length: int = 30) -> str:
         """Return a summarized version of the provided text."""
+        return self.summarize_long(text, max_length=max_length, min_length=min_length)["summary"]
+
+    def _token_counts(self, pieces: List[str], summarizer: Any) -> List[int]:
+        tokenizer = getattr(summarizer, "tokenizer", None)
+        if tokenizer is not None and pieces:
+            return [len(ids) for ids in tokenizer(pieces, add_special_tokens=False)["input_ids"]]
+        # Subword tokenizers average roughly 1.3 tokens per English word
+        return [math.ceil(len(piece.split()) * 1.3) for piece in pieces]
+
+    def _sentences(self, text: str, summarizer: Any) -> List[tuple]:
+        """``(sentence, tokens)`` pairs, splitting sentences longer than a chunk by words."""
+        sentences = [s for s in _SENTENCE_RE.split(text.strip()) if s]
+        result = []
+        for sentence, tokens in zip(sentences, self._token_counts(sentences, summarizer)):
+            if tokens <= self.chunk_tokens:
+                result.append((sentence, tokens))
+                continue
+            words = sentence.split()
+            step = max(1, len(words) * self.chunk_tokens // tokens)
+            pieces = [" ".join(words[i:i + step]) for i in range(0, len(words), step)]
+            result.extend(zip(pieces, self._token_counts(pieces, summarizer)))
+        return result
+
+    def chunk(self, text: str, summarizer: Any = None) -> List[str]:
+        """Split ``text`` into chunks of at most ``chunk_tokens`` tokens.
+
+        Each chunk starts with the trailing sentences of the previous one, up
+        to ``overlap_tokens``, so facts spanning a boundary are seen whole.
+        """
+        chunks: List[str] = []
+        current: List[tuple] = []
+        size = 0
+        for sentence, tokens in self._sentences(text, summarizer):
+            if current and size + tokens > self.chunk_tokens:
+                chunks.append(" ".join(s for s, _ in current))
+                overlap: List[tuple] = []
+                kept = 0
+                for prev in reversed(current):
+                    if kept + prev[1] > self.overlap_tokens or kept + prev[1] + tokens > self.chunk_tokens:
+                        break
+                    overlap.insert(0, prev)
+                    kept += prev[1]
+                current, size = overlap, kept
+            current.append((sentence, tokens))
+            size += tokens
+        if current:
+            chunks.append(" ".join(s for s, _ in current))
+        return chunks
+
+    @staticmethod
+    def _lengths(tokens: int, max_length: int, min_length: int) -> tuple:
+        """``(max_length, min_length)`` for an input of ``tokens``: at most half of it, within the requested bounds."""
+        longest = min(max_length, max(MIN_SUMMARY_TOKENS, tokens // 2))
+        return longest, min(min_length, longest // 2)
+
+    def _summarize_many(self, texts: List[str], summarizer: Any, max_length: int, min_length: int) -> List[str]:
+        """Summarize ``texts`` concurrently, preserving order.
+
+        Each text gets summary lengths scaled to its own token count, so a
+        short trailing chunk is not padded out to ``min_length``.
+        """
+        lengths = [self._lengths(tokens, max_length, min_length)
+                   for tokens in self._token_counts(texts, summarizer)]
         if self.use_azure:
-            return summarize(text, max_length=max_length, min_length=min_length)
-        elif self.summarizer is not None:
-            summary = self.summarizer(text, max_length=max_length, min_length=min_length)
-            return summary[0]["summary_text"]
+            if len(texts) == 1:
+                return [summarize(texts[0], max_length=lengths[0][0], min_length=lengths[0][1])]
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(texts))) as pool:
+                return list(pool.map(
+                    lambda t, n: summarize(t, max_length=n[0], min_length=n[1]), texts, lengths
+                ))
+        if summarizer is None:
+            return texts
+        # The pipeline takes one length per call: batch texts sharing one
+        by_length: Dict[tuple, List[int]] = defaultdict(list)
+        for i, pair in enumerate(lengths):
+            by_length[pair].append(i)
+        summaries: List[str] = [""] * len(texts)
+        for (longest, shortest), indices in by_length.items():
+            results = summarizer([texts[i] for i in indices], max_length=longest, min_length=shortest,
+                                 batch_size=self.batch_size, truncation=True)
+            for i, result in zip(indices, results):
+                summaries[i] = result["summary_text"]
+        return summaries
+
+    def _group(self, summaries: List[str], counts: List[int]) -> List[str]:
+        """Join partial summaries into groups of at most ``fan_in`` and, past two, ``chunk_tokens``."""
+        groups: List[List[str]] = []
+        size = 0
+        for summary, tokens in zip(summaries, counts):
+            if not groups or len(groups[-1]) >= self.fan_in or (
+                len(groups[-1]) >= 2 and size + tokens > self.chunk_tokens
+            ):
+                groups.append([])
+                size = 0
+            groups[-1].append(summary)
+            size += tokens
+        return [" ".join(group) for group in groups]
+
+    def summarize_long(self, text: str, max_length: int = 130, min_length: int = 30) -> Dict[str, Any]:
+        """Summarize ``text`` of any length.
+
+        Returns the summary with the number of chunks, the reduce depth and
+        timings in milliseconds (``split``, ``map``, one entry per ``reduce``
+        level and ``total``).
+        """
+        start = time.perf_counter()
+        summarizer = self.summarizer
+        chunks = self.chunk(text, summarizer) or [text]
+        timings: Dict[str, Any] = {"split": (time.perf_counter() - start) * 1000, "reduce": []}
+
+        if not self.use_azure and summarizer is None:
+            summaries = [text]  # No model available: the text is returned as is
+            timings["map"] = 0.0
         else:
-            return text
+            step = time.perf_counter()
+            summaries = self._summarize_many(chunks, summarizer, max_length, min_length)
+            timings["map"] = (time.perf_counter() - step) * 1000
+
+        depth = 0
+        while len(summaries) > 1:
+            step = time.perf_counter()
+            depth += 1
+            counts = self._token_counts(summaries, summarizer)
+            if depth >= self.max_depth or sum(counts) <= self.chunk_tokens:
+                # Last level: one call over everything (truncated to the model's context)
+                groups = [" ".join(summaries)]
+            else:
+                groups = self._group(summaries, counts)
+            summaries = self._summarize_many(groups, summarizer, max_length, min_length)
+            timings["reduce"].append((time.perf_counter() - step) * 1000)
+        timings["total"] = (time.perf_counter() - start) * 1000
+        return {"summary": summaries[0], "chunks": len(chunks), "depth": depth, "timings_ms": timings}
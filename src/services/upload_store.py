@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+from typing import Any, Dict, Optional
+
+from src.core.cache.ttl_cache import TTLCache
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadStore:
+    """Content-addressed storage for uploaded files and their processing results.
+
+    Uploads are streamed to a temporary file in ``chunk_size`` pieces on a
+    worker thread, hashed with SHA-256 as they are written, and then moved to
+    ``<root>/<digest[:2]>/<digest><ext>``. Identical uploads share one file
+    whatever their names. Processing results are cached by digest in memory
+    and in a JSON file next to the upload, so duplicates skip extraction.
+    """
+
+    def __init__(self, root: str, chunk_size: int = CHUNK_SIZE, max_cached_results: int = 256):
+        self.root = root
+        self.chunk_size = chunk_size
+        self._tmp_dir = os.path.join(root, ".incoming")
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        self._results = TTLCache(max_size=max_cached_results, ttl=None)
+        self.stored = 0
+        self.duplicates = 0
+
+    def path_for(self, digest: str, ext: str = "") -> str:
+        suffix = f".{ext}" if ext else ""
+        return os.path.join(self.root, digest[:2], f"{digest}{suffix}")
+
+    @staticmethod
+    def _write(handle, hasher, chunk: bytes) -> None:
+        hasher.update(chunk)
+        handle.write(chunk)
+
+    async def save(self, upload, ext: str = "") -> Dict[str, Any]:
+        """Stream ``upload`` (anything with ``async read(n)``) into the store.
+
+        Returns the digest, stored path, size and whether the content was
+        already present.
+        """
+        hasher = hashlib.sha256()
+        tmp_path = os.path.join(self._tmp_dir, uuid.uuid4().hex)
+        size = 0
+        handle = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            while True:
+                chunk = await upload.read(self.chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                await asyncio.to_thread(self._write, handle, hasher, chunk)
+        except BaseException:
+            handle.close()
+            os.remove(tmp_path)
+            raise
+        await asyncio.to_thread(handle.close)
+
+        digest = hasher.hexdigest()
+        path = self.path_for(digest, ext)
+        existing = os.path.exists(path)
+        if existing:
+            os.remove(tmp_path)
+            self.duplicates += 1
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)  # Atomic: readers never see a partial file
+            self.stored += 1
+        return {"digest": digest, "path": path, "size": size, "existing": existing}
+
+    def _result_path(self, digest: str, variant: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.{variant}.result.json")
+
+    def get_result(self, digest: str, variant: str = "") -> Optional[Dict[str, Any]]:
+        """Cached processing result for this content, or ``None``."""
+        key = (digest, variant)
+        result = self._results.get(key)
+        if result is None:
+            try:
+                with open(self._result_path(digest, variant), "r") as f:
+                    result = json.load(f)
+            except (OSError, ValueError):
+                return None
+            self._results.set(key, result)
+        return result
+
+    async def aget_result(self, digest: str, variant: str = "") -> Optional[Dict[str, Any]]:
+        """``get_result`` for async callers: a result not in memory is read on a worker thread."""
+        result = self._results.get((digest, variant))
+        if result is not None:
+            return result
+        return await asyncio.to_thread(self.get_result, digest, variant)
+
+    def set_result(self, digest: str, variant: str, result: Dict[str, Any]) -> None:
+        self._results.set((digest, variant), result)
+        self._persist_result(digest, variant, result)
+
+    async def aset_result(self, digest: str, variant: str, result: Dict[str, Any]) -> None:
+        """``set_result`` for async callers: the JSON file is written on a worker thread."""
+        self._results.set((digest, variant), result)
+        await asyncio.to_thread(self._persist_result, digest, variant, result)
+
+    def _persist_result(self, digest: str, variant: str, result: Dict[str, Any]) -> None:
+        path = self._result_path(digest, variant)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Failed to persist upload result for {digest}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"stored": self.stored, "duplicates": self.duplicates, "results": self._results.stats()}
@@ -0,0 +1,55 @@
+import pytest
+
+from src.services.api.agent_provider import AgentProvider
+
+
+class DummyAgent:
+    def __init__(self):
+        self.warmed = False
+
+    def warm_up(self):
+        self.warmed = True
+
+    def close(self):
+        self.closed = True
+
+
+def test_agent_is_shared_and_built_lazily():
+    built = []
+
+    def factory():
+        built.append(DummyAgent())
+        return built[-1]
+
+    provider = AgentProvider(factory=factory)
+    assert built == []
+    assert provider.get() is provider.get()
+    assert len(built) == 1
+
+
+@pytest.mark.asyncio
+async def test_warm_up_marks_ready():
+    provider = AgentProvider(factory=DummyAgent)
+    assert provider.status()["status"] == "cold"
+    await provider.start_warm_up()
+    assert provider.ready
+    assert provider.get().warmed
+    status = provider.status()
+    assert status["status"] == "ready"
+    assert status["warmup_seconds"] is not None
+
+
+@pytest.mark.asyncio
+async def test_shutdown_closes_built_agent():
+    provider = AgentProvider(factory=DummyAgent)
+    await provider.shutdown()  # Nothing built yet
+    agent = provider.get()
+    await provider.shutdown()
+    assert agent.closed
+
+
+def test_peek_does_not_build_agent():
+    provider = AgentProvider(factory=DummyAgent)
+    assert provider.peek() is None
+    agent = provider.get()
+    assert provider.peek() is agent
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from src.services import azure_client
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeAsyncClient:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def post(self, endpoint, json=None, headers=None, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return FakeResponse({"label": json["labels"][-1]})
+
+
+@pytest.mark.asyncio
+async def test_per_endpoint_concurrency_limit(monkeypatch):
+    client = azure_client.AsyncAzureClient(per_endpoint_limit=2)
+    fake = FakeAsyncClient()
+    monkeypatch.setattr(client, "_get_client", lambda: fake)
+    monkeypatch.setattr(azure_client, "httpx", object())
+    monkeypatch.setattr(azure_client, "_async_client", client)
+    monkeypatch.setenv("AZURE_OPENAI_CLASSIFY_ENDPOINT", "https://example.azure.com/classify")
+    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "key")
+
+    labels = await asyncio.gather(
+        *(azure_client.azero_shot_classify("hi", ["text", "link"]) for _ in range(5))
+    )
+    assert labels == ["link"] * 5
+    assert fake.peak == 2
+    assert client.stats() == {"example.azure.com/classify": 0}
+
+
+def test_client_from_previous_loop_is_closed():
+    class ClosingClient:
+        closed = False
+
+        async def aclose(self):
+            self.closed = True
+
+    client = azure_client.AsyncAzureClient()
+    stale = ClosingClient()
+
+    async def bind(with_client):
+        client._bind_loop()
+        if with_client:
+            client._client = stale
+        await asyncio.sleep(0)
+
+    asyncio.run(bind(True))
+    asyncio.run(bind(False))
+    assert stale.closed
+    assert client._client is None
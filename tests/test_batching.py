@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from src.services.batching import MicroBatcher, ThreadedMicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_a_batch():
+    seen = []
+
+    def batch_fn(items):
+        seen.append(list(items))
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=20)
+    results = await asyncio.gather(*(batcher.submit(t) for t in ["a", "b", "c", "d", "e"]))
+    assert results == ["A", "B", "C", "D", "E"]
+    assert seen[0] == ["a", "b", "c", "d"]
+    assert batcher.stats()["largest_batch"] == 4
+    assert batcher.stats()["items"] == 5
+    batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_reach_every_caller():
+    def batch_fn(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=1)
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    batcher.close()
+
+
+def test_threaded_batcher_groups_callers_from_many_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    seen = []
+
+    def batch_fn(items):
+        seen.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = ThreadedMicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=50)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(batcher.submit, range(8)))
+    assert results == [i * 2 for i in range(8)]
+    assert max(seen) > 1 and sum(seen) == 8
+    assert batcher.stats()["largest_batch"] <= 4
+    batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_threaded_batcher_async_submit_and_errors():
+    def batch_fn(items):
+        if "bad" in items:
+            raise ValueError("boom")
+        return items
+
+    batcher = ThreadedMicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=5)
+    assert await batcher.asubmit("ok") == "ok"
+    results = await asyncio.gather(batcher.asubmit("bad"), batcher.asubmit("x"), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    batcher.close()
@@ -0,0 +1,97 @@
+import contextlib
+import sys
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.agents.executors import AgentExecutor
+from src.agents.expert_agents import image_agent
+from src.models.blip_captioner import BlipCaptioner
+from src.models.model_loader import ModelManager
+
+
+class FakeProcessor:
+    def __call__(self, images, return_tensors):
+        return {"pixel_values": list(images)}
+
+    def batch_decode(self, out, skip_special_tokens):
+        return [f"a photo of {item}" for item in out]
+
+
+class FakeModel:
+    def __init__(self):
+        self.batch_sizes = []
+        self.in_inference = []
+
+    def eval(self):
+        return self
+
+    def generate(self, pixel_values, max_new_tokens):
+        self.batch_sizes.append(len(pixel_values))
+        self.in_inference.append(fake_torch.inference_active)
+        return pixel_values
+
+
+fake_torch = types.ModuleType("torch")
+fake_torch.inference_active = False
+fake_torch.threads = None
+
+
+@contextlib.contextmanager
+def inference_mode():
+    fake_torch.inference_active = True
+    try:
+        yield
+    finally:
+        fake_torch.inference_active = False
+
+
+fake_torch.inference_mode = inference_mode
+fake_torch.set_num_threads = lambda n: setattr(fake_torch, "threads", n)
+
+
+@pytest.fixture
+def captioner(monkeypatch):
+    monkeypatch.setitem(sys.modules, "torch", fake_torch)
+    captioner = BlipCaptioner(processor=FakeProcessor(), model=FakeModel(),
+                              max_batch_size=4, max_wait_ms=50, num_threads=2)
+    yield captioner
+    captioner.close()
+
+
+def test_concurrent_captions_are_batched(captioner):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        captions = list(pool.map(captioner.caption, [f"img{i}" for i in range(8)]))
+    assert captions == [f"a photo of img{i}" for i in range(8)]
+    assert max(captioner.model.batch_sizes) > 1
+    assert max(captioner.model.batch_sizes) <= 4
+    assert all(captioner.model.in_inference)
+    assert fake_torch.threads == 2
+
+
+@pytest.mark.asyncio
+async def test_async_caption(captioner):
+    assert await captioner.acaption("cat") == "a photo of cat"
+    assert captioner.stats()["items"] == 1
+
+
+@pytest.mark.asyncio
+async def test_image_agent_downloads_on_its_executor(captioner, monkeypatch):
+    monkeypatch.delenv("AZURE_IMAGE_CAPTION_ENDPOINT", raising=False)
+    threads = []
+
+    def load_image(url):
+        threads.append(threading.current_thread().name)
+        return url.rsplit("/", 1)[-1]
+
+    monkeypatch.setattr(image_agent, "load_image", load_image)
+    agent = image_agent.ImageAgent()
+    agent.models = ModelManager(loaders={"image_caption": lambda *args: captioner})
+    executor = AgentExecutor("image", max_workers=1)
+    result = await agent.aprocess("http://example.com/cat", executor=executor)
+    executor.shutdown()
+    assert result["output"] == "a photo of cat"
+    assert threads[0].startswith("agent-image")
+    assert executor.stats()["completed"] == 1
@@ -0,0 +1,42 @@
+from src.core.cache.ttl_cache import TTLCache
+from src.core.cache.classification_cache import ClassificationCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_and_lru_eviction():
+    clock = FakeClock()
+    cache = TTLCache(max_size=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    clock.now = 11
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+
+
+def test_near_identical_prompts_share_entry():
+    calls = []
+
+    def classify(text, labels):
+        calls.append(text)
+        return "text"
+
+    cache = ClassificationCache(max_size=8, ttl=None)
+    labels = ["text", "image"]
+    assert cache.get_or_classify("What is  Python?", labels, classify) == "text"
+    assert cache.get_or_classify("what is python", labels, classify) == "text"
+    assert cache.get_or_classify("what is python", ["text", "link"], classify) == "text"
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,243 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from src.services.cosmos_client import CosmosConversationLogger
+
+
+class FakeContainer:
+    """In-memory stand-in for a Cosmos container client."""
+
+    def __init__(self, fail_batches=False):
+        self.items = {}
+        self.batches = []
+        self.upserts = 0
+        self.fail_batches = fail_batches
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def execute_item_batch(self, batch_operations, partition_key):
+        self.gate.wait()
+        if self.fail_batches:
+            raise RuntimeError("batch rejected")
+        assert all(op == "upsert" for op, _ in batch_operations)
+        assert all(args[0]["conversation_id"] == partition_key for _, args in batch_operations)
+        self.batches.append((partition_key, len(batch_operations)))
+        for _, (item,) in batch_operations:
+            self.items[item["id"]] = item
+
+    def upsert_item(self, item):
+        self.gate.wait()
+        self.upserts += 1
+        self.items[item["id"]] = item
+
+
+def make_logger(container, **kwargs):
+    kwargs.setdefault("spill_path", None)
+    kwargs.setdefault("flush_interval", 0.05)
+    return CosmosConversationLogger(container, **kwargs)
+
+
+def test_messages_are_batched_per_conversation():
+    container = FakeContainer()
+    logger = make_logger(container, batch_size=50, flush_interval=0.2)
+    for i in range(10):
+        logger.log_message("a", "user", f"a{i}")
+        logger.log_message("b", "agent", f"b{i}")
+    logger.close()
+    assert len(container.items) == 20
+    assert sorted(container.batches) == [("a", 10), ("b", 10)]
+    assert logger.stats()["written"] == 20
+
+
+def test_flush_interval_writes_without_close():
+    container = FakeContainer()
+    logger = make_logger(container, batch_size=100)
+    logger.log_message("a", "user", "hello")
+    assert logger.flush(timeout=2)
+    assert [item["content"] for item in container.items.values()] == ["hello"]
+    logger.close()
+
+
+def test_close_drains_queue():
+    container = FakeContainer()
+    container.gate.clear()
+    logger = make_logger(container, batch_size=5, max_queue=100)
+    for i in range(40):
+        logger.log_message(f"c{i % 3}", "user", i)
+    container.gate.set()
+    logger.close()
+    assert len(container.items) == 40
+    assert logger.stats()["queued"] == 0
+
+
+def test_drop_policy_discards_when_full():
+    container = FakeContainer()
+    container.gate.clear()  # The flusher stalls on its first batch
+    logger = make_logger(container, batch_size=1, max_queue=2, overflow="drop")
+    for i in range(10):
+        logger.log_message("a", "user", i)
+    stats = logger.stats()
+    assert stats["dropped"] >= 7
+    assert stats["enqueued"] + stats["dropped"] == 10
+    container.gate.set()
+    logger.close()
+    assert len(container.items) == stats["enqueued"]
+
+
+def test_block_policy_waits_for_room():
+    container = FakeContainer()
+    container.gate.clear()
+    logger = make_logger(container, batch_size=1, max_queue=1, block_timeout=5)
+    logger.log_message("a", "user", 0)
+    logger.log_message("a", "user", 1)  # Taken by the stalled flusher or queued
+    done = threading.Event()
+
+    def log_more():
+        logger.log_message("a", "user", 2)
+        done.set()
+
+    threading.Thread(target=log_more).start()
+    assert not done.wait(0.2)
+    container.gate.set()
+    assert done.wait(2)
+    logger.close()
+    assert len(container.items) == 3
+    assert logger.stats()["dropped"] == 0
+
+
+def test_spill_policy_writes_overflow_to_disk_and_replays(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    container = FakeContainer()
+    container.gate.clear()
+    logger = make_logger(container, batch_size=1, max_queue=2, overflow="spill", spill_path=str(spill))
+    for i in range(10):
+        logger.log_message("a", "user", i)
+    spilled = logger.stats()["spilled"]
+    assert spilled >= 7
+    assert len(spill.read_text().splitlines()) == spilled
+    assert json.loads(spill.read_text().splitlines()[0])["conversation_id"] == "a"
+    container.gate.set()
+    # Spilled items are replayed once the queue is idle
+    for _ in range(100):
+        if len(container.items) == 10:
+            break
+        threading.Event().wait(0.02)
+    logger.close()
+    assert sorted(item["content"] for item in container.items.values()) == list(range(10))
+    assert not spill.exists()
+
+
+def test_block_timeout_spills_instead_of_dropping(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    container = FakeContainer()
+    container.gate.clear()
+    logger = make_logger(container, batch_size=1, max_queue=1, block_timeout=0.05, spill_path=str(spill))
+    for i in range(4):
+        logger.log_message("a", "user", i)
+    stats = logger.stats()
+    assert stats["spilled"] >= 2 and stats["dropped"] == 0
+    container.gate.set()
+    logger.close()
+
+
+@pytest.mark.asyncio
+async def test_async_logging_does_not_block_the_event_loop():
+    container = FakeContainer()
+    container.gate.clear()
+    logger = make_logger(container, batch_size=1, max_queue=1, block_timeout=5)
+    await logger.alog_message("a", "user", 0)
+    await logger.alog_message("a", "user", 1)  # Taken by the stalled flusher or queued
+    # Waits for room in a worker thread, not on the loop
+    pending = asyncio.ensure_future(logger.alog_message("a", "user", 2))
+    start = time.monotonic()
+    await asyncio.sleep(0.1)
+    assert time.monotonic() - start < 0.5
+    assert not pending.done()
+    container.gate.set()
+    await pending
+    await asyncio.to_thread(logger.close)
+    assert len(container.items) == 3
+    assert logger.stats()["dropped"] == 0
+
+
+def test_flush_waits_for_items_spilled_by_a_previous_process(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    spill.write_text("".join(
+        json.dumps({"id": str(i), "conversation_id": "a", "role": "user", "content": i}) + "\n"
+        for i in range(3)
+    ))
+    container = FakeContainer()
+    logger = make_logger(container, overflow="spill", spill_path=str(spill))
+    logger.log_message("a", "user", 3)
+    assert logger.flush(timeout=2)
+    assert len(container.items) == 4
+    logger.close()
+
+
+def test_close_returns_when_the_queue_is_full_and_stalled():
+    container = FakeContainer()
+    container.gate.clear()
+    logger = make_logger(container, batch_size=1, max_queue=2, overflow="drop")
+    for i in range(5):
+        logger.log_message("a", "user", i)
+    start = time.monotonic()
+    logger.close(timeout=0.2)
+    assert time.monotonic() - start < 1
+    container.gate.set()
+    logger._thread.join(2)
+    assert not logger._thread.is_alive()
+    assert len(container.items) == logger.stats()["enqueued"]
+
+
+def test_failed_batch_falls_back_to_single_upserts():
+    container = FakeContainer(fail_batches=True)
+    logger = make_logger(container, batch_size=10, flush_interval=0.2)
+    for i in range(4):
+        logger.log_message("a", "user", i)
+    logger.close()
+    assert container.upserts == 4
+    assert len(container.items) == 4
+
+
+def test_invalid_overflow_policy():
+    with pytest.raises(ValueError):
+        make_logger(FakeContainer(), overflow="ignore")
+
+
+class DownContainer(FakeContainer):
+    """A container whose every write fails, as when Cosmos is unreachable."""
+
+    def __init__(self):
+        super().__init__(fail_batches=True)
+        self.attempts = 0
+
+    def execute_item_batch(self, batch_operations, partition_key):
+        self.attempts += 1
+        raise RuntimeError("service unavailable")
+
+    def upsert_item(self, item):
+        self.attempts += 1
+        raise RuntimeError("service unavailable")
+
+
+def test_spill_replay_backs_off_while_writes_fail(tmp_path, capsys):
+    spill = tmp_path / "spill.jsonl"
+    spill.write_text("".join(
+        json.dumps({"id": str(i), "conversation_id": "a", "role": "user", "content": i}) + "\n"
+        for i in range(30)
+    ))
+    container = DownContainer()
+    logger = make_logger(container, batch_size=10, flush_interval=0.01, overflow="spill",
+                         spill_path=str(spill), replay_max_backoff=0.16)
+    time.sleep(0.5)
+    logger.close()
+    # Without backoff the idle flusher would retry ~50 times in 0.5 s; with it
+    # every replay stops after the first failed batch and waits 0.01, 0.02 ... 0.16 s
+    replays = container.attempts / 11  # One batch try plus ten single upserts
+    assert replays <= 10
+    assert len(spill.read_text().splitlines()) == 30
+    assert capsys.readouterr().out.count("Cosmos write failed") == 1
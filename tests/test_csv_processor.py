@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from src.agents.expert_agents.file_agent import FileAgent
+from src.services.file_processing import csv_processor
+from src.services.file_processing.csv_processor import CSVProfiler
+
+
+def write_csv(path, n_rows):
+    lines = ["id,price,city,note"]
+    for i in range(n_rows):
+        price = "" if i % 10 == 0 else f"{i * 0.5}"
+        city = ["paris", "oslo", "rome"][i % 3] if i % 7 else "paris"
+        lines.append(f"{i},{price},{city},n{i}")
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("engine", ["pyarrow", "pandas"])
+def test_chunked_profile_matches_whole_file(tmp_path, monkeypatch, engine):
+    if engine == "pandas":
+        monkeypatch.setattr(csv_processor, "pa_csv", None)
+    elif csv_processor.pa_csv is None:
+        pytest.skip("pyarrow not installed")
+    path = write_csv(tmp_path / "data.csv", 1000)
+    profile = CSVProfiler(chunk_rows=64, sample_rows=10, top_k=2).profile(path)
+
+    assert profile["engine"] == engine
+    assert profile["rows"] == 1000
+    price = profile["columns"]["price"]
+    assert price["nulls"] == 100
+    assert price["min"] == 0.5 and price["max"] == 499.5
+    expected = [i * 0.5 for i in range(1000) if i % 10]
+    assert price["mean"] == pytest.approx(sum(expected) / len(expected))
+    assert profile["columns"]["id"]["dtype"] == "int64"
+    assert profile["columns"]["city"]["top_categories"][0]["value"] == "paris"
+    assert len(profile["sample"]) == 10
+    assert len({row["id"] for row in profile["sample"]}) == 10
+    json.dumps(profile, allow_nan=False)
+
+
+def test_high_cardinality_columns_stay_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_processor, "pa_csv", None)
+    path = write_csv(tmp_path / "data.csv", 500)
+    profile = CSVProfiler(chunk_rows=50, max_categories=20).profile(path)
+    note = profile["columns"]["note"]
+    assert note["approximate"]
+    assert note["distinct"] <= 20
+
+
+def test_file_agent_returns_profile_and_sample(tmp_path):
+    result = FileAgent().process(write_csv(tmp_path / "data.csv", 50), "csv")
+    assert set(result["output"]) == {"rows", "columns", "sample"}
+    assert result["output"]["rows"] == 50
+    assert len(result["output"]["sample"]) == 20
+
+
+def test_column_kind_is_fixed_by_the_first_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_processor, "pa_csv", None)
+    lines = ["amount,tag"]
+    for i in range(150):
+        amount = "unknown" if i in (120, 121) else str(i)
+        tag = f"t{i % 2}" if i < 50 else str(i % 3)
+        lines.append(f"{amount},{tag}")
+    path = tmp_path / "mixed.csv"
+    path.write_text("\n".join(lines) + "\n")
+    profile = CSVProfiler(chunk_rows=50).profile(str(path))
+
+    amount = profile["columns"]["amount"]
+    assert amount["dtype"] == "int64"
+    assert (amount["count"], amount["invalid"]) == (148, 2)
+    assert amount["min"] == 0 and amount["max"] == 149
+    tag = profile["columns"]["tag"]
+    assert tag["dtype"] == "object" and tag["count"] == 150
+    assert {c["value"] for c in tag["top_categories"]} == {"t0", "t1", "0", "1", "2"}
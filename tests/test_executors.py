@@ -0,0 +1,36 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.agents.executors import AgentBusyError, AgentExecutor, AgentExecutorPool
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    release = threading.Event()
+    executor = AgentExecutor("slow", max_workers=1, max_queue=1)
+    first = asyncio.ensure_future(executor.run(release.wait))
+    second = asyncio.ensure_future(executor.run(release.wait))
+    await asyncio.sleep(0.05)
+    with pytest.raises(AgentBusyError):
+        await executor.run(release.wait)
+    stats = executor.stats()
+    assert stats["running"] == 1
+    assert stats["queued"] == 1
+    assert stats["rejected"] == 1
+    release.set()
+    await asyncio.gather(first, second)
+    assert executor.stats()["completed"] == 2
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_slow_agent_does_not_starve_others():
+    release = threading.Event()
+    pool = AgentExecutorPool(["file", "text"], {"file": {"max_workers": 1, "max_queue": 4}})
+    blocked = asyncio.ensure_future(pool.run("file", release.wait))
+    assert await pool.run("text", lambda x: x * 2, 21) == 42
+    release.set()
+    await blocked
+    pool.shutdown()
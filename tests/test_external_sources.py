@@ -0,0 +1,85 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.core.cache.http_cache import HTTPCache
+from src.core.knowledge_base.external_sources import AsyncURLFetcher
+
+
+def make_fetcher(handler, **kwargs):
+    fetcher = AsyncURLFetcher(cache=HTTPCache(path=None), **kwargs)
+    fetcher._bind_loop()
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return fetcher
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_limits_hosts_and_tolerates_failures():
+    active = {}
+    peak = {}
+
+    async def handler(request):
+        host = request.url.host
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        try:
+            if request.url.path == "/slow":
+                await asyncio.sleep(1)
+            await asyncio.sleep(0.01)
+            if request.url.path == "/broken":
+                return httpx.Response(500)
+            return httpx.Response(200, html=f"<p>{host}{request.url.path}</p>")
+        finally:
+            active[host] -= 1
+
+    fetcher = make_fetcher(handler, per_host_limit=2, timeout=0.3)
+    urls = [f"http://a.com/{i}" for i in range(5)] + [
+        "http://b.com/fast", "http://b.com/broken", "http://c.com/slow",
+    ]
+    results = [r async for r in fetcher.fetch_many(urls)]
+
+    by_url = {r["url"]: r for r in results}
+    assert len(results) == len(urls)
+    assert by_url["http://a.com/3"]["text"] == "a.com/3"
+    assert not by_url["http://b.com/broken"]["ok"]
+    assert by_url["http://c.com/slow"]["error"] == "timed out"
+    assert results[-1]["url"] == "http://c.com/slow"  # Delivered in completion order
+    assert peak["a.com"] == 2
+    assert fetcher.stats() == {"completed": 6, "failed": 2}
+    await fetcher.aclose()
+
+
+@pytest.mark.asyncio
+async def test_timeout_does_not_count_time_queued_for_a_slot():
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, html=f"<p>{request.url.path}</p>")
+
+    fetcher = make_fetcher(handler, per_host_limit=1, timeout=0.25)
+    results = [r async for r in fetcher.fetch_many([f"http://a.com/{i}" for i in range(4)])]
+    assert all(r["ok"] for r in results)
+    assert max(r["elapsed_ms"] for r in results) >= 350  # The last URL waited for three others
+    await fetcher.aclose()
+
+
+def test_client_from_previous_loop_is_closed():
+    class ClosingClient:
+        closed = False
+
+        async def aclose(self):
+            self.closed = True
+
+    fetcher = AsyncURLFetcher(cache=HTTPCache(path=None))
+    stale = ClosingClient()
+
+    async def bind(with_client):
+        fetcher._bind_loop()
+        if with_client:
+            fetcher._client = stale
+        await asyncio.sleep(0)
+
+    asyncio.run(bind(True))
+    asyncio.run(bind(False))
+    assert stale.closed
+    assert fetcher._client is None
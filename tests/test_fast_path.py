@@ -0,0 +1,24 @@
+from src.agents.fast_path import FastPathClassifier
+
+
+def test_urls_and_images():
+    fp = FastPathClassifier()
+    assert fp.classify({"input": "https://news.example.com/article"}) == "link"
+    assert fp.classify({"input": "https://example.com/image.JPG?size=large"}) == "image"
+    assert fp.classify({"input": "data:image/png;base64,AAAA"}) == "image"
+
+
+def test_metadata_and_extensions():
+    fp = FastPathClassifier()
+    assert fp.classify({"input": "uploads/a.bin", "file_type": "pdf"}) == "file"
+    assert fp.classify({"input": "x", "mime_type": "image/webp"}) == "image"
+    state = {"input": "reports/q3.csv"}
+    assert fp.classify(state) == "file"
+    assert state["file_type"] == "csv"
+
+
+def test_ambiguous_text_falls_through():
+    fp = FastPathClassifier()
+    assert fp.classify({"input": "What is quantum computing?"}) is None
+    assert fp.classify({"input": "summarize notes.pdf for me"}) is None
+    assert fp.stats() == {"metadata": 0, "url": 0, "extension": 0, "fallthrough": 2}
@@ -0,0 +1,71 @@
+from src.core.cache.http_cache import HTTPCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Origin:
+    """Fake server returning 304 when the client's ETag matches."""
+
+    def __init__(self, headers, etag='"v1"'):
+        self.headers = headers
+        self.etag = etag
+        self.requests = []
+
+    def fetch(self, request_headers):
+        self.requests.append(request_headers)
+        if request_headers.get("If-None-Match") == self.etag:
+            return 304, self.headers, None
+        return 200, {**self.headers, "ETag": self.etag}, {"body": self.etag}
+
+
+def test_fresh_hit_then_conditional_revalidation(tmp_path):
+    clock = FakeClock()
+    cache = HTTPCache(path=str(tmp_path / "http.db"), clock=clock)
+    origin = Origin({"Cache-Control": "max-age=10"})
+
+    assert cache.get_or_fetch("http://a.com/x", "text", origin.fetch) == ({"body": '"v1"'}, "miss")
+    assert cache.get_or_fetch("http://a.com/x", "text", origin.fetch)[1] == "hit"
+    clock.now += 11
+    assert cache.get_or_fetch("http://a.com/x", "text", origin.fetch) == ({"body": '"v1"'}, "revalidated")
+    assert origin.requests == [{}, {"If-None-Match": '"v1"'}]
+
+    # Entries survive a restart through the on-disk store
+    reopened = HTTPCache(path=str(tmp_path / "http.db"), clock=clock)
+    assert reopened.get_or_fetch("http://a.com/x", "text", origin.fetch)[1] == "hit"
+
+
+def test_no_store_no_cache_and_domain_overrides():
+    clock = FakeClock()
+    cache = HTTPCache(path=None, clock=clock, domain_ttls={"docs.example.com": 3600})
+
+    no_store = Origin({"Cache-Control": "no-store"})
+    cache.get_or_fetch("http://a.com/private", "text", no_store.fetch)
+    assert cache.get_or_fetch("http://a.com/private", "text", no_store.fetch)[1] == "uncacheable"
+
+    no_cache = Origin({"Cache-Control": "no-cache"})
+    cache.get_or_fetch("http://a.com/live", "text", no_cache.fetch)
+    assert cache.get_or_fetch("http://a.com/live", "text", no_cache.fetch)[1] == "revalidated"
+
+    overridden = Origin({"Cache-Control": "no-cache"})
+    cache.get_or_fetch("http://api.docs.example.com/page", "text", overridden.fetch)
+    clock.now += 3000
+    assert cache.get_or_fetch("http://api.docs.example.com/page", "text", overridden.fetch)[1] == "hit"
+
+
+def test_evicts_least_recently_used_entries():
+    clock = FakeClock()
+    cache = HTTPCache(path=None, max_entries=2, clock=clock)
+    origin = Origin({})
+    for url in ("http://a.com/1", "http://a.com/2", "http://a.com/3"):
+        clock.now += 1
+        cache.get_or_fetch(url, "text", origin.fetch)
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert cache.get_or_fetch("http://a.com/1", "text", origin.fetch)[1] == "miss"
@@ -0,0 +1,79 @@
+from src.agents.expert_agents.link_agent import LinkAgent
+from src.core.cache.http_cache import HTTPCache
+
+PAGE = (
+    b"<html><head><title>Example &amp; Co</title><style>p{}</style></head><body>"
+    b"<p>Hi</p><script>var p = '<p>not text</p>';</script>"
+    b"<p>The first paragraph that is long enough to count as content.</p>"
+    b"<p>Never read.</p>" + b"<div>filler</div>" * 1000 + b"</body></html>"
+)
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, body, headers=None):
+        self.body = body
+        self.headers = headers or {"Content-Type": "text/html; charset=utf-8"}
+        self.served = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            self.served += 1
+            yield self.body[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.kwargs = None
+
+    def get(self, url, **kwargs):
+        self.kwargs = kwargs
+        return self.response
+
+
+def test_stops_after_title_and_first_paragraph():
+    agent = LinkAgent(timeout=(1, 2), http_cache=HTTPCache(path=None))
+    response = FakeResponse(PAGE)
+    agent.session = FakeSession(response)
+    result = agent.process("http://example.com")
+
+    assert result["output"] == {
+        "title": "Example & Co",
+        "content": "The first paragraph that is long enough to count as content.",
+    }
+    assert agent.session.kwargs == {"stream": True, "timeout": (1, 2), "headers": {}}
+    assert response.served < len(PAGE) // (16 * 1024) + 1
+    assert response.closed
+    meta = result["metadata"]
+    assert meta["stopped_early"] and not meta["truncated"]
+    assert set(meta["timings"]) == {"fetch_ms", "parse_ms", "total_ms"}
+    assert not meta["cached"]
+
+
+def test_byte_cap_truncates_download():
+    agent = LinkAgent(max_bytes=100, http_cache=HTTPCache(path=None))
+    body = b"<html><body>" + b"<div>x</div>" * 10000 + b"<p>late paragraph</p>"
+    agent.session = FakeSession(FakeResponse(body, headers={}))
+    result = agent.process("http://example.com")
+
+    assert result["output"] == {"title": "No Title", "content": "No Content"}
+    assert result["metadata"]["bytes_read"] == 100
+    assert result["metadata"]["truncated"]
+
+
+def test_repeat_lookups_are_served_from_the_http_cache():
+    agent = LinkAgent(http_cache=HTTPCache(path=None))
+    agent.session = FakeSession(FakeResponse(PAGE, headers={"Cache-Control": "max-age=60"}))
+    first = agent.process("http://example.com")
+    agent.session = None  # A second request would fail
+    second = agent.process("http://example.com")
+    assert second["output"] == first["output"]
+    assert (first["metadata"]["cache"], second["metadata"]["cache"]) == ("miss", "hit")
+    assert (first["metadata"]["cached"], second["metadata"]["cached"]) == (False, True)
+    assert second["metadata"]["timings"]["fetch_ms"] == second["metadata"]["timings"]["parse_ms"] == 0.0
@@ -0,0 +1,49 @@
+import json
+import sqlite3
+
+from src.core.memory.long_term import LongTermMemory
+
+
+def test_migrates_legacy_jsonl_once(tmp_path):
+    legacy = tmp_path / "memory.json"
+    legacy.write_text("\n".join(json.dumps({"message": f"m{i}"}) for i in range(3)) + "\n")
+    memory = LongTermMemory(storage_path=str(legacy))
+    assert memory.storage_path == str(tmp_path / "memory.db")
+    assert memory.get_all() == ["m0", "m1", "m2"]
+    memory.close()
+    assert LongTermMemory(storage_path=str(legacy)).count() == 3
+
+
+def test_pagination_and_filters(tmp_path):
+    memory = LongTermMemory(storage_path=str(tmp_path / "memory.db"))
+    for i in range(5):
+        memory.add(f"a{i}", conversation_id="a")
+    memory.add("b0", conversation_id="b")
+    page = memory.get_page(conversation_id="a", limit=2)
+    assert [r["message"] for r in page["items"]] == ["a4", "a3"]
+    page = memory.get_page(conversation_id="a", limit=2, before_id=page["next_before_id"])
+    assert [r["message"] for r in page["items"]] == ["a2", "a1"]
+    page = memory.get_page(conversation_id="a", limit=2, before_id=page["next_before_id"])
+    assert [r["message"] for r in page["items"]] == ["a0"]
+    assert page["next_before_id"] is None
+    streamed = [r["message"] for r in memory.iter_records(conversation_id="b", batch_size=1)]
+    assert streamed == ["b0"]
+
+
+def test_grouped_commits(tmp_path):
+    path = str(tmp_path / "memory.db")
+    memory = LongTermMemory(storage_path=path, commit_every=3, commit_interval=60)
+
+    def committed():
+        with sqlite3.connect(path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+
+    memory.add("one")
+    memory.add("two")
+    assert committed() == 0
+    memory.add("three")
+    assert committed() == 3
+    memory.add("four")
+    assert committed() == 3
+    assert memory.count() == 4  # reads flush the buffer first
+    assert committed() == 4
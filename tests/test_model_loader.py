@@ -0,0 +1,206 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.models.backends import cached_artifact
+from src.models.model_loader import ModelManager
+
+MB = 1024 * 1024
+
+
+class FakeTensor:
+    def __init__(self, n_bytes):
+        self.n_bytes = n_bytes
+
+    def numel(self):
+        return self.n_bytes
+
+    def element_size(self):
+        return 1
+
+
+class FakeModel:
+    def __init__(self, name, size_mb):
+        self.name = name
+        self.size_mb = size_mb
+        self.closed = False
+
+    def parameters(self):
+        return [FakeTensor(self.size_mb * MB)]
+
+    def buffers(self):
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+def make_manager(budget_mb, sizes, backends=None):
+    loads = []
+    lock = threading.Lock()
+
+    def loader(task, model_name, backend, cache_dir):
+        time.sleep(0.01)
+        with lock:
+            loads.append(task)
+        model = FakeModel(model_name, sizes[task])
+        model.backend = backend
+        return model
+
+    loaders = {task: loader for task in sizes}
+    return ModelManager(ram_budget_mb=budget_mb, loaders=loaders, backends=backends), loads
+
+
+def test_models_are_shared_and_loaded_once():
+    manager, loads = make_manager(0, {"classification": 10})
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        models = list(pool.map(lambda _: manager.get("classification"), range(8)))
+    assert all(m is models[0] for m in models)
+    assert loads == ["classification"]
+    assert manager.stats()["models"]["classification:facebook/bart-large-mnli"]["size_mb"] == 10
+
+
+def test_least_recently_used_models_are_evicted_over_budget():
+    manager, loads = make_manager(25, {"classification": 10, "summarization": 10, "image_caption": 10})
+    classifier = manager.get("classification")
+    manager.get("summarization")
+    manager.get("classification")  # Now more recent than summarization
+    manager.get("image_caption")
+
+    resident = {task for task, _ in manager.loaded()}
+    assert resident == {"classification", "image_caption"}
+    assert manager.stats()["evictions"] == 1
+    assert not classifier.closed
+    manager.get("summarization")
+    assert loads.count("summarization") == 2
+
+
+def test_pinned_models_are_not_evicted():
+    manager, _ = make_manager(15, {"classification": 10, "image_caption": 10})
+    with manager.use("image_caption") as captioner:
+        manager.get("classification")
+        assert {task for task, _ in manager.loaded()} == {"image_caption", "classification"}
+        assert not captioner.closed
+    # Released: the budget is enforced again
+    assert len(manager.loaded()) == 1
+    assert captioner.closed
+
+
+@pytest.mark.asyncio
+async def test_async_use_loads_off_the_event_loop():
+    manager, _ = make_manager(15, {"classification": 10, "image_caption": 10})
+    main = threading.current_thread()
+    threads = []
+    loader = manager.loaders["image_caption"]
+
+    def recording_loader(*args):
+        threads.append(threading.current_thread())
+        return loader(*args)
+
+    manager.loaders["image_caption"] = recording_loader
+    async with manager.ause("image_caption") as captioner:
+        manager.get("classification")
+        assert manager.stats()["models"]["image_caption:Salesforce/blip-image-captioning-base"]["pins"] == 1
+    assert threads and threads[0] is not main
+    assert captioner.closed  # Released and evicted over budget
+
+
+def test_environment_overrides_configured_budget(monkeypatch):
+    monkeypatch.setenv("MODEL_RAM_BUDGET_MB", "512")
+    assert ModelManager.from_config({"ram_budget_mb": 0}).stats()["ram_budget_mb"] == 512
+    monkeypatch.delenv("MODEL_RAM_BUDGET_MB")
+    assert ModelManager.from_config({"ram_budget_mb": 256}).stats()["ram_budget_mb"] == 256
+    assert ModelManager.from_config({"ram_budget_mb": 0}).stats()["ram_budget_mb"] is None
+
+
+def test_quantized_weights_are_sized_from_the_state_dict():
+    class QuantizedModel(FakeModel):
+        def state_dict(self):
+            # Dynamic quantization packs Linear weights outside ``parameters()``
+            return {"embed.weight": FakeTensor(2 * MB),
+                    "linear._packed_params._packed_params": (FakeTensor(3 * MB), FakeTensor(MB)),
+                    "linear.scale": 0.1}
+
+    manager = ModelManager(loaders={"classification": lambda *args: QuantizedModel("q", 100)},
+                           backends={"classification": "int8"})
+    manager.get("classification")
+    assert manager.stats()["models"]["classification:facebook/bart-large-mnli"]["size_mb"] == 6
+
+
+def test_preload_uses_configured_tasks():
+    manager, loads = make_manager(0, {"classification": 1, "summarization": 1})
+    manager.preload_tasks = ["summarization"]
+    manager.preload()
+    assert loads == ["summarization"]
+
+
+def test_backend_is_selected_per_task():
+    manager, _ = make_manager(0, {"classification": 1, "summarization": 1},
+                              backends={"classification": "onnx-int8"})
+    assert manager.get("classification").backend == "onnx-int8"
+    assert manager.get("summarization").backend == "eager"
+    assert manager.stats()["models"]["classification:facebook/bart-large-mnli"]["backend"] == "onnx-int8"
+
+
+def test_unsupported_backend_is_rejected():
+    with pytest.raises(ValueError):
+        ModelManager(backends={"image_caption": "onnx"})
+    with pytest.raises(ValueError):
+        ModelManager(backends={"classification": "fp16"})
+
+
+def test_converted_artifacts_are_built_once(tmp_path):
+    builds = []
+
+    def build(tmp):
+        builds.append(tmp)
+        (tmp / "model.onnx").write_text("graph")
+
+    target = tmp_path / "model" / "onnx"
+    assert cached_artifact(target, build) == target
+    assert cached_artifact(target, build) == target
+    assert len(builds) == 1
+    assert (target / "model.onnx").read_text() == "graph"
+    assert [p.name for p in (tmp_path / "model").iterdir()] == ["onnx"]
+
+
+def test_failed_conversion_leaves_no_artifact(tmp_path):
+    def build(tmp):
+        (tmp / "partial.onnx").write_text("")
+        raise RuntimeError("export failed")
+
+    with pytest.raises(RuntimeError):
+        cached_artifact(tmp_path / "onnx", build)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_concurrent_use_under_a_tight_budget_never_sees_an_unloaded_model():
+    manager, _ = make_manager(10, {"classification": 10, "summarization": 10, "image_caption": 10})
+    tasks = ["classification", "summarization", "image_caption"] * 8
+
+    def run(task):
+        with manager.use(task) as model:
+            assert model is not None and not model.closed
+        assert manager.get(task) is not None
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(run, tasks))
+    assert sum(e["pins"] for e in manager.stats()["models"].values()) == 0
+
+
+def test_models_are_closed_outside_the_manager_lock():
+    manager, _ = make_manager(10, {"classification": 10, "summarization": 10})
+    classifier = manager.get("classification")
+    lock_free = []
+
+    def close():
+        acquired = manager._lock.acquire(blocking=False)
+        lock_free.append(acquired)
+        if acquired:
+            manager._lock.release()
+
+    classifier.close = close
+    manager.get("summarization")  # Evicts the classifier
+    assert lock_free == [True]
@@ -0,0 +1,64 @@
+from src.services.file_processing import pdf_processor
+from src.services.file_processing.pdf_processor import PDFProcessor
+from src.agents.expert_agents.file_agent import FileAgent
+
+
+def write_pdf(path, n_pages):
+    """Minimal PDF whose page ``i`` contains the text ``page<i>.``."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for i in range(1, n_pages + 1):
+        stream = f"BT /F1 12 Tf 10 50 Td (page{i}.) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 200 100] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {n_pages} >>"
+    out, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(out)
+    return str(path)
+
+
+def test_page_ranges_and_order(tmp_path):
+    path = write_pdf(tmp_path / "doc.pdf", 5)
+    assert PDFProcessor.page_count(path) == 5
+    pages = list(PDFProcessor.iter_pages(path, 2, 4))
+    assert [n for n, _ in pages] == [2, 3, 4]
+    assert [t.strip() for _, t in pages] == ["page2.", "page3.", "page4."]
+    assert PDFProcessor.extract_text(path, last_page=2).replace("\n", "") == "page1.page2."
+
+
+def test_parallel_extraction_preserves_page_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_processor, "PAGES_PER_TASK", 3)
+    path = write_pdf(tmp_path / "doc.pdf", 10)
+    serial = list(PDFProcessor.iter_pages(path, parallel=False))
+    parallel = list(PDFProcessor.iter_pages(path, parallel=True))
+    assert parallel == serial
+    assert [n for n, _ in parallel] == list(range(1, 11))
+
+
+def test_file_agent_pdf_page_range(tmp_path):
+    path = write_pdf(tmp_path / "doc.pdf", 4)
+    result = FileAgent().process(path, "pdf", pages=[3, 10])
+    assert "page3." in result["output"] and "page2." not in result["output"]
+    assert result["metadata"]["pages"] == [3, 4]
+    assert "summary" not in result["metadata"]
+
+
+def test_file_agent_summarizes_pdf_text_on_request(tmp_path):
+    class FakeTextProcessor:
+        def summarize_long(self, text):
+            return {"summary": text.split()[0], "chunks": 1, "depth": 0, "timings_ms": {}}
+
+    agent = FileAgent()
+    agent.text_processor = FakeTextProcessor()
+    result = agent.process(write_pdf(tmp_path / "doc.pdf", 3), "pdf", summarize=True)
+    assert result["metadata"]["summary"]["summary"].startswith("page1.")
@@ -0,0 +1,79 @@
+from src.core.cache.response_cache import ResponseCache, SemanticIndex
+
+VECTORS = {
+    "what are your opening hours?": [1.0, 0.0, 0.0],
+    "what are your opening hours": [0.99, 0.1, 0.0],
+    "how do i reset my password?": [0.0, 1.0, 0.0],
+}
+
+
+def test_exact_tier_is_scoped_by_provider_and_model():
+    cache = ResponseCache(max_size=8)
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return f"answer {len(calls)}"
+
+    assert cache.get_or_generate("openai", "gpt", "p", generate) == ("answer 1", None)
+    assert cache.get_or_generate("openai", "gpt", "p", generate) == ("answer 1", "exact")
+    assert cache.get_or_generate("gemini", "gemini-pro", "p", generate) == ("answer 2", None)
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["misses"]) == (1, 2)
+    assert stats["hit_rate"] == 1 / 3
+
+
+def test_size_bound_and_bypass():
+    cache = ResponseCache(max_size=1)
+    cache.store("openai", "gpt", "a", "A")
+    cache.store("openai", "gpt", "b", "B")
+    assert cache.lookup("openai", "gpt", "a") == (None, None)
+    assert cache.get_or_generate("openai", "gpt", "b", lambda: "fresh", use_cache=False) == ("fresh", None)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bypassed"] == 1
+
+
+def test_semantic_tier_matches_similar_prompts():
+    embedded = []
+
+    def embedder(text):
+        embedded.append(text)
+        return VECTORS[text]
+
+    cache = ResponseCache(embedder=embedder, similarity_threshold=0.9)
+    cache.get_or_generate("openai", "gpt", "what are your opening hours?", lambda: "9 to 5")
+    assert embedded == ["what are your opening hours?"]  # Embedded once per miss
+
+    assert cache.lookup("openai", "gpt", "what are your opening hours") == ("9 to 5", "semantic")
+    assert cache.lookup("openai", "gpt", "how do i reset my password?") == (None, None)
+    assert cache.lookup("gemini", "gemini-pro", "what are your opening hours") == (None, None)
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_embedding_failure_falls_back_to_exact_tier():
+    def embedder(text):
+        raise RuntimeError("endpoint down")
+
+    cache = ResponseCache(embedder=embedder)
+    cache.store("openai", "gpt", "p", "A")
+    assert cache.lookup("openai", "gpt", "p") == ("A", "exact")
+    assert cache.lookup("openai", "gpt", "q") == (None, None)
+    assert cache.stats()["embed_errors"] == 2
+
+
+def test_semantic_index_keeps_namespaces_apart_through_eviction_and_expiry():
+    now = [0.0]
+    index = SemanticIndex(max_size=3, ttl=10, clock=lambda: now[0])
+    index.add("a1", "a", [1.0, 0.0], "A1")
+    index.add("b1", "b", [1.0, 0.0], "B1")
+    assert index.search("a", [1.0, 0.0], 0.9) == ("A1", 1.0)
+    index.add("a2", "a", [0.0, 1.0], "A2")
+    index.add("b2", "b", [0.0, 1.0], "B2")  # Evicts a1
+    assert index.search("a", [1.0, 0.0], 0.9) is None
+    assert index.search("a", [0.0, 1.0], 0.9)[0] == "A2"
+    assert index.search("b", [1.0, 0.0], 0.9)[0] == "B1"
+    assert index.evictions == 1
+    now[0] = 11
+    assert index.search("b", [0.0, 1.0], 0.9) is None
+    assert index.expirations == 3
+    assert index.search("c", [1.0, 0.0], 0.0) is None
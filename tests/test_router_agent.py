@@ -1,6 +1,7 @@
 import types
 import sys
 import importlib
+import inspect
 import pytest
 
 # ----- Stub modules and classes -----
@@ -23,13 +24,29 @@ class DummyMessageGraph:
         label = router_func(state)
         result = self.nodes[label](state)
         async def gen():
-            yield result
+            # Like LangGraph, async nodes are awaited before their output is streamed
+            yield await result if inspect.isawaitable(result) else result
         return gen()
 
 class DummyTextAgent:
-    def process(self, state):
+    def __init__(self, response_cache=None):
+        self.response_cache = response_cache
+
+    def process(self, state, use_cache=True):
         return {"handled_by": "text"}
 
+    def stream(self, text, use_cache=True, meta=None):
+        if meta is not None:
+            meta["cache"] = "exact" if text == "cached" else None
+        yield "hel"
+        yield "lo"
+
+    def build_result(self, text, response, cache=None):
+        result = {"handled_by": "text", "output": response}
+        if cache:
+            result["cache"] = cache
+        return result
+
 class DummyImageAgent:
     def process(self, state):
         return {"handled_by": "image"}
@@ -89,10 +106,17 @@ requests_module.post = dummy_post
 sys.modules["requests"] = requests_module
 
 # Import RouterAgent after stubs are in place
-RouterAgent = importlib.import_module("src.agents.router_agent").RouterAgent
+router_module = importlib.import_module("src.agents.router_agent")
+RouterAgent = router_module.RouterAgent
+
+
+def make_router(tmp_path):
+    # Keep the long-term store out of the working directory
+    return RouterAgent(config={"memory": {"long_path": str(tmp_path / "long_term.db")}})
+
 
 @pytest.mark.asyncio
-async def test_process_input_routes_text():
+async def test_process_input_routes_text(tmp_path):
     # Patch the workflow builder to avoid missing attributes
     def dummy_build_workflow(self):
         self.labels = ["text", "image", "file", "link"]
@@ -107,7 +131,7 @@ async def test_process_input_routes_text():
 
     RouterAgent._build_workflow = dummy_build_workflow
 
-    router = RouterAgent(config={})
+    router = make_router(tmp_path)
     result = await router.process_input({"content": "hello"})
     assert result["status"] == "success"
     assert result["result"] == {"handled_by": "text"}
@@ -132,5 +156,91 @@ async def test_memory_updates(tmp_path):
     router = RouterAgent(config={"memory": {"long_path": str(mem_file), "short_capacity": 2}})
     await router.process_input({"content": "hello"})
     assert len(router.short_term.get_context()) == 1
+    # Summaries are written in the background; wait for them before checking
+    await router.short_term.flush()
     assert len(router.long_term.get_all()) == 1
 
+
+@pytest.mark.asyncio
+async def test_fast_path_skips_classifier(tmp_path):
+    def dummy_build_workflow(self):
+        self.labels = ["text", "image", "file", "link"]
+        self.workflow = DummyMessageGraph()
+        self.workflow.add_node("router", self._route_input)
+        for agent_type in self.labels:
+            self.workflow.add_node(
+                agent_type,
+                lambda state, agent_type=agent_type: self.agents[agent_type].process(state)
+            )
+        self.workflow.set_entry_point("router")
+
+    RouterAgent._build_workflow = dummy_build_workflow
+
+    router = make_router(tmp_path)
+    link = await router.process_input({"content": "https://example.com/article"})
+    image = await router.process_input({"content": "https://example.com/cat.png"})
+    upload = await router.process_input({"content": "/tmp/x", "metadata": {"file_type": "csv"}})
+    text = await router.process_input({"content": "hello"})
+    assert link["result"] == {"handled_by": "link"}
+    assert image["result"] == {"handled_by": "image"}
+    assert upload["result"] == {"handled_by": "file"}
+    assert text["result"] == {"handled_by": "text"}
+    stats = router.routing_stats()
+    assert stats["url"] == 2
+    assert stats["metadata"] == 1
+    assert stats["fallthrough"] == 1
+
+
+@pytest.mark.asyncio
+async def test_agents_run_on_their_executor(tmp_path):
+    router = make_router(tmp_path)
+    result = await router._run_agent("link", {"input": "https://example.com"})
+    assert result == {"handled_by": "link"}
+    assert router.executors.stats()["link"]["completed"] == 1
+    assert router.executors.stats()["text"]["completed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_astream_input_yields_tokens_then_result(tmp_path):
+    router = make_router(tmp_path)
+    events = [event async for event in router.astream_input({"content": "hi there"})]
+    assert [e["delta"] for e in events[:-1]] == ["hel", "lo"]
+    assert events[-1]["status"] == "success"
+    assert events[-1]["result"] == {"handled_by": "text", "output": "hello"}
+    assert router.short_term.get_context() == ["hi there hello"]
+
+
+@pytest.mark.asyncio
+async def test_astream_input_keeps_cache_tier(tmp_path):
+    router = make_router(tmp_path)
+    events = [event async for event in router.astream_input({"content": "cached"})]
+    assert events[-1]["result"]["cache"] == "exact"
+
+
+@pytest.mark.asyncio
+async def test_stalled_stream_times_out(tmp_path, monkeypatch):
+    import time as _time
+
+    router = make_router(tmp_path)
+    text_agent = router.agents["text"]
+
+    def stalled(text, use_cache=True, meta=None):
+        yield "a"
+        _time.sleep(0.3)
+        yield "b"
+
+    monkeypatch.setattr(text_agent, "stream", stalled)
+    monkeypatch.setattr(router_module, "STREAM_IDLE_TIMEOUT", 0.05)
+    events = [event async for event in router.astream_input({"content": "hi there"})]
+    assert events[0]["delta"] == "a"
+    assert events[-1]["status"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_aclose_commits_buffered_long_term_writes(tmp_path):
+    router = make_router(tmp_path)
+    await router.long_term.aadd("last summary before shutdown")
+    await router.aclose()
+    reopened = router_module.LongTermMemory(storage_path=str(tmp_path / "long_term.db"))
+    assert reopened.get_all() == ["last summary before shutdown"]
+    reopened.close()
@@ -0,0 +1,108 @@
+import asyncio
+import sys
+import types
+
+import pytest
+
+try:
+    import langgraph.graph  # noqa: F401
+except ImportError:
+    class _Graph:
+        def add_node(self, *args):
+            pass
+
+        def add_edge(self, *args):
+            pass
+
+        def set_entry_point(self, *args):
+            pass
+
+    graph_module = types.ModuleType("langgraph.graph")
+    graph_module.MessageGraph = _Graph
+    sys.modules["langgraph.graph"] = graph_module
+
+from src.core.memory import short_term
+from src.core.memory.short_term import ShortTermMemory
+
+
+@pytest.mark.asyncio
+async def test_turns_are_coalesced_and_folded_incrementally(monkeypatch):
+    calls = []
+
+    async def fake_asummarize(text):
+        calls.append(text)
+        return f"S{len(calls)}"
+
+    monkeypatch.setattr(short_term, "asummarize", fake_asummarize)
+    saved = []
+
+    async def on_summary(summary, conversation_id):
+        saved.append((summary, conversation_id))
+
+    memory = ShortTermMemory(capacity=5, on_summary=on_summary, debounce=0.05)
+    memory.add("a", conversation_id="c1")
+    memory.add("b", conversation_id="c1")
+    assert calls == []  # adding never waits for the summarizer
+    assert await memory.flush("c1") == "S1"
+    memory.add("c", conversation_id="c1")
+    await memory.flush()
+    assert calls == ["a b", "S1 c"]
+    assert saved == [("S1", "c1"), ("S2", "c1")]
+    assert memory.coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_conversations_are_summarized_separately(monkeypatch):
+    async def fake_asummarize(text):
+        return f"[{text}]"
+
+    monkeypatch.setattr(short_term, "asummarize", fake_asummarize)
+    saved = []
+
+    async def on_summary(summary, conversation_id):
+        saved.append((conversation_id, summary))
+
+    memory = ShortTermMemory(on_summary=on_summary, debounce=0.05)
+    memory.add("a1", conversation_id="a")
+    memory.add("b1", conversation_id="b")
+    memory.add("a2", conversation_id="a")
+    await memory.flush()
+    assert sorted(saved) == [("a", "[a1 a2]"), ("b", "[b1]")]
+    assert memory.get_context("a") == ["a1", "a2"]
+    assert memory.get_summary("b") == "[b1]"
+
+
+@pytest.mark.asyncio
+async def test_debounce_applies_again_after_flush(monkeypatch):
+    calls = []
+
+    async def fake_asummarize(text):
+        calls.append(text)
+        await asyncio.sleep(0.02)
+        return text
+
+    monkeypatch.setattr(short_term, "asummarize", fake_asummarize)
+    memory = ShortTermMemory(debounce=0.2)
+    memory.add("x")
+    flush = asyncio.ensure_future(memory.flush())
+    await asyncio.sleep(0.01)
+    memory.add("y")  # Arrives while the flushed turn is being summarized
+    await asyncio.sleep(0.05)
+    memory.add("z")
+    await asyncio.sleep(0.05)
+    # "y" and "z" are still waiting out the debounce together
+    assert calls == ["x"]
+    await flush
+    assert calls == ["x", "x y z"]
+
+
+@pytest.mark.asyncio
+async def test_aclose_finishes_pending_summaries(monkeypatch):
+    async def fake_asummarize(text):
+        return text.upper()
+
+    monkeypatch.setattr(short_term, "asummarize", fake_asummarize)
+    memory = ShortTermMemory(debounce=10)
+    memory.add("pending", conversation_id="c")
+    await memory.aclose(timeout=1)
+    assert memory.get_summary("c") == "PENDING"
@@ -76,3 +76,30 @@ def test_gemini_selection():
     assert agent.provider == 'gemini'
 
 
+def test_gemini_streaming():
+    class StreamingModel:
+        def generate_content(self, prompt, stream=False):
+            assert stream
+            return [DummyResponse("par"), DummyResponse("tial")]
+
+    agent = ta.TextAgent()
+    agent.gemini_model = StreamingModel()
+    assert list(agent.stream("hi")) == ["par", "tial"]
+
+
+def test_repeated_prompts_hit_the_response_cache():
+    agent = ta.TextAgent()
+    calls = []
+    generate = agent.gemini_model.generate_content
+    agent.gemini_model.generate_content = lambda prompt: calls.append(prompt) or generate(prompt)
+
+    first = agent.process("faq")
+    second = agent.process("faq")
+    bypassed = agent.process("faq", use_cache=False)
+    assert len(calls) == 2
+    assert second['output'] == first['output']
+    assert second['metadata']['cache'] == 'exact'
+    assert bypassed['metadata']['cache'] is None
+    meta = {}
+    assert list(agent.stream("faq", meta=meta)) == [first['output']]
+    assert meta['cache'] == 'exact'
@@ -0,0 +1,110 @@
+import threading
+import time
+
+from src.services.file_processing import text_processor
+from src.services.file_processing.text_processor import TextProcessor
+
+
+class FakeSummarizer:
+    """Repeats the first word of each input, so the result shows which chunks it saw."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return [{"summary_text": f"S{len(self.calls)}: " + " ".join([t.split()[-1]] * 8)} for t in texts]
+
+
+def make_document(sentences):
+    # Five words, counted as 7 tokens without a tokenizer
+    return " ".join(f"Sentence{i} has exactly five words." for i in range(sentences))
+
+
+def local_processor(monkeypatch, **kwargs):
+    fake = FakeSummarizer()
+    monkeypatch.delenv("AZURE_OPENAI_SUMMARIZE_ENDPOINT", raising=False)
+    monkeypatch.setattr(TextProcessor, "summarizer", property(lambda self: fake))
+    return TextProcessor(**kwargs), fake
+
+
+def test_chunks_are_bounded_and_overlap(monkeypatch):
+    processor, _ = local_processor(monkeypatch, chunk_tokens=40, overlap_tokens=7)
+    chunks = processor.chunk(make_document(30))
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert processor._token_counts([chunk], None)[0] <= 40
+    # Each chunk repeats the last sentence of the previous one
+    for prev, nxt in zip(chunks, chunks[1:]):
+        last_sentence = "Sentence" + prev.rsplit("Sentence", 1)[1]
+        assert nxt.startswith(last_sentence)
+
+
+def test_short_text_is_one_call(monkeypatch):
+    processor, fake = local_processor(monkeypatch, chunk_tokens=900)
+    result = processor.summarize_long(make_document(3))
+    assert result["chunks"] == 1 and result["depth"] == 0
+    assert len(fake.calls) == 1
+    assert processor.summarize(make_document(3)).endswith("words.")
+
+
+def test_long_text_is_mapped_then_reduced(monkeypatch):
+    processor, fake = local_processor(monkeypatch, chunk_tokens=40, overlap_tokens=0, fan_in=2, max_depth=5)
+    result = processor.summarize_long(make_document(40))
+    assert result["chunks"] == 8
+    # The map is one batched call over every chunk
+    assert len(fake.calls[0]) == 8
+    # 8 partial summaries of 12 tokens, reduced in pairs until they fit one chunk
+    assert [len(call) for call in fake.calls] == [8, 4, 2, 1]
+    assert result["depth"] == 3
+    assert len(result["timings_ms"]["reduce"]) == result["depth"]
+    assert len(fake.calls[-1]) == 1
+    assert result["summary"].startswith(f"S{len(fake.calls)}:")
+
+
+def test_max_depth_bounds_reduce_levels(monkeypatch):
+    processor, fake = local_processor(monkeypatch, chunk_tokens=40, overlap_tokens=0, fan_in=2, max_depth=1)
+    result = processor.summarize_long(make_document(40))
+    assert result["depth"] == 1
+    assert len(fake.calls) == 2
+
+
+def test_azure_chunks_are_summarized_in_parallel(monkeypatch):
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def fake_summarize(text, max_length, min_length):
+        with lock:
+            in_flight.append(text)
+            peak.append(len(in_flight))
+        time.sleep(0.02)
+        with lock:
+            in_flight.remove(text)
+        return text.split()[0]
+
+    monkeypatch.setenv("AZURE_OPENAI_SUMMARIZE_ENDPOINT", "https://example.invalid")
+    monkeypatch.setattr(text_processor, "summarize", fake_summarize)
+    processor = TextProcessor(chunk_tokens=40, overlap_tokens=0, concurrency=4)
+    result = processor.summarize_long(make_document(40))
+    assert result["chunks"] == 8
+    assert max(peak) > 1
+    assert result["summary"] == "Sentence0"
+
+
+def test_summary_lengths_scale_with_each_input(monkeypatch):
+    calls = []
+
+    def fake_summarize(text, max_length, min_length):
+        calls.append((len(text.split()), max_length, min_length))
+        return text.split()[0]
+
+    monkeypatch.setenv("AZURE_OPENAI_SUMMARIZE_ENDPOINT", "https://example.invalid")
+    monkeypatch.setattr(text_processor, "summarize", fake_summarize)
+    processor = TextProcessor(chunk_tokens=400, overlap_tokens=0, max_depth=1)
+    # Two full chunks (57 sentences of 7 tokens) and a short one (6 sentences)
+    processor.summarize_long(make_document(120), max_length=130, min_length=30)
+    mapped = sorted(calls[:3], reverse=True)  # Map calls run concurrently
+    assert [words for words, _, _ in mapped] == [285, 285, 30]
+    assert mapped[0][1:] == (130, 30)
+    assert mapped[2][1:] == (19, 9)  # 39 tokens: at most half, and min below max
@@ -0,0 +1,50 @@
+import asyncio
+import io
+import os
+
+import pytest
+
+from src.services.upload_store import UploadStore
+
+
+class FakeUpload:
+    def __init__(self, data):
+        self._buffer = io.BytesIO(data)
+        self.reads = 0
+
+    async def read(self, n):
+        self.reads += 1
+        return self._buffer.read(n)
+
+
+@pytest.mark.asyncio
+async def test_uploads_are_stored_by_digest_in_chunks(tmp_path):
+    store = UploadStore(str(tmp_path), chunk_size=4)
+    data = b"a,b\n1,2\n"
+    first, second = await asyncio.gather(
+        store.save(FakeUpload(data), "csv"), store.save(FakeUpload(data), "csv")
+    )
+    assert first["digest"] == second["digest"]
+    assert first["path"] == store.path_for(first["digest"], "csv")
+    assert {first["existing"], second["existing"]} == {False, True}
+    with open(first["path"], "rb") as f:
+        assert f.read() == data
+    assert os.listdir(tmp_path / ".incoming") == []
+
+    other = FakeUpload(b"different")
+    assert (await store.save(other, "csv"))["digest"] != first["digest"]
+    assert other.reads == 4  # Three 4-byte chunks and the final empty read
+
+
+@pytest.mark.asyncio
+async def test_results_are_cached_by_digest(tmp_path):
+    store = UploadStore(str(tmp_path))
+    saved = await store.save(FakeUpload(b"content"), "pdf")
+    assert await store.aget_result(saved["digest"], "pdf") is None
+    await store.aset_result(saved["digest"], "pdf", {"output": "text"})
+    assert await store.aget_result(saved["digest"], "pdf") == {"output": "text"}
+
+    # A new store (e.g. after a restart) reads the persisted result
+    reopened = UploadStore(str(tmp_path))
+    assert await reopened.aget_result(saved["digest"], "pdf") == {"output": "text"}
+    assert reopened.get_result(saved["digest"], "csv") is None
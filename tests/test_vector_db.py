@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from src.core.knowledge_base.vector_db import VectorDB
+
+
+def test_dot_search_matches_bruteforce_and_grows():
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((3000, 16)).astype(np.float32)
+    db = VectorDB()
+    db.add_batch(data[:10], [str(i) for i in range(10)])
+    for i in range(10, 3000):  # forces several capacity doublings
+        db.add(data[i].tolist(), str(i))
+    query = rng.standard_normal(16).astype(np.float32)
+    expected = np.argsort(-(data @ query))[:5]
+    assert db.search(query.tolist(), top_k=5) == [str(i) for i in expected]
+    assert len(db) == 3000
+
+
+def test_cosine_scores_and_batch():
+    db = VectorDB(metric="cosine")
+    db.add_batch([[10.0, 0.0], [0.0, 1.0], [1.0, 1.0]], ["x", "y", "xy"])
+    hits = db.search([1.0, 0.0], top_k=2, return_scores=True)
+    assert hits[0] == ("x", 1.0)
+    assert hits[1][0] == "xy"
+    assert abs(hits[1][1] - 2 ** -0.5) < 1e-6
+    assert db.search_batch([[0.0, 2.0], [3.0, 0.0]], top_k=1) == [["y"], ["x"]]
+
+
+def test_empty_store():
+    assert VectorDB().search([1.0, 2.0]) == []
+
+
+def test_on_disk_index_persists_and_shares_appends(tmp_path):
+    path = str(tmp_path / "index")
+    writer = VectorDB(metric="cosine", path=path)
+    writer.add_batch([[1.0, 0.0], [0.0, 1.0]], ["east", "nörth"])
+
+    reader = VectorDB(metric="cosine", path=path)
+    assert reader.search([0.0, 5.0]) == ["nörth"]
+    writer.add([-1.0, 0.0], "west")
+    assert len(reader) == 3
+    assert reader.search([-2.0, 0.1], top_k=1, return_scores=True)[0][0] == "west"
+    assert list(reader.texts) == ["east", "nörth", "west"]
+
+
+def test_on_disk_index_recovers_from_torn_write(tmp_path):
+    path = tmp_path / "index"
+    VectorDB(metric="cosine", path=str(path)).add_batch([[1.0, 0.0], [0.0, 1.0]], ["east", "north"])
+    # A writer that crashed after writing text and vector bytes but before the offset index
+    with open(path / "texts.bin", "ab") as f:
+        f.write(b"garbage")
+    with open(path / "vectors.f32", "ab") as f:
+        f.write(b"\0" * 5)
+
+    db = VectorDB(metric="cosine", path=str(path))
+    db.add([-1.0, 0.0], "west")
+    assert list(db.texts) == ["east", "north", "west"]
+    assert db.search([-1.0, 0.0]) == ["west"]
+
+
+def test_on_disk_index_rejects_mismatched_settings(tmp_path):
+    path = str(tmp_path / "index")
+    VectorDB(path=path, dim=3)
+    with pytest.raises(ValueError):
+        VectorDB(path=path, dim=4)
+
+
+def test_ivf_index_full_probe_matches_exact_and_indexes_inserts():
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal((2000, 8)).astype(np.float32)
+    db = VectorDB(metric="cosine", index="ivf", index_params={"nlist": 16, "background": False})
+    db.add_batch(data, [str(i) for i in range(2000)])
+    assert db.index.trained
+    query = rng.standard_normal(8).astype(np.float32)
+    assert db.search(query, top_k=5, nprobe=16) == db.search(query, top_k=5, exact=True)
+
+    db.add([100.0] * 8, "outlier")
+    assert db.search([1.0] * 8, top_k=1) == ["outlier"]
+    assert db.index.stats()["indexed"] == 2001
+
+
+def test_ivf_retrains_after_growth():
+    rng = np.random.default_rng(2)
+    db = VectorDB(metric="cosine", index="ivf", index_params={"nlist": 4, "min_points_per_list": 8,
+                                                              "rebuild_factor": 2.0, "background": False})
+    db.add_batch(rng.standard_normal((32, 4)), ["a"] * 32)
+    assert db.index.rebuilds == 1
+    db.add_batch(rng.standard_normal((40, 4)), ["b"] * 40)
+    assert db.index.rebuilds == 2
+    assert db.index.stats()["trained_on"] == 72
+
+
+def test_ivf_requires_cosine():
+    with pytest.raises(ValueError):
+        VectorDB(metric="dot", index="ivf")